@@ -0,0 +1,169 @@
+# benchmarks/load_generator.py
+# Usage (from the project root):
+#   python -m benchmarks.load_generator --db bench_results/load.db --departments 12 \
+#          --students-per-dept 400 --years 3 --markers 8 --reporters 4 --duration 30
+############### IMPORTS ###############
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from benchmarks import synthetic
+from benchmarks.run_benchmarks import summarize
+from logic import db_handler
+
+############## FUNCTIONS ##############
+
+# Function: fill_database
+# Purpose: Populate db_path with students across many departments and years of attendance
+def fill_database(db_path, departments, students_per_dept, years, seed):
+    dept_names = [f"DEPT{i:02d}" for i in range(1, departments + 1)]
+    students = departments * students_per_dept
+
+    print(f"⏳ Generating {students} students in {departments} departments, {years} year(s) of history...")
+    start = time.perf_counter()
+    rows = synthetic.make_attendance_db(db_path, students, days = int(365 * years),
+                                        seed = seed, departments = dept_names)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Inserted {rows} attendance rows in {elapsed:.1f}s")
+    return students, rows
+
+#######################################
+
+# Function: replay
+# Purpose: Run marking and reporting threads against db_handler for `duration` seconds
+def replay(students, markers, reporters, duration, history_days, seed):
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies = {"mark_attendance": [], "get_attendance_by_date": [], "get_attendance_by_student": []}
+    outcomes = {"marked": 0, "duplicate": 0, "locked": 0, "error": 0}
+
+    def classify(ok, msg):
+        if ok:
+            return "marked"
+        text = str(msg).lower()
+        if "already marked" in text:
+            return "duplicate"
+        if "locked" in text or "busy" in text:
+            return "locked"
+        return "error"
+
+    def marker(n):
+        rnd = random.Random(seed + n)
+        while not stop.is_set():
+            roll = str(rnd.randint(1, students))
+            start = time.perf_counter()
+            ok, msg = db_handler.mark_attendance(roll, "Present")
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies["mark_attendance"].append(elapsed)
+                outcomes[classify(ok, msg)] += 1
+
+    def reporter(n):
+        rnd = random.Random(seed + 1000 + n)
+        today = date.today()
+        while not stop.is_set():
+            if rnd.random() < 0.5:
+                day = (today - timedelta(days = rnd.randint(0, history_days))).isoformat()
+                name = "get_attendance_by_date"
+                start = time.perf_counter()
+                ok, result = db_handler.get_attendance_by_date(day)
+            else:
+                name = "get_attendance_by_student"
+                start = time.perf_counter()
+                ok, result = db_handler.get_attendance_by_student(str(rnd.randint(1, students)))
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[name].append(elapsed)
+                if not ok:
+                    outcomes[classify(ok, result)] += 1
+
+    threads = [threading.Thread(target = marker, args = (i,), daemon = True) for i in range(markers)]
+    threads += [threading.Thread(target = reporter, args = (i,), daemon = True) for i in range(reporters)]
+
+    print(f"🏃 Replaying with {markers} marking and {reporters} reporting threads for {duration}s...")
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    report = {"elapsed_s": round(elapsed, 3), "outcomes": outcomes, "operations": {}}
+    for name, values in latencies.items():
+        if values:
+            summary = summarize(values)
+            summary["throughput_per_s"] = round(len(values) / elapsed, 2)
+            # Calls this slow are almost always waiting on SQLite's write lock
+            summary["over_100ms"] = sum(1 for v in values if v > 0.1)
+            report["operations"][name] = summary
+    return report
+
+#######################################
+
+# Function: main
+# Purpose: Fill (unless --skip-fill) and replay, then print/write the report
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "FaceTrack database load generator")
+    parser.add_argument("--db", default = os.path.join("bench_results", "load.db"),
+                        help = "database to fill and load (never the live one unless you pass it)")
+    parser.add_argument("--departments", type = int, default = 8)
+    parser.add_argument("--students-per-dept", type = int, default = 250)
+    parser.add_argument("--years", type = float, default = 2)
+    parser.add_argument("--skip-fill", action = "store_true", help = "reuse an already filled --db")
+    parser.add_argument("--markers", type = int, default = 4, help = "concurrent marking threads")
+    parser.add_argument("--reporters", type = int, default = 2, help = "concurrent reporting threads")
+    parser.add_argument("--duration", type = float, default = 20, help = "replay seconds")
+    parser.add_argument("--seed", type = int, default = 42)
+    parser.add_argument("--journal", action = "store_true",
+                        help = "mark through the attendance journal (batched writer thread)")
+    parser.add_argument("--out", help = "write the report JSON here")
+    args = parser.parse_args(argv)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.db)), exist_ok = True)
+    original_path = db_handler.DB_PATH
+    db_handler.DB_PATH = args.db
+    try:
+        if args.skip_fill:
+            connect = sqlite3.connect(args.db)
+            students = connect.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+            connect.close()
+        else:
+            if os.path.exists(args.db):
+                raise SystemExit(f"❌ {args.db} already exists. Remove it or pass --skip-fill.")
+            students, _ = fill_database(args.db, args.departments, args.students_per_dept, args.years, args.seed)
+
+        if args.journal:
+            db_handler.ensure_schema()
+            db_handler.start_attendance_journal(args.db + ".journal")
+        report = replay(students, args.markers, args.reporters, args.duration, int(365 * args.years), args.seed)
+    finally:
+        db_handler.stop_attendance_journal()
+        db_handler.DB_PATH = original_path
+
+    report["args"] = vars(args)
+    print(json.dumps({"outcomes": report["outcomes"]}, indent = 2))
+    for name, r in report["operations"].items():
+        print(f"{name:<26} {r['throughput_per_s']:>9.1f}/s  p50={r['p50_ms']:.2f}ms  "
+              f"p95={r['p95_ms']:.2f}ms  p99={r['p99_ms']:.2f}ms  max={r['max_ms']:.2f}ms  >100ms={r['over_100ms']}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent = 2)
+        print(f"✅ Report written to {args.out}")
+    return report
+
+############### MAIN ###############
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+# benchmarks/run_benchmarks.py
+# Usage (from the project root):
+#   python -m benchmarks.run_benchmarks --students 100 --out bench_results/base.json
+#   python -m benchmarks.run_benchmarks --students 100 --compare bench_results/base.json
+############### IMPORTS ###############
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from benchmarks import synthetic
+from logic import db_handler
+
+############## FUNCTIONS ##############
+
+# Function: summarize
+# Purpose: Turn a list of durations (seconds) into the result record written to JSON
+def summarize(durations):
+    ordered = sorted(durations)
+    n = len(ordered)
+    total = sum(ordered)
+
+    def pct(p):
+        return ordered[min(n - 1, int(p * n))] * 1000
+
+    return {
+        "n": n,
+        "total_s": round(total, 6),
+        "mean_ms": round(total / n * 1000, 4),
+        "p50_ms": round(pct(0.50), 4),
+        "p95_ms": round(pct(0.95), 4),
+        "p99_ms": round(pct(0.99), 4),
+        "min_ms": round(ordered[0] * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+        "ops_per_s": round(n / total, 2) if total else None,
+    }
+
+#######################################
+
+# Function: measure
+# Purpose: Call fn() `repeat` times and summarize the timings
+def measure(fn, repeat = 1):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return summarize(durations)
+
+#######################################
+
+# Function: bench_vision
+# Purpose: Time training, model load and per-face predict on a synthetic dataset
+def bench_vision(workdir, args, results):
+    import cv2
+    from logic.face_trainer import Trainer
+    from logic.user_auth import Authenticator
+
+    dataset = os.path.join(workdir, "dataset")
+    model_path = os.path.join(workdir, "trainer.yml")
+
+    synthetic.make_face_dataset(dataset, args.students, args.samples, seed = args.seed)
+
+    trainer = Trainer(dataset_path = dataset, model_path = model_path)
+    results["load_images"] = measure(trainer.load_images, args.repeat)
+    results["train"] = measure(lambda: Trainer(dataset, model_path).train_model(), args.repeat)
+    results["model_load"] = measure(lambda: Authenticator(model_path), args.repeat)
+
+    auth = Authenticator(model_path)
+    faces, _ = synthetic.make_face_samples(min(args.students, args.queries), seed = args.seed + 1)
+    durations = []
+    for face in faces:
+        start = time.perf_counter()
+        auth.recognizer.predict(face)
+        durations.append(time.perf_counter() - start)
+    results["predict"] = summarize(durations)
+
+    results.update(bench_frame_path(args.frames))
+
+    return {"opencv": cv2.__version__}
+
+#######################################
+
+# Function: bench_frame_path
+# Purpose: Compare per-frame time and transient allocations of the old and the buffered frame path
+def bench_frame_path(frames, size = (640, 480)):
+    import tracemalloc
+    import cv2
+    import numpy as np
+    from PIL import Image
+    from logic.frame_buffers import FrameBuffers
+
+    rng = np.random.default_rng(0)
+    source = rng.integers(0, 256, (size[1], size[0], 3), dtype = np.uint8)
+
+    def legacy(frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        Image.fromarray(rgb).resize((400, 300))
+        return gray
+
+    buffers = FrameBuffers()
+
+    def buffered(frame):
+        gray = buffers.to_gray(frame)
+        rgb = buffers.to_preview_rgb(frame)
+        Image.frombuffer("RGB", (400, 300), rgb, "raw", "RGB", 0, 1)
+        return gray
+
+    results = {}
+    for name, step in (("frame_legacy", legacy), ("frame_buffered", buffered)):
+        step(source)  # Warm up (first call allocates the buffers)
+        durations = []
+        peaks = []
+        tracemalloc.start()
+        for _ in range(frames):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            step(source)
+            durations.append(time.perf_counter() - start)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        tracemalloc.stop()
+        results[name] = summarize(durations)
+        results[name]["peak_bytes_per_frame"] = int(sum(peaks) / len(peaks))
+
+    # What an idle kiosk pays per frame with and without the motion gate
+    from logic.motion_gate import MotionGate
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    gate = MotionGate()
+    gate.check(source)
+    results["idle_gate_check"] = measure(lambda: gate.check(source), frames)
+    gray = buffers.to_gray(source)
+    results["idle_full_detect"] = measure(
+        lambda: cascade.detectMultiScale(gray, scaleFactor = 1.3, minNeighbors = 5, minSize = (50, 50)),
+        max(1, frames // 10)
+    )
+    return results
+
+#######################################
+
+# Function: bench_index
+# Purpose: Time embedding lookups as enrollment grows (random unit vectors, 5 samples per student)
+def bench_index(args, results):
+    import numpy as np
+    from logic.recognizers import EmbeddingIndex
+
+    rng = np.random.default_rng(args.seed)
+    queries = rng.standard_normal((args.queries, 128)).astype(np.float32)
+    for students in (100, 1000, 10000, 50000):
+        vectors = rng.standard_normal((students * 5, 128)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis = 1, keepdims = True)
+        index = EmbeddingIndex()
+        index.add(vectors, np.repeat(np.arange(1, students + 1), 5))
+
+        durations = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query)
+            durations.append(time.perf_counter() - start)
+        results[f"index_search_{students}"] = summarize(durations)
+
+#######################################
+
+# Function: bench_db
+# Purpose: Time bulk attendance writes and dashboard/report queries on a synthetic database
+def bench_db(workdir, args, results):
+    db_path = os.path.join(workdir, "facetrack.db")
+    original_path = db_handler.DB_PATH
+    db_handler.DB_PATH = db_path
+    try:
+        start = time.perf_counter()
+        rows = synthetic.make_attendance_db(db_path, args.students, args.days, seed = args.seed)
+        results["seed_history"] = summarize([time.perf_counter() - start])
+        results["seed_history"]["rows"] = rows
+
+        rolls = [str(i) for i in range(1, args.students + 1)]
+
+        # One mark per student for today, as a full day of recognitions would do
+        durations = []
+        for roll in rolls:
+            start = time.perf_counter()
+            db_handler.mark_attendance(roll, "Present")
+            durations.append(time.perf_counter() - start)
+        results["mark_attendance"] = summarize(durations)
+
+        def dashboard():
+            db_handler.get_all_students()
+            db_handler.get_attendance_by_date()
+
+        results["dashboard_query"] = measure(dashboard, args.repeat * 5)
+        results["student_history"] = measure(
+            lambda: db_handler.get_attendance_by_student(rolls[len(rolls) // 2]), args.repeat * 5
+        )
+
+        end = datetime.now().date()
+        start = end - timedelta(days = args.days)
+        results["attendance_report"] = measure(
+            lambda: db_handler.get_attendance_report(start.isoformat(), end.isoformat()), args.repeat
+        )
+    finally:
+        db_handler.DB_PATH = original_path
+
+    return {"sqlite": db_handler.sqlite3.sqlite_version}
+
+#######################################
+
+# Function: compare
+# Purpose: Print the p50 change of every benchmark against a previous results file
+def compare(current, baseline_path):
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+
+    print(f"\n{'benchmark':<20}{'base p50 ms':>14}{'new p50 ms':>14}{'change':>10}")
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            print(f"{name:<20}{'-':>14}{result['p50_ms']:>14.3f}{'new':>10}")
+            continue
+        change = (result["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0.0
+        print(f"{name:<20}{old['p50_ms']:>14.3f}{result['p50_ms']:>14.3f}{change:>+9.1f}%")
+
+#######################################
+
+# Function: main
+# Purpose: Parse arguments, run the selected benchmark groups and write JSON results
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "FaceTrack benchmark suite")
+    parser.add_argument("--students", type = int, default = 100)
+    parser.add_argument("--samples", type = int, default = 10, help = "face images per student")
+    parser.add_argument("--days", type = int, default = 30, help = "days of attendance history")
+    parser.add_argument("--queries", type = int, default = 200, help = "faces to predict")
+    parser.add_argument("--frames", type = int, default = 300, help = "frames for the frame-path benchmark")
+    parser.add_argument("--repeat", type = int, default = 3)
+    parser.add_argument("--seed", type = int, default = 42)
+    parser.add_argument("--only", choices = ["vision", "db"], help = "run a single group")
+    parser.add_argument("--out", help = "write results JSON here")
+    parser.add_argument("--compare", help = "previous results JSON to compare against")
+    parser.add_argument("--keep", action = "store_true", help = "keep the temporary work directory")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix = "facetrack_bench_")
+    results = {}
+    meta = {
+        "started": datetime.now().isoformat(timespec = "seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": vars(args),
+    }
+
+    try:
+        if args.only in (None, "vision"):
+            try:
+                meta.update(bench_vision(workdir, args, results))
+            except ImportError as e:
+                print(f"⚠️ Skipping vision benchmarks: {e}")
+            try:
+                bench_index(args, results)
+            except ImportError as e:
+                print(f"⚠️ Skipping index benchmarks: {e}")
+        if args.only in (None, "db"):
+            meta.update(bench_db(workdir, args, results))
+    finally:
+        if args.keep:
+            print(f"Work directory kept at {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors = True)
+
+    report = {"meta": meta, "results": results}
+
+    for name, r in results.items():
+        print(f"{name:<20} n={r['n']:<6} p50={r['p50_ms']:.3f}ms  p95={r['p95_ms']:.3f}ms  mean={r['mean_ms']:.3f}ms")
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok = True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent = 2)
+        print(f"✅ Results written to {args.out}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+    return report
+
+############### MAIN ###############
+if __name__ == "__main__":
+    main()
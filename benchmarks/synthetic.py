@@ -0,0 +1,100 @@
+# benchmarks/synthetic.py
+############### IMPORTS ###############
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+############## CONSTANTS ##############
+
+DEPARTMENTS = ["BCA", "BBA", "MBA", "MCA"]
+FACE_SIZE = 100
+
+############## FUNCTIONS ##############
+
+# Function: make_face_dataset
+# Purpose: Write `samples` synthetic grayscale faces per student as <id>_<n>.jpg.
+#          Each student gets a fixed low-frequency pattern so LBPH can tell them apart;
+#          every sample adds its own noise and brightness shift.
+def make_face_dataset(path, students, samples = 10, seed = 42, start_id = 1):
+    import cv2
+    import numpy as np
+
+    os.makedirs(path, exist_ok = True)
+    rng = np.random.default_rng(seed)
+
+    for student_id in range(start_id, start_id + students):
+        base = rng.integers(0, 256, (8, 8)).astype(np.uint8)
+        base = cv2.resize(base, (FACE_SIZE, FACE_SIZE), interpolation = cv2.INTER_CUBIC).astype(np.int16)
+        for n in range(1, samples + 1):
+            noise = rng.normal(0, 12, base.shape) + rng.integers(-20, 20)
+            face = np.clip(base + noise, 0, 255).astype(np.uint8)
+            cv2.imwrite(os.path.join(path, f"{student_id}_{n}.jpg"), face)
+
+    return students * samples
+
+#######################################
+
+# Function: make_face_samples
+# Purpose: Return in-memory faces (list of arrays) and their student IDs, without touching disk
+def make_face_samples(students, samples = 1, seed = 7, start_id = 1):
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    faces, ids = [], []
+    for student_id in range(start_id, start_id + students):
+        base = rng.integers(0, 256, (8, 8)).astype(np.uint8)
+        base = cv2.resize(base, (FACE_SIZE, FACE_SIZE), interpolation = cv2.INTER_CUBIC).astype(np.int16)
+        for _ in range(samples):
+            faces.append(np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8))
+            ids.append(student_id)
+    return faces, ids
+
+#######################################
+
+# Function: make_attendance_db
+# Purpose: Fill a database with `students` students and `days` days of attendance history.
+#          Rolls are the numeric IDs 1..students so they line up with the face dataset.
+#          Each student gets their own attendance rate around `present_rate`.
+def make_attendance_db(db_path, students, days = 30, present_rate = 0.85, seed = 42,
+                       departments = DEPARTMENTS, end_date = None):
+    from logic import db_handler
+
+    rnd = random.Random(seed)
+    success, msg = db_handler.ensure_schema(db_path)
+    if not success:
+        raise Exception(msg)
+
+    connect = sqlite3.connect(db_path)
+    cursor = connect.cursor()
+
+    cursor.executemany(
+        "INSERT INTO students (name, roll, department, email, phone, photo_path) VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (f"Student {i}", str(i), departments[i % len(departments)], f"{i}@example.com", "0000000000", "")
+            for i in range(1, students + 1)
+        ),
+    )
+
+    end_date = end_date or datetime.now().date()
+    rates = [min(1.0, max(0.0, rnd.gauss(present_rate, 0.1))) for _ in range(students + 1)]
+    rows = 0
+    for d in range(days, 0, -1):
+        day = end_date - timedelta(days = d)
+        if day.weekday() >= 5:
+            continue  # No classes at the weekend
+        batch = []
+        for student_id in range(1, students + 1):
+            if rnd.random() < rates[student_id]:
+                moment = datetime(day.year, day.month, day.day, 9, 0) + timedelta(seconds = rnd.randint(0, 3 * 3600))
+                batch.append((student_id, moment.strftime("%Y-%m-%d %H:%M:%S"), "Present"))
+        cursor.executemany("INSERT INTO attendance (student_id, timestamp, status) VALUES (?, ?, ?)", batch)
+        rows += len(batch)
+
+    connect.commit()
+    connect.close()
+
+    # Rows were inserted directly, so bring the rollup tables in line
+    db_handler.rebuild_attendance_rollups(db_path)
+    return rows
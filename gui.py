@@ -1,12 +1,9 @@
 ############### IMPORTS ###############
 import customtkinter as ctk
-from datetime import datetime
+from datetime import datetime, timedelta
 import threading
 import csv
 import os
-import cv2
-from PIL import Image, ImageTk
-import numpy as np
 import sys
 from tkinter import filedialog
 import shutil
@@ -22,11 +19,23 @@ IMAGES_DIR = os.path.join(DATA_DIR, "images")
 for p in (DATA_DIR, STUDENTS_DIR, IMAGES_DIR):
     os.makedirs(p, exist_ok = True)
 
+# Rows fetched per page in the attendance records list
+ATTENDANCE_PAGE_SIZE = 50
+
+# Room this kiosk stands in, so marks link to the session running there (FACETRACK_ROOM)
+KIOSK_ROOM = os.environ.get("FACETRACK_ROOM") or None
+
+# Student search box: wait this long after the last keystroke, show this many matches
+SEARCH_DELAY_MS = 250
+SEARCH_RESULT_LIMIT = 8
+
 # Import DB 
 from logic import db_handler
-from logic.camera import Camera
-from logic.face_trainer import Trainer
-from logic.user_auth import Authenticator
+from logic import metrics
+from logic import startup
+
+# OpenCV, NumPy, PIL and the camera/recognition classes are imported where they are
+# used (or by the background warm-up) so the window can appear before they load.
 #######################################
 
 # CLASS: AttendanceApp
@@ -35,11 +44,10 @@ class AttendanceApp(ctk.CTk):
 
     # FN: __init__
     # Purpose: Initialize the main window and set up UI elements
-    def __init__(self):
-        # Backend instances
-        self.camera_obj = Camera()
-        self.trainer_obj = Trainer()
-        self.authenticator = Authenticator()
+    def __init__(self, warmup = True):
+        # Backend instances (camera_obj, authenticator, trainer_obj) are created lazily,
+        # by warm_up_backend() in the background or on first use
+        self._backend_lock = threading.Lock()
 
         super().__init__()
 
@@ -110,11 +118,51 @@ class AttendanceApp(ctk.CTk):
         self.content_frame = ctk.CTkFrame(self, fg_color = "#FFFFFF")
         self.content_frame.pack(side = "right", fill = "both", expand = True)
 
-        self.update_dashboard()
+        # Pages are built once and cached; see show_page()
+        self.pages = {}
+        self.page_versions = {}
+        self.current_page = None
+
+        self.show_dashboard()
 
         # Bind window close event to properly release camera
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+        startup.mark("window built")
+
+        # Load the heavy parts once the window is on screen
+        if warmup:
+            self.after(100, lambda: threading.Thread(target = self.warm_up_backend, daemon = True).start())
+
+    #######################################
+
+    # FN: warm_up_backend
+    # Purpose: Import OpenCV and load the recognizer, cascade and camera on a background thread,
+    #          so the first scan doesn't pay for them. Prints the startup report when done.
+    def warm_up_backend(self):
+        startup.mark("warm-up started")
+        with self._backend_lock:
+            try:
+                with startup.phase("import cv2/numpy/PIL"):
+                    import cv2
+                    import numpy
+                    from PIL import Image, ImageTk
+
+                with startup.phase("load recognizer + cascade"):
+                    from logic.user_auth import Authenticator
+                    if not hasattr(self, 'authenticator'):
+                        self.authenticator = Authenticator()
+
+                with startup.phase("open camera"):
+                    from logic.camera import Camera
+                    if not hasattr(self, 'camera_obj') or not self.camera_obj.cap.isOpened():
+                        self.camera_obj = Camera()
+            except Exception as e:
+                print(f"⚠️ Warm-up incomplete: {e}")
+
+        startup.mark("warm-up finished")
+        print(startup.report())
+
     #######################################
     
     # FN: on_closing
@@ -126,8 +174,9 @@ class AttendanceApp(ctk.CTk):
                 self.camera_obj.cap.release()
                 print("Camera released on application close")
             
-            # Close all OpenCV windows
-            cv2.destroyAllWindows()
+            # Close all OpenCV windows (only if OpenCV was ever loaded)
+            if "cv2" in sys.modules:
+                sys.modules["cv2"].destroyAllWindows()
             
         except Exception as e:
             print(f"Error during cleanup: {e}")
@@ -151,17 +200,74 @@ class AttendanceApp(ctk.CTk):
 
     #######################################
 
-    # FN: show_dashboard
-    # Purpose: Display dashboard content in content frame
+    # FN: show_page
+    # Purpose: Show a cached page, building it on first use. The refresh function only runs
+    #          when the data the page depends on has changed since its last refresh.
+    def show_page(self, name, title, builder, refresh = None, depends_on = ()):
+        self.title_label.configure(text = title)
+
+        if self.current_page is not None and self.current_page != name:
+            self.pages[self.current_page].pack_forget()
+
+        page = self.pages.get(name)
+        if page is None or not page.winfo_exists():
+            page = ctk.CTkFrame(self.content_frame, fg_color = "#FFFFFF")
+            builder(page)
+            self.pages[name] = page
+            self.page_versions.pop(name, None)
+
+        if self.current_page != name or not page.winfo_ismapped():
+            page.pack(fill = "both", expand = True)
+        self.current_page = name
+
+        if refresh is not None:
+            # Today's date is part of the stamp so "today" views roll over at midnight;
+            # the database version catches writes from other processes (e.g. the recognition server)
+            version = (datetime.now().date(), db_handler.get_database_version()) + \
+                tuple(db_handler.get_data_version(t) for t in depends_on)
+            if self.page_versions.get(name) != version:
+                refresh()
+                self.page_versions[name] = version
+
+    #######################################
+
+    # FN: show_dashboard / show_attendance / show_register / show_settings
+    # Purpose: Sidebar navigation
     def show_dashboard(self):
-        self.title_label.configure(text = "Dashboard")
-        self.clear_content()
+        self.show_page("dashboard", "Dashboard", self.build_dashboard,
+                       refresh = self.update_dashboard, depends_on = ("students", "attendance"))
+
+    def show_attendance(self):
+        self.show_page("attendance", "Take Attendance", self.build_attendance,
+                       refresh = self.refresh_attendance_records, depends_on = ("attendance",))
 
-        # Update stats first
-        self.update_dashboard()
+    def show_register(self):
+        self.show_page("register", "Register Student", self.build_register)
 
+    def show_settings(self):
+        self.show_page("settings", "Settings", self.build_settings)
+
+    #######################################
+
+    # FN: refresh_visible_page
+    # Purpose: Re-show the current page so it refreshes if its data version changed
+    def refresh_visible_page(self):
+        navigation = {
+            "dashboard": self.show_dashboard,
+            "attendance": self.show_attendance,
+            "register": self.show_register,
+            "settings": self.show_settings,
+        }
+        if self.current_page in navigation:
+            navigation[self.current_page]()
+
+    #######################################
+
+    # FN: build_dashboard
+    # Purpose: Build dashboard content in content frame
+    def build_dashboard(self, page):
         # Create a frame for summary cards
-        summary_frame = ctk.CTkFrame(self.content_frame, fg_color = "#FFFFFF")
+        summary_frame = ctk.CTkFrame(page, fg_color = "#FFFFFF")
         summary_frame.pack(fill = "x", padx = 30, pady = 20)
 
         # Card Styles
@@ -196,18 +302,35 @@ class AttendanceApp(ctk.CTk):
         self.absent_value = ctk.CTkLabel(absent_card, text = str(self.today_absent), font = card_font, text_color = "white")
         self.absent_value.pack() 
 
-        # Placeholder for future graph or logs
-        graph_frame = ctk.CTkFrame(self.content_frame, fg_color="#F3F2F1", corner_radius=10)
+        # Student search (search-as-you-type over the roster)
+        search_frame = ctk.CTkFrame(page, fg_color = "#F3F2F1", corner_radius = 10)
+        search_frame.pack(fill = "x", padx = 30, pady = (0, 0))
+
+        self.search_entry = ctk.CTkEntry(search_frame, placeholder_text = "Search students by name, roll, department or email",
+                                         width = 500, font = ("Segoe UI", 14))
+        self.search_entry.pack(anchor = "w", padx = 15, pady = (10, 5))
+        self.search_entry.bind("<KeyRelease>", lambda event: self.schedule_student_search())
+
+        self.search_results = ctk.CTkFrame(search_frame, fg_color = "#F3F2F1")
+        self.search_results.pack(fill = "x", padx = 15, pady = (0, 10))
+
+        # Attendance trend chart (drawn from the daily rollup table)
+        graph_frame = ctk.CTkFrame(page, fg_color="#F3F2F1", corner_radius=10)
         graph_frame.pack(fill = "both", expand = True, padx = 30, pady = 20)
-        graph_label = ctk.CTkLabel(graph_frame, text = "Attendance Overview (Coming Soon)", font = ("Segoe UI", 16), text_color = "#201F1E")
-        graph_label.place(relx = 0.5, rely = 0.5, anchor = "center")
+        graph_label = ctk.CTkLabel(graph_frame, text = "Attendance Overview (Last 30 Days)", font = ("Segoe UI", 16, "bold"), text_color = "#201F1E")
+        graph_label.pack(anchor = "w", padx = 15, pady = (10, 0))
+
+        self.chart_canvas = ctk.CTkCanvas(graph_frame, bg = "#F3F2F1", highlightthickness = 0)
+        self.chart_canvas.pack(fill = "both", expand = True, padx = 15, pady = 10)
+        self.chart_canvas.bind("<Configure>", lambda event: self.draw_attendance_chart())
 
     #######################################
 
     # FN: update_dashboard
     # Purpose: Refresh dashboard statistics (Total Students, Present, Absent)
+    @metrics.timed("gui.update_dashboard")
     def update_dashboard(self):
-        from logic.db_handler import get_all_students, get_attendance_by_date
+        from logic.db_handler import get_all_students, get_attendance_by_date, get_daily_attendance_trend
     
         # Fetch total students from DB
         success, students = get_all_students()
@@ -219,7 +342,8 @@ class AttendanceApp(ctk.CTk):
         # Fetch today's attendance
         success, attendance_records = get_attendance_by_date()
         if success:
-            present_count = len([r for r in attendance_records if r['status'] == 'Present'])
+            # Distinct students: with class sessions one student can be present several times a day
+            present_count = len({r['roll'] for r in attendance_records if r['status'] == 'Present'})
         else:
             present_count = 0
 
@@ -227,6 +351,10 @@ class AttendanceApp(ctk.CTk):
         self.today_present = present_count
         self.today_absent = total - self.today_present
 
+        # Fetch the 30-day trend for the chart
+        success, trend = get_daily_attendance_trend()
+        self.attendance_trend = trend if success else []
+
         # Update labels
         if hasattr(self, "total_value"):
             self.total_value.configure(text = str(self.total_students))
@@ -234,17 +362,98 @@ class AttendanceApp(ctk.CTk):
             self.attendance_value.configure(text = str(self.today_present))
         if hasattr(self, "absent_value"):
             self.absent_value.configure(text = str(self.today_absent))
+        if hasattr(self, "chart_canvas"):
+            self.draw_attendance_chart()
 
     #######################################
 
-    # FN: show_attendance
-    # Purpose: Display attendance module with single capture and attendance records
-    def show_attendance(self):
-        self.title_label.configure(text = "Take Attendance")
-        self.clear_content()
+    # FN: schedule_student_search
+    # Purpose: Debounce the search box - only query once typing pauses for SEARCH_DELAY_MS
+    def schedule_student_search(self):
+        if getattr(self, "_search_job", None):
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DELAY_MS, self.run_student_search)
+
+    #######################################
+
+    # FN: run_student_search
+    # Purpose: Query the roster index and list the best matches under the search box
+    def run_student_search(self):
+        from logic.db_handler import search_students
+
+        self._search_job = None
+        for widget in self.search_results.winfo_children():
+            widget.destroy()
+
+        query = self.search_entry.get().strip()
+        if not query:
+            return
+
+        success, students = search_students(query, limit = SEARCH_RESULT_LIMIT)
+        if not success:
+            print(f"Error searching students: {students}")
+            return
+        if not students:
+            ctk.CTkLabel(self.search_results, text = "No matching students", font = ("Segoe UI", 13, "italic"),
+                         text_color = "#5A5A5A").pack(anchor = "w")
+            return
+
+        for student in students:
+            text = f"{student['name']}  •  Roll {student['roll']}  •  {student['department'] or '-'}  •  {student['email'] or '-'}"
+            ctk.CTkLabel(self.search_results, text = text, font = ("Segoe UI", 13), text_color = "#201F1E").pack(anchor = "w")
+
+    #######################################
+
+    # FN: draw_attendance_chart
+    # Purpose: Draw a stacked bar chart of Present/Absent counts for the last 30 days
+    def draw_attendance_chart(self):
+        try:
+            canvas = self.chart_canvas
+            canvas.delete("all")
+            width = canvas.winfo_width()
+            height = canvas.winfo_height()
+            if width < 50 or height < 50:
+                return
+
+            # One bar per day, including days without any records
+            counts = {row["day"]: row for row in getattr(self, "attendance_trend", [])}
+            today = datetime.now().date()
+            days = [(today - timedelta(days = i)).isoformat() for i in range(29, -1, -1)]
+
+            peak = max([counts[d]["present"] + counts[d]["absent"] for d in days if d in counts] + [1])
+            left, bottom, top = 40, height - 30, 10
+            slot = (width - left - 10) / len(days)
+            bar = max(slot * 0.7, 1)
+
+            canvas.create_line(left, top, left, bottom, fill = "#5A5A5A")
+            canvas.create_line(left, bottom, width - 10, bottom, fill = "#5A5A5A")
+            canvas.create_text(left - 5, top, text = str(peak), anchor = "e", fill = "#5A5A5A", font = ("Segoe UI", 10))
+            canvas.create_text(left - 5, bottom, text = "0", anchor = "e", fill = "#5A5A5A", font = ("Segoe UI", 10))
+
+            for i, day in enumerate(days):
+                x0 = left + i * slot + (slot - bar) / 2
+                row = counts.get(day, {"present": 0, "absent": 0})
+                present_h = (bottom - top) * row["present"] / peak
+                absent_h = (bottom - top) * row["absent"] / peak
+                if present_h:
+                    canvas.create_rectangle(x0, bottom - present_h, x0 + bar, bottom, fill = "#107C41", width = 0)
+                if absent_h:
+                    canvas.create_rectangle(x0, bottom - present_h - absent_h, x0 + bar, bottom - present_h,
+                                            fill = "#D83B01", width = 0)
+                if i % 5 == 4:
+                    canvas.create_text(x0 + bar / 2, bottom + 12, text = day[5:], fill = "#5A5A5A", font = ("Segoe UI", 10))
+
+        except Exception as e:
+            print(f"Error drawing attendance chart: {e}")
+
+    #######################################
+
+    # FN: build_attendance
+    # Purpose: Build attendance module with single capture and attendance records
+    def build_attendance(self, page):
 
         # Main container for Attendance Section
-        attendance_frame = ctk.CTkFrame(self.content_frame, fg_color = "#FFFFFF")
+        attendance_frame = ctk.CTkFrame(page, fg_color = "#FFFFFF")
         attendance_frame.pack(fill = "both", expand = True, padx = 30, pady = 20)
 
         # Left Side: Camera Capture Section
@@ -294,9 +503,6 @@ class AttendanceApp(ctk.CTk):
         self.attendance_tree = ctk.CTkScrollableFrame(records_frame, width = 400, height = 350)
         self.attendance_tree.pack(padx = 10, pady = 10, fill = "both", expand = True)
 
-        # Load today's attendance records
-        self.refresh_attendance_records()
-
     #######################################
 
     # FN: capture_and_recognize
@@ -314,16 +520,22 @@ class AttendanceApp(ctk.CTk):
         # Disable button and show processing state
         self.capture_btn.configure(text = "Processing...", state = "disabled")
         try:
-            # Initialize camera if not already done
-            if not hasattr(self, 'camera_obj'):
-                self.camera_obj = Camera()
-            elif not self.camera_obj.cap.isOpened():
-                # Reinitialize camera if it was closed
-                self.camera_obj = Camera()
-            
-            # Initialize authenticator if not already done
-            if not hasattr(self, 'authenticator'):
-                self.authenticator = Authenticator()
+            from logic.camera import Camera
+            from logic.frame_buffers import PreviewImage
+            from logic.user_auth import Authenticator
+
+            # Waits only if the background warm-up is still loading these
+            with self._backend_lock:
+                # Initialize camera if not already done
+                if not hasattr(self, 'camera_obj'):
+                    self.camera_obj = Camera()
+                elif not self.camera_obj.cap.isOpened():
+                    # Reinitialize camera if it was closed
+                    self.camera_obj = Camera()
+                
+                # Initialize authenticator if not already done
+                if not hasattr(self, 'authenticator'):
+                    self.authenticator = Authenticator()
             
             # Check if authenticator is ready
             if not self.authenticator.is_ready():
@@ -332,48 +544,37 @@ class AttendanceApp(ctk.CTk):
             
             self.status_label.configure(text = "Opening camera...", text_color = "blue")
             
-            # Capture a single frame
-            ret, frame = self.camera_obj.cap.read()
-            if not ret:
+            # Capture a few frames and let the decision engine vote on the largest face
+            student_id, confidence, frame = self.authenticator.identify(self.camera_obj.cap)
+            if frame is None:
                 messagebox.showerror("Error", "Failed to capture image from camera!")
                 return
             
-            # Show captured image
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(frame_rgb)
-            img = img.resize((400, 300))
-            imgtk = ImageTk.PhotoImage(img)
-            self.camera_placeholder.configure(image = imgtk, text = "")
-            self.camera_placeholder.image = imgtk
-            
-            # Perform face recognition
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.authenticator.face_cascade.detectMultiScale(
-                gray, scaleFactor = 1.3, minNeighbors = 5, minSize = (50, 50)
-            )
+            # Show captured image (one PhotoImage reused for every scan)
+            with metrics.timer("gui.preview"):
+                if not hasattr(self, 'preview'):
+                    self.preview = PreviewImage((400, 300))
+                imgtk = self.preview.update(frame)
+                self.camera_placeholder.configure(image = imgtk, text = "")
+                self.camera_placeholder.image = imgtk
             
-            if len(faces) == 0:
+            if confidence is None:
                 messagebox.showwarning("No Face Detected", "No face detected in the image. Please try again.")
                 self.status_label.configure(text = "No face detected", text_color = "red")
                 return
             
-            # Get the largest face
-            largest_face = max(faces, key=lambda x: x[2] * x[3])
-            x, y, w, h = largest_face
-            face_img = gray[y:y+h, x:x+w]
-            
-            # Predict ID and confidence
-            student_id, confidence = self.authenticator.recognizer.predict(face_img)
-            
-            if confidence < 70:  # Good match
+            if student_id is not None:  # Accepted by the decision engine
                 # Get student details
                 from logic.db_handler import get_student_by_roll, mark_attendance
                 success, student = get_student_by_roll(str(student_id))
                 
                 if success:
                     # Mark attendance
-                    success, msg = mark_attendance(str(student_id), "Present")
+                    success, msg = mark_attendance(str(student_id), "Present", KIOSK_ROOM)
                     if success:
+                        # The mark is journaled; let it reach SQLite before the page re-reads
+                        db_handler.wait_for_attendance_writes()
+
                         # Show success popup
                         messagebox.showinfo("Attendance Marked", 
                                           f"✅ {student['name']} (ID: {student_id})\nAttendance marked successfully!")
@@ -381,11 +582,8 @@ class AttendanceApp(ctk.CTk):
                         # Update status
                         self.status_label.configure(text = f"{student['name']} - Present", text_color = "green")
                         
-                        # Refresh attendance records
-                        self.refresh_attendance_records()
-                        
-                        # Update dashboard
-                        self.update_dashboard()
+                        # Refresh this page; the dashboard catches up when it is next shown
+                        self.refresh_visible_page()
                     else:
                         if "already marked" in msg.lower():
                             messagebox.showinfo("Already Marked", 
@@ -416,18 +614,21 @@ class AttendanceApp(ctk.CTk):
     #######################################
 
     # FN: refresh_attendance_records
-    # Purpose: Refresh the attendance records display
+    # Purpose: Refresh the attendance records display with the first page of today's records
+    @metrics.timed("gui.refresh_records")
     def refresh_attendance_records(self):
         try:
             # Clear existing records
             for widget in self.attendance_tree.winfo_children():
                 widget.destroy()
+            self.attendance_next_page = None
+            self._loading_page = False
             
-            # Get today's attendance records
-            from logic.db_handler import get_attendance_by_date
-            success, records = get_attendance_by_date()
+            # Get the first page of today's attendance records
+            from logic.db_handler import get_attendance_page_by_date
+            success, page = get_attendance_page_by_date(page_size = ATTENDANCE_PAGE_SIZE)
             
-            if success and records:
+            if success and page["records"]:
                 # Create header
                 header_frame = ctk.CTkFrame(self.attendance_tree, fg_color = "#0078D4")
                 header_frame.pack(fill = "x", pady = 2)
@@ -437,20 +638,16 @@ class AttendanceApp(ctk.CTk):
                 ctk.CTkLabel(header_frame, text = "Roll No.", font = ("Segoe UI", 14, "bold"), text_color = "white").pack(side = "left", padx = 5)
                 ctk.CTkLabel(header_frame, text = "Status", font = ("Segoe UI", 14, "bold"), text_color = "white").pack(side = "left", padx = 5)
                 
-                # Add records
-                for record in records:
-                    record_frame = ctk.CTkFrame(self.attendance_tree, fg_color = "#F3F2F1")
-                    record_frame.pack(fill = "x", pady = 1)
-                    
-                    # Format timestamp
-                    timestamp = datetime.strptime(record['timestamp'], '%Y-%m-%d %H:%M:%S').strftime('%I:%M:%S %p') 
-                    
-                    ctk.CTkLabel(record_frame, text = timestamp, font = ("Segoe UI", 13)).pack(side = "left", padx = 5)
-                    ctk.CTkLabel(record_frame, text = record['name'], font = ("Segoe UI", 13)).pack(side = "left", padx = 5, expand = True)
-                    ctk.CTkLabel(record_frame, text = record['roll'], font = ("Segoe UI", 13)).pack(side = "left", padx = 5)
-                    
-                    status_color = "#107C41" if record['status'] == 'Present' else "#D83B01"
-                    ctk.CTkLabel(record_frame, text = record['status'], font = ("Segoe UI", 13), text_color = status_color).pack(side = "left", padx = 5)
+                self.add_attendance_rows(page["records"])
+                self.attendance_next_page = page["next"]
+
+                # Fetch the next page when the list is scrolled to the bottom
+                scrollbar_set = self.attendance_tree._scrollbar.set
+                def on_scroll(first, last):
+                    scrollbar_set(first, last)
+                    if float(last) >= 0.98:
+                        self.load_more_attendance_records()
+                self.attendance_tree._parent_canvas.configure(yscrollcommand = on_scroll)
             else:
                 # No records message
                 no_records_label = ctk.CTkLabel(self.attendance_tree, text = "No attendance records for today", 
@@ -462,14 +659,52 @@ class AttendanceApp(ctk.CTk):
 
     #######################################
 
-    # FN: show_register
-    # Purpose: Display student registration form
-    def show_register(self):
-        self.title_label.configure(text = "Register Student")
-        self.clear_content()
+    # FN: load_more_attendance_records
+    # Purpose: Append the next page of today's records (called as the list reaches its end)
+    def load_more_attendance_records(self):
+        if not getattr(self, "attendance_next_page", None) or self._loading_page:
+            return
+
+        self._loading_page = True
+        try:
+            from logic.db_handler import get_attendance_page_by_date
+            success, page = get_attendance_page_by_date(page_size = ATTENDANCE_PAGE_SIZE, after = self.attendance_next_page)
+            if success:
+                self.add_attendance_rows(page["records"])
+                self.attendance_next_page = page["next"]
+            else:
+                print(f"Error loading attendance records: {page}")
+                self.attendance_next_page = None
+        finally:
+            self._loading_page = False
+
+    #######################################
+
+    # FN: add_attendance_rows
+    # Purpose: Render attendance records as rows at the end of the records list
+    def add_attendance_rows(self, records):
+        for record in records:
+            record_frame = ctk.CTkFrame(self.attendance_tree, fg_color = "#F3F2F1")
+            record_frame.pack(fill = "x", pady = 1)
+            
+            # Format timestamp
+            timestamp = datetime.strptime(record['timestamp'], '%Y-%m-%d %H:%M:%S').strftime('%I:%M:%S %p') 
+            
+            ctk.CTkLabel(record_frame, text = timestamp, font = ("Segoe UI", 13)).pack(side = "left", padx = 5)
+            ctk.CTkLabel(record_frame, text = record['name'], font = ("Segoe UI", 13)).pack(side = "left", padx = 5, expand = True)
+            ctk.CTkLabel(record_frame, text = record['roll'], font = ("Segoe UI", 13)).pack(side = "left", padx = 5)
+            
+            status_color = "#107C41" if record['status'] == 'Present' else "#D83B01"
+            ctk.CTkLabel(record_frame, text = record['status'], font = ("Segoe UI", 13), text_color = status_color).pack(side = "left", padx = 5)
+
+    #######################################
+
+    # FN: build_register
+    # Purpose: Build student registration form
+    def build_register(self, page):
 
         # Main Container (Horizontal Split: Left = Form, Right = Photo Preview)
-        main_frame = ctk.CTkFrame(self.content_frame, fg_color = "#FFFFFF")
+        main_frame = ctk.CTkFrame(page, fg_color = "#FFFFFF")
         main_frame.pack(fill = "both", expand = True, padx = 30, pady = 20)
 
         # ---------------- LEFT PANEL: Registration Form ----------------
@@ -548,6 +783,14 @@ class AttendanceApp(ctk.CTk):
                            command = self.train_faces)
         train_btn.pack(pady = (10, 10))
 
+        # Bulk enrollment from existing photos/videos
+        bulk_btn = ctk.CTkButton(form_frame, text = "Bulk Enroll from Folder",
+                           fg_color = "#0078D4", hover_color = "#106EBE",
+                           text_color ="white", width = 250, height = 45,
+                           font = ("Segoe UI", 18, "bold"),
+                           command = self.bulk_enroll)
+        bulk_btn.pack(pady = (10, 10))
+
 
         # Note
         note_label = ctk.CTkLabel(photo_frame, text = "Captures 50 images for training.\nEnsure good lighting and a clear face.\nPress 'q' to stop capturing early.",
@@ -558,6 +801,9 @@ class AttendanceApp(ctk.CTk):
 
     def train_faces(self):
         try:
+            if not hasattr(self, 'trainer_obj'):
+                from logic.face_trainer import Trainer
+                self.trainer_obj = Trainer()
             self.trainer_obj.train_model(images_path = os.path.join("data", "images"))
             
             # Reload authenticator if it exists
@@ -570,6 +816,66 @@ class AttendanceApp(ctk.CTk):
 
     #######################################
 
+    # FN: add_to_model
+    # Purpose: Add one student's captured images to the trained model without retraining everyone
+    def add_to_model(self, paths):
+        def set_status(text, color):
+            if self.register_status.winfo_exists():
+                self.register_status.configure(text = text, text_color = color)
+
+        try:
+            from logic.face_trainer import Trainer
+            Trainer(dataset_path = os.path.join("data", "images")).add_images(paths)
+            if hasattr(self, 'authenticator'):
+                self.after(0, self.authenticator.reload_model)
+            self.after(0, lambda: set_status("Student registered and added to the model!", "green"))
+        except Exception as e:
+            error = f"Model not updated: {e}"
+            self.after(0, lambda: set_status(error, "red"))
+
+    #######################################
+
+    # FN: bulk_enroll
+    # Purpose: Enroll students from a folder of per-roll photos/videos, then train once
+    def bulk_enroll(self):
+        folder = filedialog.askdirectory(title = "Select folder with one sub-folder per roll number")
+        if not folder:
+            return
+
+        self.register_status.configure(text = "Bulk enrollment started...", text_color = "blue")
+
+        def set_status(text, color):
+            if self.register_status.winfo_exists():
+                self.register_status.configure(text = text, text_color = color)
+
+        def progress(done, total, roll):
+            self.after(0, lambda: set_status(f"Enrolled {done}/{total} students (last: {roll})", "blue"))
+
+        def bulk_thread():
+            from logic.bulk_enroll import BulkEnroller
+            try:
+                summary = BulkEnroller(out_dir = os.path.join("data", "images")).enroll(folder, progress = progress)
+            except Exception as e:
+                error = f"Error: {e}"
+                self.after(0, lambda: set_status(error, "red"))
+                return
+
+            def finish():
+                if summary["trained"] and hasattr(self, 'authenticator'):
+                    self.authenticator.reload_model()
+                set_status(f"Enrolled {summary['students']} students ({summary['samples']} samples)", "green")
+                message = (f"✅ Saved {summary['samples']} face samples for {summary['students']} students.\n"
+                           f"Model trained: {'Yes' if summary['trained'] else 'No'}")
+                if summary["errors"]:
+                    message += "\n\nProblems:\n" + "\n".join(summary["errors"][:10])
+                messagebox.showinfo("Bulk Enrollment", message)
+
+            self.after(0, finish)
+
+        threading.Thread(target = bulk_thread, daemon = True).start()
+
+    #######################################
+
     # FN: capture_photo
     # Purpose: Capture 50 face images for training the face recognition model.
     def capture_photo(self):
@@ -583,11 +889,14 @@ class AttendanceApp(ctk.CTk):
         # Start face capture in a separate thread to avoid blocking UI
         def capture_faces_thread():
             try:
+                from logic.camera import Camera
+
                 # Initialize camera for capture
-                if not hasattr(self, 'camera_obj'):
-                    self.camera_obj = Camera()
-                elif not self.camera_obj.cap.isOpened():
-                    self.camera_obj = Camera()
+                with self._backend_lock:
+                    if not hasattr(self, 'camera_obj'):
+                        self.camera_obj = Camera()
+                    elif not self.camera_obj.cap.isOpened():
+                        self.camera_obj = Camera()
                 
                 # Use the camera object to capture 50 face images
                 count = self.camera_obj.capture_faces(
@@ -624,6 +933,7 @@ class AttendanceApp(ctk.CTk):
     # Purpose: Update the photo preview with the captured image
     def update_photo_preview(self, image_path):
         try:
+            from PIL import Image, ImageTk
             img = Image.open(image_path)
             img = img.resize((250, 250))
             imgtk = ImageTk.PhotoImage(img)
@@ -637,6 +947,10 @@ class AttendanceApp(ctk.CTk):
     # FN: upload_photo
     # Purpose: Save student details to a CSV file and update dashboard stats.
     def upload_photo(self):
+        import cv2
+        import numpy as np
+        from PIL import Image, ImageTk
+
         file_path = filedialog.askopenfilename(
             title = "Select Student Photo",
             filetypes = [("Image Files", "*.png *.jpg *.jpeg")]
@@ -694,23 +1008,26 @@ class AttendanceApp(ctk.CTk):
             self.register_status.configure(text = msg, text_color = "red")
             return
 
+        # An existing model learns the new face right away; the first one still needs Train Model
+        if os.path.exists("trainer.yml"):
+            paths = [os.path.join(img_dir, f) for f in face_images]
+            threading.Thread(target = self.add_to_model, args = (paths,), daemon = True).start()
+
         self.name_entry.delete(0, "end")
         self.roll_entry.delete(0, "end")
         self.dept_entry.set("Select Department")
         self.photo_placeholder.configure(image = None, text = "No Photo")
 
-        # update dashboard count
-        self.update_dashboard()
+        # update dashboard count (lazily, when the dashboard is next shown)
+        self.refresh_visible_page()
 
     #######################################
 
-    # FN: show_settings
-    # Purpose: Display settings page
-    def show_settings(self):
-        self.title_label.configure(text = "Settings")
-        self.clear_content()
+    # FN: build_settings
+    # Purpose: Build settings page
+    def build_settings(self, page):
 
-        settings_frame = ctk.CTkFrame(self.content_frame, fg_color = "#FFFFFF")
+        settings_frame = ctk.CTkFrame(page, fg_color = "#FFFFFF")
         settings_frame.pack(fill = "both", expand = True, padx = 30, pady = 20)
 
         # Title
@@ -802,6 +1119,17 @@ class AttendanceApp(ctk.CTk):
                                text_color = "white", width = 200, font = ("Segoe UI", 14), command = self.reset_project)
         reset_btn.pack(side = "left", padx = 10)
 
+        stats_btn = ctk.CTkButton(btn_container2, text = "Performance Stats", fg_color = "#0078D4", hover_color = "#106EBE",
+                               text_color = "white", width = 200, font = ("Segoe UI", 14), command = self.show_performance_stats)
+        stats_btn.pack(side = "left", padx = 10)
+
+        import_btn = ctk.CTkButton(btn_container2, text = "Import Students (CSV)", fg_color = "#107C41", hover_color = "#0E6F37",
+                               text_color = "white", width = 220, font = ("Segoe UI", 14), command = self.import_students)
+        import_btn.pack(side = "left", padx = 10)
+
+        self.import_status = ctk.CTkLabel(data_frame, text = "", font = ("Segoe UI", 13), text_color = "#201F1E")
+        self.import_status.pack(pady = (0, 10))
+
         # ================= APP INFO =================
 
         info_frame = ctk.CTkFrame(settings_frame, fg_color = "#F3F2F1", corner_radius = 12)
@@ -840,6 +1168,7 @@ class AttendanceApp(ctk.CTk):
         
         try:
             from logic.db_handler import clear_all_data
+            from logic.decision import thresholds_path_for
             
             # Clear database records
             success, msg = clear_all_data()
@@ -855,11 +1184,12 @@ class AttendanceApp(ctk.CTk):
                         os.remove(os.path.join("data/images", file))
                         images_cleared += 1
             
-            # Clear trained model
+            # Clear trained model and its calibrated thresholds (they only fit that model)
             model_cleared = False
-            if os.path.exists("trainer.yml"):
-                os.remove("trainer.yml")
-                model_cleared = True
+            for model_file in ("trainer.yml", thresholds_path_for("trainer.yml")):
+                if os.path.exists(model_file):
+                    os.remove(model_file)
+                    model_cleared = True
             
             # Clear dataset folder
             dataset_cleared = 0
@@ -888,13 +1218,8 @@ class AttendanceApp(ctk.CTk):
             
             messagebox.showinfo("Reset Complete", success_msg)
             
-            # Update dashboard if we're on it
-            if hasattr(self, 'update_dashboard'):
-                self.update_dashboard()
-            
-            # Refresh attendance records if we're on attendance page
-            if hasattr(self, 'refresh_attendance_records'):
-                self.refresh_attendance_records()
+            # Refresh whichever page is showing; the others refresh when next shown
+            self.refresh_visible_page()
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to clear all data: {str(e)}")
@@ -909,24 +1234,105 @@ class AttendanceApp(ctk.CTk):
     ######################################
 
     # FN: clean_duplicates
-    # Purpose: Clean duplicate attendance records for today
+    # Purpose: Find duplicate attendance records across the whole history (dry run first),
+    #          remove them after confirmation and turn on the unique index
     def clean_duplicates(self):
-        from logic.db_handler import clean_duplicate_attendance
+        from logic.db_handler import dedupe_attendance_history
         
         try:
-            success, msg = clean_duplicate_attendance()
+            success, report = dedupe_attendance_history(dry_run = True)
+            if not success:
+                messagebox.showerror("Error", report)
+                return
+            if report["duplicates"] == 0:
+                messagebox.showinfo("Success", "No duplicate attendance records found.")
+                if not report["unique_index"]:
+                    dedupe_attendance_history()
+                return
+
+            examples = "\n".join(f"  Roll {e['roll']} on {e['day']} ({e['status']}): {e['extra_rows']} extra"
+                                 for e in report["examples"][:5])
+            if not messagebox.askyesno("Clean Duplicates",
+                                       f"Found {report['duplicates']} duplicate records on "
+                                       f"{report['days_affected']} days.\n\n{examples}\n\n"
+                                       "Remove them (the earliest record of each day is kept)?"):
+                return
+
+            success, report = dedupe_attendance_history()
             if success:
-                messagebox.showinfo("Success", msg)
-                # Refresh attendance records if we're on the attendance page
-                if hasattr(self, 'refresh_attendance_records'):
-                    self.refresh_attendance_records()
+                messagebox.showinfo("Success", f"Cleaned {report['duplicates']} duplicate attendance records.")
+                # Refresh the visible page if its data changed
+                self.refresh_visible_page()
             else:
-                messagebox.showerror("Error", msg)
+                messagebox.showerror("Error", report)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to clean duplicates: {e}")
 
     ######################################
 
+    # FN: import_students
+    # Purpose: Bulk-register students from a registrar CSV on a background thread
+    def import_students(self):
+        file_path = filedialog.askopenfilename(
+            title = "Select Student CSV",
+            filetypes = [("CSV Files", "*.csv")]
+        )
+        if not file_path:
+            return
+
+        self.import_status.configure(text = "Importing students...", text_color = "blue")
+
+        def set_status(text, color):
+            # Settings page may have been left (and the label destroyed) while importing
+            if self.import_status.winfo_exists():
+                self.import_status.configure(text = text, text_color = color)
+
+        def progress(rows_read, imported):
+            self.after(0, lambda: set_status(f"Read {rows_read} rows, imported {imported}...", "blue"))
+
+        def import_thread():
+            from logic.db_handler import import_students_csv
+            success, result = import_students_csv(file_path, progress = progress)
+
+            def finish():
+                if not success:
+                    set_status(result, "red")
+                    messagebox.showerror("Import Failed", result)
+                    return
+
+                set_status(f"Imported {result['imported']} of {result['rows']} rows", "green")
+                summary = (f"✅ Imported {result['imported']} students from {result['rows']} rows.\n\n"
+                           f"Duplicate rolls skipped: {len(result['duplicates'])}\n"
+                           f"Invalid rows skipped: {len(result['invalid'])}")
+                problems = [f"Line {line}: duplicate roll {roll}" for line, roll in result['duplicates'][:5]]
+                problems += [f"Line {line}: {reason}" for line, reason in result['invalid'][:5]]
+                if problems:
+                    summary += "\n\n" + "\n".join(problems)
+                messagebox.showinfo("Import Complete", summary)
+                self.refresh_visible_page()
+
+            self.after(0, finish)
+
+        threading.Thread(target = import_thread, daemon = True).start()
+
+    ######################################
+
+    # FN: show_performance_stats
+    # Purpose: Show timing percentiles of the instrumented recognition stages
+    def show_performance_stats(self):
+        stats = metrics.get_stats()
+        if not stats:
+            messagebox.showinfo("Performance Stats", "No timings recorded yet.")
+            return
+
+        lines = []
+        for stage, s in stats.items():
+            lines.append(f"{stage}: n={s['count']}  p50={s['p50_ms']:.1f}ms  "
+                         f"p95={s['p95_ms']:.1f}ms  p99={s['p99_ms']:.1f}ms")
+        messagebox.showinfo("Performance Stats", "\n".join(lines))
+
+    ######################################
+
     # FN: reset_project
     # Purpose: Complete project reset - clear all data and recreate structure
     def reset_project(self):
@@ -965,10 +1371,13 @@ class AttendanceApp(ctk.CTk):
     ######################################
 
     # FN: clear_content
-    # Purpose: Remove previous widgets from content frame
+    # Purpose: Remove previous widgets from content frame (drops the page cache too)
     def clear_content(self):
         for widget in self.content_frame.winfo_children():
             widget.destroy()
+        self.pages = {}
+        self.page_versions = {}
+        self.current_page = None
 
     ######################################
 
@@ -0,0 +1,190 @@
+# logic/attendance_journal.py
+############### IMPORTS ###############
+import json
+import os
+import shutil
+import threading
+import time
+
+############## CONSTANTS ##############
+
+JOURNAL_PATH = os.path.join("data", "attendance.journal")
+# The recognition server keeps its own journal: one file per writing process
+SERVER_JOURNAL_PATH = os.path.join("data", "attendance_server.journal")
+MAX_BATCH = 500         # Most events written to SQLite in one transaction
+
+############## FUNCTIONS ##############
+
+# Function: journal_name
+# Purpose: Key of a journal's row in journal_state ("attendance" for data/attendance.journal)
+def journal_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+############### ATTENDANCE JOURNAL CLASS ###############
+class AttendanceJournal:
+    def __init__(self, flush, path = JOURNAL_PATH, max_batch = MAX_BATCH):
+        """
+        Append-only, fsync'd log of attendance events in front of SQLite.
+        append() returns once the event is on disk; one writer thread then moves
+        queued events into the database with flush(events, last_seq), one
+        transaction per batch. flush must record last_seq in the same transaction
+        so that replay() after a crash skips what already reached the database.
+        Each line is JSON: {"seq", "student_id", "status", "timestamp", "session_id"}.
+        A journal file belongs to one process: lock() takes an exclusive lock on
+        <path>.lock and fails if another process holds it.
+        """
+        self.flush_fn = flush
+        self.path = path
+        self.max_batch = max_batch
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._queue = []
+        self._pending = set()       # (student_id, session id or day, status) appended but not yet in SQLite
+        self._seq = 0
+        self._flushed_seq = 0
+        self._stopping = False
+        self._thread = None
+        self._file = None
+        self._lock_file = None
+        self.stats = {"appended": 0, "flushed": 0, "batches": 0, "replayed": 0, "errors": 0}
+
+    def lock(self):
+        """Claim the journal for this process; call before replay()"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok = True)
+        lock_file = open(self.path + ".lock", "a")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise Exception(f"{self.path} is in use by another process; give each process its own journal")
+        self._lock_file = lock_file
+
+    def replay(self, flushed_seq):
+        """Queue journal events newer than flushed_seq (the last seq the database has)"""
+        self._flushed_seq = self._seq = flushed_seq
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding = "utf-8") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Torn final write from a crash; it was never acknowledged
+                    self._seq = max(self._seq, event["seq"])
+                    if event["seq"] > flushed_seq:
+                        self._queue.append(event)
+                        self._pending.add(self._key(event))
+        self.stats["replayed"] = len(self._queue)
+        return len(self._queue)
+
+    def start(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok = True)
+        self._file = open(self.path, "a", encoding = "utf-8")
+        self._thread = threading.Thread(target = self._run, daemon = True)
+        self._thread.start()
+
+    @staticmethod
+    def _key(event):
+        return event["student_id"], event.get("session_id") or event["timestamp"][:10], event["status"]
+
+    def append(self, student_id, status, timestamp, session_id = None):
+        """Durably record one event; returns its sequence number"""
+        with self._lock:
+            event = self._write(student_id, status, timestamp, session_id)
+            fd = self._file.fileno()
+        # Outside the lock so concurrent appenders share one disk flush instead of queueing for it
+        os.fsync(fd)
+        return event["seq"]
+
+    def append_if_absent(self, key, student_id, status, timestamp, session_id = None, exists = None):
+        """
+        append() unless key (student_id, session id or day, status) is still pending or
+        exists() finds it in the database. Both checks and the append happen under one
+        lock hold, and the writer only drops a key from _pending after committing it, so
+        concurrent marks of the same student cannot both get through.
+        Returns the sequence number, or None when the event was refused.
+        """
+        with self._lock:
+            if key in self._pending or (exists is not None and exists()):
+                return None
+            event = self._write(student_id, status, timestamp, session_id)
+            fd = self._file.fileno()
+        os.fsync(fd)
+        return event["seq"]
+
+    def _write(self, student_id, status, timestamp, session_id):
+        """Write and queue one event; call with self._lock held"""
+        self._seq += 1
+        event = {"seq": self._seq, "student_id": student_id, "status": status,
+                 "timestamp": timestamp, "session_id": session_id}
+        self._file.write(json.dumps(event) + "\n")
+        self._file.flush()
+        self._queue.append(event)
+        self._pending.add(self._key(event))
+        self.stats["appended"] += 1
+        self._wakeup.notify_all()
+        return event
+
+    def wait_flushed(self, timeout = None):
+        """Block until everything appended so far is in the database"""
+        with self._lock:
+            target = self._seq
+            return self._wakeup.wait_for(lambda: self._flushed_seq >= target or self._thread is None,
+                                         timeout = timeout)
+
+    def copy_to(self, target_path):
+        """Copy the journal file while the writer can neither flush nor truncate it"""
+        with self._lock:
+            self._file.flush()
+            shutil.copyfile(self.path, target_path)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._wakeup.wait_for(lambda: self._queue or self._stopping)
+                if not self._queue:
+                    return
+                # Whatever piled up while the last batch was being written goes in one transaction
+                batch = self._queue[:self.max_batch]
+
+            try:
+                self.flush_fn(batch, batch[-1]["seq"])
+            except Exception as e:
+                # Keep the events queued (and journaled) and retry shortly
+                self.stats["errors"] += 1
+                print(f"⚠️ Attendance journal flush failed, will retry: {e}")
+                time.sleep(1.0)
+                continue
+
+            with self._lock:
+                del self._queue[:len(batch)]
+                for event in batch:
+                    self._pending.discard(self._key(event))
+                self._flushed_seq = batch[-1]["seq"]
+                self.stats["flushed"] += len(batch)
+                self.stats["batches"] += 1
+                if not self._queue:
+                    # Everything is in SQLite: start the journal over so it never grows unbounded
+                    self._file.truncate(0)
+                    self._file.seek(0)
+                self._wakeup.notify_all()
+
+    def close(self, timeout = 10):
+        """Flush what is queued, stop the writer thread, close the file and release the lock"""
+        if self._thread is not None:
+            with self._lock:
+                self._stopping = True
+                self._wakeup.notify_all()
+            self._thread.join(timeout = timeout)
+            with self._lock:
+                self._thread = None
+                self._file.close()
+                self._wakeup.notify_all()
+        if self._lock_file is not None:
+            self._lock_file.close()     # Closing releases the lock
+            self._lock_file = None
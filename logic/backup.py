@@ -0,0 +1,384 @@
+# logic/backup.py
+# Usage (from the project root):
+#   python -m logic.backup create
+#   python -m logic.backup list
+#   python -m logic.backup verify backups/facetrack_20260101_020000.tar.gz
+#   python -m logic.backup restore backups/facetrack_20260101_020000.tar.gz   (with the app closed)
+############### IMPORTS ###############
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from logic import db_handler
+from logic import metrics
+from logic.attendance_journal import JOURNAL_PATH
+from logic.decision import thresholds_path_for
+
+############## CONSTANTS ##############
+
+BACKUP_DIR = "backups"
+KEEP_BACKUPS = 7            # Newest archives kept by the scheduler
+PAGES_PER_STEP = 1024       # Database pages copied per backup step (4 MiB with the default page size)
+STEP_PAUSE = 0.01           # Seconds between steps, so kiosks can write in between
+MAX_RESTARTS = 3            # Restarts (caused by writes) tolerated before the step size grows
+COMPRESS_LEVEL = 6
+
+############## CLASSES ##############
+
+# CLASS: _Restarted
+# Purpose: Raised from the backup progress callback to retry with larger steps
+class _Restarted(Exception):
+    pass
+
+############## FUNCTIONS ##############
+
+# Function: _sha256
+# Purpose: Hex SHA-256 of a file, read in 1 MiB blocks
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+#######################################
+
+# Function: _backup_sqlite
+# Purpose: Copy a live database with the SQLite backup API, `pages` pages per step. Each step
+#          holds a read lock only briefly, so writers are never blocked for the whole copy.
+#          A write from another connection makes SQLite restart the copy; after MAX_RESTARTS
+#          the step size grows eightfold so the copy always finishes. Returns the steps taken.
+def _backup_sqlite(source_path, target_path, pages = PAGES_PER_STEP, pause = STEP_PAUSE):
+    source = sqlite3.connect(source_path, timeout = 30)
+    try:
+        while True:
+            state = {"remaining": None, "restarts": 0, "steps": 0}
+
+            def progress(status, remaining, total):
+                state["steps"] += 1
+                if state["remaining"] is not None and remaining >= state["remaining"]:
+                    state["restarts"] += 1
+                    if state["restarts"] > MAX_RESTARTS:
+                        raise _Restarted()
+                state["remaining"] = remaining
+                if remaining:
+                    time.sleep(pause)
+
+            target = sqlite3.connect(target_path)
+            try:
+                source.backup(target, pages = pages, progress = progress)
+                return state["steps"]
+            except _Restarted:
+                pages *= 8
+            finally:
+                target.close()
+    finally:
+        source.close()
+
+#######################################
+
+# Function: _snapshot_file
+# Purpose: Copy a file that another thread may be rewriting. Model saves replace the file
+#          atomically, so a copy taken while its identity (inode, size, mtime) stays the same
+#          is a complete version; otherwise the copy is retried.
+def _snapshot_file(source_path, target_path, attempts = 5):
+    for _ in range(attempts):
+        before = os.stat(source_path)
+        with open(source_path, "rb") as src, open(target_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        after = os.stat(source_path)
+        if (before.st_ino, before.st_size, before.st_mtime_ns) == (after.st_ino, after.st_size, after.st_mtime_ns):
+            return
+        time.sleep(0.2)
+    raise Exception(f"{source_path} kept changing while it was being copied")
+
+#######################################
+
+# Function: _replace_file
+# Purpose: Put a restored file in place atomically (copy next to the target, then rename)
+def _replace_file(source_path, target_path):
+    os.makedirs(os.path.dirname(os.path.abspath(target_path)), exist_ok = True)
+    tmp = f"{target_path}.restore"
+    shutil.copyfile(source_path, tmp)
+    os.replace(tmp, target_path)
+
+#######################################
+
+# Function: create_backup
+# Purpose: Write backups/facetrack_<UTC time>.tar.gz holding the database, the yearly attendance
+#          archives, the attendance journals and the model files, without stopping the app.
+#          manifest.json inside lists a SHA-256 per file; <archive>.sha256 covers the whole archive.
+@metrics.timed("backup.create")
+def create_backup(backup_dir = BACKUP_DIR, db_path = None, model_path = "trainer.yml"):
+    try:
+        db_path = db_path or db_handler.DB_PATH
+        if not os.path.exists(db_path):
+            return False, f"{db_path} does not exist."
+        os.makedirs(backup_dir, exist_ok = True)
+        created = datetime.now(timezone.utc)
+        name = f"facetrack_{created.strftime('%Y%m%d_%H%M%S')}.tar.gz"
+        archive_path = os.path.join(backup_dir, name)
+
+        staging = tempfile.mkdtemp(prefix = ".staging_", dir = backup_dir)
+        try:
+            files = {}      # name inside the archive -> staged copy
+
+            # Journals before the databases: each event in a copied journal is then either
+            # already in the database snapshot (journal_state covers it, so replay skips it)
+            # or replayed after a restore. Later events belong after the backup point.
+            journal_dir = os.path.dirname(JOURNAL_PATH)
+            if os.path.isdir(journal_dir):
+                for entry in sorted(os.listdir(journal_dir)):
+                    if entry.endswith(".journal"):
+                        files[entry] = os.path.join(staging, entry)
+                        db_handler.copy_attendance_journal(os.path.join(journal_dir, entry), files[entry])
+
+            files["facetrack.db"] = os.path.join(staging, "facetrack.db")
+            steps = _backup_sqlite(db_path, files["facetrack.db"])
+            archive_dir = os.path.join(os.path.dirname(db_path), db_handler.ARCHIVE_DIR)
+            if os.path.isdir(archive_dir):
+                for entry in sorted(os.listdir(archive_dir)):
+                    if entry.endswith(".db"):
+                        files[f"archive/{entry}"] = os.path.join(staging, entry)
+                        steps += _backup_sqlite(os.path.join(archive_dir, entry), files[f"archive/{entry}"])
+
+            thresholds = thresholds_path_for(model_path)
+            extras = {"model/" + os.path.basename(model_path): model_path,
+                      "model/" + os.path.basename(thresholds): thresholds}
+            for arcname, source_path in extras.items():
+                if os.path.exists(source_path):
+                    files[arcname] = os.path.join(staging, arcname.replace("/", "_"))
+                    _snapshot_file(source_path, files[arcname])
+
+            manifest = {
+                "format": 1,
+                "created": created.strftime("%Y-%m-%d %H:%M:%S"),
+                "sqlite_version": sqlite3.sqlite_version,
+                "model_path": model_path,
+                "files": {arcname: {"sha256": _sha256(path), "bytes": os.path.getsize(path)}
+                          for arcname, path in files.items()},
+            }
+            manifest_path = os.path.join(staging, "manifest.json")
+            with open(manifest_path, "w") as f:
+                json.dump(manifest, f, indent = 2)
+
+            partial = archive_path + ".partial"
+            with tarfile.open(partial, "w:gz", compresslevel = COMPRESS_LEVEL) as tar:
+                tar.add(manifest_path, arcname = "manifest.json")
+                for arcname, path in files.items():
+                    tar.add(path, arcname = arcname)
+            checksum = _sha256(partial)
+            os.replace(partial, archive_path)
+            with open(archive_path + ".sha256", "w") as f:
+                f.write(f"{checksum}  {name}\n")
+        finally:
+            shutil.rmtree(staging, ignore_errors = True)
+
+        return True, {"path": archive_path, "sha256": checksum, "bytes": os.path.getsize(archive_path),
+                      "files": len(files), "steps": steps}
+
+    except Exception as e:
+        return False, f"Error creating backup: {e}"
+
+#######################################
+
+# Function: list_backups
+# Purpose: Archives in backup_dir, newest first
+def list_backups(backup_dir = BACKUP_DIR):
+    if not os.path.isdir(backup_dir):
+        return []
+    backups = []
+    for entry in os.listdir(backup_dir):
+        if entry.startswith("facetrack_") and entry.endswith(".tar.gz"):
+            path = os.path.join(backup_dir, entry)
+            backups.append({"path": path, "created": os.path.getmtime(path), "bytes": os.path.getsize(path)})
+    return sorted(backups, key = lambda b: b["created"], reverse = True)
+
+#######################################
+
+# Function: prune_backups
+# Purpose: Delete all but the `keep` newest archives (and their checksum files)
+def prune_backups(keep = KEEP_BACKUPS, backup_dir = BACKUP_DIR):
+    removed = []
+    for backup in list_backups(backup_dir)[keep:]:
+        for path in (backup["path"], backup["path"] + ".sha256"):
+            if os.path.exists(path):
+                os.remove(path)
+        removed.append(backup["path"])
+    return removed
+
+#######################################
+
+# Function: _unpack_backup
+# Purpose: Check the archive checksum, extract it into `target_dir` and check every file
+#          against the manifest and every database with PRAGMA integrity_check. Returns the manifest.
+def _unpack_backup(archive_path, target_dir):
+    sidecar = archive_path + ".sha256"
+    if os.path.exists(sidecar):
+        with open(sidecar) as f:
+            expected = f.read().split()[0]
+        if _sha256(archive_path) != expected:
+            raise Exception("Archive checksum does not match; the file is damaged.")
+
+    with tarfile.open(archive_path, "r:gz") as tar:
+        manifest = json.load(tar.extractfile("manifest.json"))
+        for arcname in manifest["files"]:
+            # Only the listed names are extracted, and never outside target_dir
+            if arcname.startswith("/") or ".." in arcname.split("/"):
+                raise Exception(f"Unsafe path in archive: {arcname}")
+            member = tar.getmember(arcname)
+            if not member.isfile():
+                raise Exception(f"Unexpected entry in archive: {arcname}")
+            path = os.path.join(target_dir, *arcname.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+            with tar.extractfile(member) as src, open(path, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+
+    for arcname, info in manifest["files"].items():
+        path = os.path.join(target_dir, *arcname.split("/"))
+        if _sha256(path) != info["sha256"]:
+            raise Exception(f"Checksum mismatch for {arcname}")
+        if arcname.endswith(".db"):
+            connect = sqlite3.connect(path)
+            result = connect.execute("PRAGMA integrity_check").fetchone()[0]
+            connect.close()
+            if result != "ok":
+                raise Exception(f"{arcname} failed the integrity check: {result}")
+    return manifest
+
+#######################################
+
+# Function: verify_backup
+# Purpose: Full check of an archive without touching the live data
+def verify_backup(archive_path):
+    try:
+        staging = tempfile.mkdtemp(prefix = ".verify_", dir = os.path.dirname(os.path.abspath(archive_path)))
+        try:
+            manifest = _unpack_backup(archive_path, staging)
+        finally:
+            shutil.rmtree(staging, ignore_errors = True)
+        return True, {"created": manifest["created"], "files": sorted(manifest["files"])}
+
+    except Exception as e:
+        return False, f"Backup is not usable: {e}"
+
+#######################################
+
+# Function: restore_backup
+# Purpose: Replace the database, yearly archives, journals and model files with a verified backup.
+#          Run it with the app closed. Databases are written back through the backup API in a
+#          single step, so a leftover -journal file can never be applied to the restored data.
+def restore_backup(archive_path, db_path = None, model_path = None):
+    try:
+        db_path = db_path or db_handler.DB_PATH
+        data_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(data_dir, exist_ok = True)
+        staging = tempfile.mkdtemp(prefix = ".restore_", dir = data_dir)
+        try:
+            manifest = _unpack_backup(archive_path, staging)
+            model_path = model_path or manifest["model_path"]
+            restored = []
+
+            _backup_sqlite(os.path.join(staging, "facetrack.db"), db_path, pages = -1)
+            restored.append(db_path)
+
+            # Yearly archives: the restored catalogue knows only the backed-up files, and
+            # newer ones could collide with attendance ids handed out again after the restore
+            archive_dir = os.path.join(data_dir, db_handler.ARCHIVE_DIR)
+            backed_up = {arcname.split("/", 1)[1] for arcname in manifest["files"] if arcname.startswith("archive/")}
+            if os.path.isdir(archive_dir):
+                for entry in os.listdir(archive_dir):
+                    if entry.endswith(".db") and entry not in backed_up:
+                        os.remove(os.path.join(archive_dir, entry))
+            for entry in sorted(backed_up):
+                os.makedirs(archive_dir, exist_ok = True)
+                _backup_sqlite(os.path.join(staging, "archive", entry), os.path.join(archive_dir, entry), pages = -1)
+                restored.append(os.path.join(archive_dir, entry))
+
+            # Journals go back as they were; marks journaled after the backup must not be replayed
+            journal_dir = os.path.dirname(JOURNAL_PATH)
+            journals = {arcname for arcname in manifest["files"] if arcname.endswith(".journal")}
+            if os.path.isdir(journal_dir):
+                for entry in os.listdir(journal_dir):
+                    if entry.endswith(".journal") and entry not in journals:
+                        os.remove(os.path.join(journal_dir, entry))
+            for entry in sorted(journals):
+                _replace_file(os.path.join(staging, entry), os.path.join(journal_dir, entry))
+                restored.append(os.path.join(journal_dir, entry))
+
+            model_files = {"model/" + os.path.basename(model_path): model_path}
+            thresholds = thresholds_path_for(model_path)
+            model_files["model/" + os.path.basename(thresholds)] = thresholds
+            for arcname, target_path in model_files.items():
+                if arcname in manifest["files"]:
+                    _replace_file(os.path.join(staging, "model", arcname.split("/", 1)[1]), target_path)
+                    restored.append(target_path)
+        finally:
+            shutil.rmtree(staging, ignore_errors = True)
+
+        return True, {"created": manifest["created"], "restored": restored}
+
+    except Exception as e:
+        return False, f"Error restoring backup: {e}"
+
+#######################################
+
+# Function: start_backup_scheduler
+# Purpose: Daemon thread that creates a backup whenever the newest one is older than
+#          interval_hours (checked every `check_every` seconds, and right away on start),
+#          then prunes all but the `keep` newest
+def start_backup_scheduler(interval_hours = 24, keep = KEEP_BACKUPS, backup_dir = BACKUP_DIR,
+                           model_path = "trainer.yml", check_every = 600):
+    def loop():
+        while True:
+            try:
+                newest = list_backups(backup_dir)[:1]
+                if not newest or time.time() - newest[0]["created"] >= interval_hours * 3600:
+                    success, result = create_backup(backup_dir, model_path = model_path)
+                    if success:
+                        prune_backups(keep, backup_dir)
+                        print(f"✅ Backup written to {result['path']}")
+                    else:
+                        print(f"⚠️ {result}")
+            except Exception as e:
+                print(f"⚠️ Backup scheduler failed: {e}")
+            time.sleep(check_every)
+
+    thread = threading.Thread(target = loop, daemon = True)
+    thread.start()
+    return thread
+
+############### MAIN ###############
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "FaceTrack backup and restore")
+    parser.add_argument("action", choices = ["create", "list", "verify", "restore"])
+    parser.add_argument("archive", nargs = "?", help = "archive to verify or restore")
+    parser.add_argument("--dir", default = BACKUP_DIR)
+    parser.add_argument("--model", help = "model file (default: trainer.yml, or the one recorded in the archive)")
+    args = parser.parse_args()
+
+    if args.action == "create":
+        print(create_backup(args.dir, model_path = args.model or "trainer.yml"))
+    elif args.action == "list":
+        for backup in list_backups(args.dir):
+            created = datetime.fromtimestamp(backup["created"]).strftime("%Y-%m-%d %H:%M")
+            print(f"{created}  {backup['bytes'] / 1e6:8.1f} MB  {backup['path']}")
+    elif not args.archive:
+        parser.error(f"{args.action} needs an archive path")
+    elif args.action == "verify":
+        print(verify_backup(args.archive))
+    else:
+        print(restore_backup(args.archive, model_path = args.model))
@@ -0,0 +1,177 @@
+############### IMPORTS ###############
+import cv2
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from logic.face_trainer import Trainer
+
+############## CONSTANTS ##############
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+VIDEO_EXTS = (".mp4", ".avi", ".mov", ".mkv")
+SAMPLE_SIZE = (200, 200)    # Every saved face is resized to this
+
+############## WORKER FUNCTIONS ##############
+# These run inside the process pool, so they must be top-level functions.
+
+_cascade = None
+
+def _init_worker():
+    """Load the Haar cascade once per worker process"""
+    global _cascade
+    cv2.setNumThreads(1)  # One image per process; avoid oversubscribing cores
+    _cascade = cv2.CascadeClassifier(
+        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+    )
+
+def _largest_face(gray):
+    faces = _cascade.detectMultiScale(gray, scaleFactor = 1.3, minNeighbors = 5, minSize = (50, 50))
+    if len(faces) == 0:
+        return None
+    x, y, w, h = max(faces, key = lambda f: f[2] * f[3])
+    return cv2.resize(gray[y:y+h, x:x+w], SAMPLE_SIZE)
+
+def _iter_frames(path, frame_step):
+    """Yield grayscale frames from an image file, or every Nth frame of a video"""
+    if path.lower().endswith(IMAGE_EXTS):
+        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if img is not None:
+            yield img
+        return
+
+    cap = cv2.VideoCapture(path)
+    index = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if index % frame_step == 0:
+                yield cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            index += 1
+    finally:
+        cap.release()
+
+def _enroll_student(roll, paths, out_dir, max_samples, frame_step, start_index):
+    """Detect, crop and save up to max_samples faces for one student; returns (roll, saved, skipped)"""
+    saved = 0
+    skipped = 0
+    for path in paths:
+        for gray in _iter_frames(path, frame_step):
+            if saved >= max_samples:
+                return roll, saved, skipped
+            face = _largest_face(gray)
+            if face is None:
+                skipped += 1
+                continue
+            saved += 1
+            cv2.imwrite(os.path.join(out_dir, f"{roll}_{start_index + saved}.jpg"), face)
+    return roll, saved, skipped
+
+############### BULK ENROLLER CLASS ###############
+class BulkEnroller:
+    def __init__(self, out_dir = os.path.join("data", "images"), model_path = "trainer.yml",
+                 workers = None, max_samples = 50, frame_step = 5):
+        """
+        Enroll many students from existing photos and videos instead of live capture.
+        Expects one folder per student named after the roll number:
+            root/1001/id_photo.jpg, root/1001/enroll.mp4, root/1002/...
+        """
+        self.out_dir = out_dir
+        self.model_path = model_path
+        self.workers = workers
+        self.max_samples = max_samples
+        self.frame_step = frame_step
+
+    def find_sources(self, root):
+        """Map each roll folder under root to the photos and videos inside it (recursively)"""
+        sources = {}
+        for entry in sorted(os.listdir(root)):
+            folder = os.path.join(root, entry)
+            if not os.path.isdir(folder):
+                continue
+            paths = []
+            for dirpath, _, filenames in os.walk(folder):
+                for filename in sorted(filenames):
+                    if filename.lower().endswith(IMAGE_EXTS + VIDEO_EXTS):
+                        paths.append(os.path.join(dirpath, filename))
+            if paths:
+                sources[entry] = paths
+        return sources
+
+    def _highest_indexes(self):
+        """Highest existing sample number per roll (from <roll>_<n>.jpg), in one pass over
+        out_dir, so new samples continue after them instead of overwriting"""
+        highest = {}
+        with os.scandir(self.out_dir) as entries:
+            for entry in entries:
+                roll, _, rest = entry.name.partition("_")
+                number = rest[:-4]
+                if rest.endswith(".jpg") and number.isdigit():
+                    highest[roll] = max(highest.get(roll, 0), int(number))
+        return highest
+
+    def enroll(self, root, train = True, progress = None):
+        """
+        Process every student folder in a process pool, then train the model once
+        (or, when one exists, add just the new samples to it).
+        progress(done, total, roll) is called as each student finishes.
+        Returns a summary dict with per-roll sample counts and any problems found.
+        """
+        os.makedirs(self.out_dir, exist_ok = True)
+        sources = self.find_sources(root)
+
+        summary = {"students": 0, "samples": 0, "per_roll": {}, "errors": [], "trained": False}
+
+        # Trainer.load_images reads the student ID from the filename as an integer
+        jobs = {}
+        for roll, paths in sources.items():
+            if not roll.isdigit():
+                summary["errors"].append(f"{roll}: roll folder names must be numeric")
+                continue
+            jobs[roll] = paths
+
+        print(f"📂 Enrolling {len(jobs)} students from {root}...")
+        done = 0
+        highest = self._highest_indexes()
+        with ProcessPoolExecutor(max_workers = self.workers, initializer = _init_worker) as pool:
+            futures = {
+                pool.submit(_enroll_student, roll, paths, self.out_dir, self.max_samples,
+                            self.frame_step, highest.get(roll, 0)): roll
+                for roll, paths in jobs.items()
+            }
+            for future in as_completed(futures):
+                roll = futures[future]
+                done += 1
+                try:
+                    _, saved, skipped = future.result()
+                    summary["per_roll"][roll] = saved
+                    summary["samples"] += saved
+                    if saved:
+                        summary["students"] += 1
+                    else:
+                        summary["errors"].append(f"{roll}: no face found in {skipped} frames")
+                except Exception as e:
+                    summary["errors"].append(f"{roll}: {e}")
+                if progress:
+                    progress(done, len(futures), roll)
+
+        print(f"✅ Saved {summary['samples']} samples for {summary['students']} students")
+
+        # One training run for the whole batch; an existing model only gets the new samples
+        if train and summary["samples"]:
+            new_files = [
+                os.path.join(self.out_dir, f"{roll}_{number}.jpg")
+                for roll, saved in summary["per_roll"].items()
+                for number in range(highest.get(roll, 0) + 1, highest.get(roll, 0) + saved + 1)
+            ]
+            Trainer(dataset_path = self.out_dir, model_path = self.model_path).add_images(new_files)
+            summary["trained"] = True
+
+        return summary
+
+############### MAIN TEST ###############
+if __name__ == "__main__":
+    import sys
+    enroller = BulkEnroller()
+    print(enroller.enroll(sys.argv[1] if len(sys.argv) > 1 else "enrollment"))
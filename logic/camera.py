@@ -2,6 +2,10 @@
 import cv2
 import os
 
+from logic import metrics
+from logic.frame_buffers import FrameBuffers
+from logic.image_writer import AsyncImageWriter
+
 ############### CAMERA CLASS ###############
 class Camera:
     def __init__(self, cam_index=0):
@@ -18,6 +22,8 @@ class Camera:
     def capture_faces(self, student_id, save_dir="dataset", max_images=50):
         """
         Capture and save face images for a given student ID.
+        Images are written by a background writer so slow disks don't stall
+        the frame loop; this returns only after every image is on disk.
         Press 'q' to stop capturing.
         """
         # Create dataset folder if not exists
@@ -25,27 +31,33 @@ class Camera:
             os.makedirs(save_dir)
 
         count = 0
+        writer = AsyncImageWriter()
+        buffers = FrameBuffers()
         print(f"📸 Starting face capture for Student ID: {student_id}")
         print("Press 'q' to stop capturing or wait for automatic completion...")
         
         while count < max_images:
-            ret, frame = self.cap.read()
+            with metrics.timer("camera.read"):
+                ret, frame = buffers.read(self.cap)
             if not ret:
                 print("❌ Failed to grab frame")
                 break
 
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(
-                gray, scaleFactor=1.3, minNeighbors=5, minSize=(50, 50)
-            )
+            with metrics.timer("frame.cvt_gray"):
+                gray = buffers.to_gray(frame)
+            with metrics.timer("detect.detect_multiscale"):
+                faces = self.face_cascade.detectMultiScale(
+                    gray, scaleFactor=1.3, minNeighbors=5, minSize=(50, 50)
+                )
 
             for (x, y, w, h) in faces:
                 count += 1
                 face_img = gray[y:y + h, x:x + w]
 
-                # Save face image with unique filename
+                # Queue face image for saving with unique filename.
+                # face_img is a view into the reused gray buffer, so the writer gets its own copy.
                 filename = os.path.join(save_dir, f"{student_id}_{count}.jpg")
-                cv2.imwrite(filename, face_img)
+                writer.submit(filename, face_img.copy())
 
                 # Draw rectangle & show count
                 cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
@@ -64,8 +76,18 @@ class Camera:
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
 
-        print(f"✅ Saved {count} face images for Student ID: {student_id}")
         cv2.destroyAllWindows()
+
+        # Wait for the writer to finish before reporting
+        stats = writer.close()
+        if stats["blocked_puts"]:
+            print(f"⚠️ Disk back-pressure: capture waited {stats['blocked_puts']} times "
+                  f"({stats['blocked_seconds']:.2f}s) for the image writer")
+        if stats["errors"]:
+            print(f"❌ {stats['errors']} face images could not be saved")
+        count = stats["written"]
+
+        print(f"✅ Saved {count} face images for Student ID: {student_id}")
         
         # Release camera after capture
         self.cap.release()
@@ -2,6 +2,7 @@
 ############### IMPORTS ###############
 import sqlite3
 import os
+import shutil
 
 # Create data directory if it doesn't exist
 if not os.path.exists("data"):
@@ -50,6 +51,17 @@ cursor.execute("""
     );
 """)
 
+# Drop rollup, search and archive tables; they are recreated empty by db_handler.ensure_schema()
+cursor.execute("DROP TABLE IF EXISTS attendance_daily")
+cursor.execute("DROP TABLE IF EXISTS attendance_student_monthly")
+cursor.execute("DROP TABLE IF EXISTS students_fts")
+cursor.execute("DROP TABLE IF EXISTS journal_state")
+cursor.execute("DROP TABLE IF EXISTS sessions")
+cursor.execute("DROP TABLE IF EXISTS attendance_archives")
+
+# The yearly archive files hold rows of the dropped attendance table
+shutil.rmtree(os.path.join("data", "archive"), ignore_errors=True)
+
 # Save changes and close the connection
 connect.commit()
 connect.close()
@@ -1,14 +1,596 @@
 # logic/db_ops.py
 ############### IMPORTS ###############
+import csv
+import os
+import shutil
 import sqlite3
-from datetime import date
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
+
+from logic import metrics
+from logic.attendance_journal import JOURNAL_PATH, AttendanceJournal, journal_name
 
 ############## CONSTANTS ##############
 
 DB_PATH = "data/facetrack.db"
+IMPORT_COLUMNS = ("name", "roll", "department", "email", "phone")
+
+# Change counters per table, bumped by every write in this module.
+# Readers (e.g. the GUI) compare them to skip reloading unchanged data.
+_data_versions = {"students": 0, "attendance": 0, "sessions": 0}
+_version_lock = threading.Lock()
+
+# Connection kept open only to read PRAGMA data_version (see get_database_version)
+_watch_connection = None
+_watch_path = None
+
+# Set by start_attendance_journal(); when present, mark_attendance writes through it
+_journal = None
+
+# (roll, status, session_id) marked today, so repeat recognitions skip SQLite entirely.
+# Loaded once per (UTC) day and database by _is_marked_today(); None until first needed.
+_marked_today = None
+_marked_key = None  # (DB_PATH, day) _marked_today was loaded for
+_marked_lock = threading.Lock()
+
+# (DB_PATH, roll) -> ((students version, database version), student dict) for get_student_by_roll
+_student_cache = {}
+
+# db path -> whether attendance has the unique (student, day or session, status) indexes
+_unique_marks = {}
+
+# (db path, room) -> (sessions version, active session id, valid until); see _active_session
+_session_cache = {}
+_session_lock = threading.Lock()
+MAX_SESSION_HOURS = 12      # Bounds the index range scanned when looking for the running session
+
+# Attendance older than the archive cutoff lives in one SQLite file per year in this folder
+# (next to DB_PATH), attached only by queries whose date range reaches it
+ARCHIVE_DIR = "archive"
+MAX_ATTACHED_ARCHIVES = 9   # SQLite allows 10 attached databases by default
 
 ############## FUNCTIONS ##############
 
+# Function: get_data_version
+# Purpose: Return the change counter of a table ('students' or 'attendance'),
+#          or a tuple of all counters when no table is given
+def get_data_version(table = None):
+    with _version_lock:
+        if table is None:
+            return tuple(_data_versions[t] for t in sorted(_data_versions))
+        return _data_versions[table]
+
+def _bump_version(*tables):
+    with _version_lock:
+        for table in tables:
+            _data_versions[table] += 1
+
+#######################################
+
+# Function: get_database_version
+# Purpose: PRAGMA data_version of one long-lived connection: it changes whenever any other
+#          connection commits, including other processes (the recognition server) and this
+#          process's journal writer. The per-table counters above only see this process's
+#          writes, so views that must notice outside changes add this to their stamp.
+def get_database_version():
+    global _watch_connection, _watch_path
+    with _version_lock:
+        if _watch_path != DB_PATH:
+            if _watch_connection is not None:
+                _watch_connection.close()
+            _watch_connection = sqlite3.connect(DB_PATH, check_same_thread = False)
+            _watch_path = DB_PATH
+        return (_watch_path, _watch_connection.execute("PRAGMA data_version").fetchone()[0])
+
+#######################################
+
+# Function: _utc_today
+# Purpose: Today's date on the same UTC clock as CURRENT_TIMESTAMP and date('now')
+def _utc_today():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+#######################################
+
+# Function: _utc_now
+# Purpose: Current time formatted like CURRENT_TIMESTAMP (UTC)
+def _utc_now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+#######################################
+
+# Function: _is_marked_today / _remember_marked / _forget_marked_today
+# Purpose: The in-memory "already marked today" set. It only ever answers "yes":
+#          a roll missing from it still goes through the database check.
+#          session_id is None for marks taken outside any session.
+def _is_marked_today(roll, status, session_id = None):
+    global _marked_today, _marked_key
+    today = _utc_today()
+    with _marked_lock:
+        if _marked_key != (DB_PATH, today):
+            # Day rollover, another database or first use: reload once from the database
+            connect = sqlite3.connect(DB_PATH)
+            rows = connect.execute("""
+                SELECT s.roll, a.status, a.session_id
+                FROM attendance a
+                JOIN students s ON s.id = a.student_id
+                WHERE a.timestamp >= ? AND a.timestamp < date(?, '+1 day')
+            """, (today, today)).fetchall()
+            connect.close()
+            _marked_today = set(rows)
+            _marked_key = (DB_PATH, today)
+        return (roll, status, session_id) in _marked_today
+
+def _remember_marked(roll, status, day, session_id = None):
+    with _marked_lock:
+        if _marked_key == (DB_PATH, day):
+            _marked_today.add((roll, status, session_id))
+
+def _forget_marked_today():
+    global _marked_key
+    with _marked_lock:
+        _marked_key = None
+
+#######################################
+
+# Function: ensure_schema
+# Purpose: Create the tables if they don't exist yet (non-destructive, unlike db_con.py)
+def ensure_schema(db_path = None):
+    try:
+        connect = sqlite3.connect(db_path or DB_PATH)
+        cursor = connect.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS students (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                roll TEXT UNIQUE NOT NULL,
+                department TEXT,
+                email TEXT,
+                phone TEXT,
+                photo_path TEXT
+            );
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS attendance (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_id INTEGER,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                status TEXT CHECK(status IN ('Present', 'Absent')),
+                session_id INTEGER REFERENCES sessions(id),
+                FOREIGN KEY(student_id) REFERENCES students(id)
+            );
+        """)
+
+        # Class sessions (lectures); attendance taken while one runs is linked to it
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                course TEXT NOT NULL,
+                room TEXT,
+                start_time DATETIME NOT NULL,
+                end_time DATETIME NOT NULL,
+                closed_at DATETIME,
+                CHECK (end_time > start_time)
+            );
+        """)
+        cursor.execute("PRAGMA table_info(sessions)")
+        if "closed_at" not in [column[1] for column in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE sessions ADD COLUMN closed_at DATETIME")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions(start_time)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_room_start ON sessions(room, start_time)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_open ON sessions(end_time) WHERE closed_at IS NULL")
+        cursor.execute("PRAGMA table_info(attendance)")
+        if "session_id" not in [column[1] for column in cursor.fetchall()]:
+            # Database from before sessions existed
+            cursor.execute("ALTER TABLE attendance ADD COLUMN session_id INTEGER REFERENCES sessions(id)")
+
+        # Indexes for per-student range scans and per-department reports
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_student_time ON attendance(student_id, timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_department ON students(department)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_time ON attendance(timestamp)")
+
+        # Pre-aggregated attendance counts, kept up to date by _apply_rollups()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'attendance_daily'")
+        rollups_missing = cursor.fetchone() is None
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS attendance_daily (
+                day TEXT NOT NULL,
+                department TEXT NOT NULL,
+                status TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (day, department, status)
+            ) WITHOUT ROWID;
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS attendance_student_monthly (
+                student_id INTEGER NOT NULL,
+                month TEXT NOT NULL,
+                status TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (student_id, month, status)
+            ) WITHOUT ROWID;
+        """)
+        if rollups_missing:
+            # Existing database: backfill the new rollup tables once
+            _apply_rollups(cursor, "1 = 1", ())
+
+        # Last attendance journal event stored in this database (see start_attendance_journal)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS journal_state (
+                name TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL
+            );
+        """)
+
+        # One row per yearly archive file written by archive_attendance()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS attendance_archives (
+                year INTEGER PRIMARY KEY,
+                first_day TEXT NOT NULL,
+                last_day TEXT NOT NULL,
+                rows INTEGER NOT NULL
+            );
+        """)
+
+        _ensure_student_search(cursor)
+
+        if not _ensure_unique_marks(cursor, db_path or DB_PATH):
+            print("⚠️ Duplicate attendance rows exist; run dedupe_attendance_history() to enable the unique indexes.")
+
+        connect.commit()
+        connect.close()
+        return True, "Schema is up to date."
+
+    except Exception as e:
+        return False, f"Error creating schema: {e}"
+
+#######################################
+
+# Function: _apply_rollups
+# Purpose: Add (sign = 1) or remove (sign = -1) the attendance rows matching `where`
+#          (a condition on alias a) from the daily and per-student monthly rollups.
+#          Call it after inserting rows and before deleting them, in the same transaction.
+#          The rollups cover every tier; pass a source from _attendance_source() to include archives.
+def _apply_rollups(cursor, where, params, sign = 1, source = "attendance"):
+    cursor.execute(f"""
+        INSERT INTO attendance_daily (day, department, status, count)
+        SELECT date(a.timestamp), COALESCE(s.department, ''), a.status, ? * COUNT(*)
+        FROM {source} a
+        LEFT JOIN students s ON s.id = a.student_id
+        WHERE {where}
+        GROUP BY 1, 2, 3
+        ON CONFLICT(day, department, status) DO UPDATE SET count = count + excluded.count
+    """, (sign, *params))
+    cursor.execute(f"""
+        INSERT INTO attendance_student_monthly (student_id, month, status, count)
+        SELECT a.student_id, strftime('%Y-%m', a.timestamp), a.status, ? * COUNT(*)
+        FROM {source} a
+        WHERE {where}
+        GROUP BY 1, 2, 3
+        ON CONFLICT(student_id, month, status) DO UPDATE SET count = count + excluded.count
+    """, (sign, *params))
+
+    if sign < 0:
+        cursor.execute("DELETE FROM attendance_daily WHERE count <= 0")
+        cursor.execute("DELETE FROM attendance_student_monthly WHERE count <= 0")
+
+#######################################
+
+# Function: _ensure_unique_marks / _has_unique_marks
+# Purpose: One attendance row per student and status for each session, or for each day
+#          when taken outside a session, enforced by two partial unique indexes.
+#          The session one doubles as the (session, student) lookup index.
+#          Creating them fails while old duplicates remain (see dedupe_attendance_history).
+def _ensure_unique_marks(cursor, db_path):
+    try:
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'idx_attendance_unique_day'")
+        row = cursor.fetchone()
+        if row is not None and "session_id" not in row[0]:
+            # Index from before sessions: it would allow only one session per day
+            cursor.execute("DROP INDEX idx_attendance_unique_day")
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_unique_day
+            ON attendance(student_id, date(timestamp), status) WHERE session_id IS NULL
+        """)
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_session_student
+            ON attendance(session_id, student_id, status) WHERE session_id IS NOT NULL
+        """)
+        _unique_marks[db_path] = True
+    except sqlite3.IntegrityError:
+        _unique_marks[db_path] = False
+    return _unique_marks[db_path]
+
+def _has_unique_marks(cursor):
+    if DB_PATH not in _unique_marks:
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND name IN "
+                       "('idx_attendance_unique_day', 'idx_attendance_session_student')")
+        _unique_marks[DB_PATH] = cursor.fetchone()[0] == 2
+    return _unique_marks[DB_PATH]
+
+#######################################
+
+# Function: rebuild_attendance_rollups
+# Purpose: Recompute the rollup tables from scratch (after bulk loads or manual edits).
+#          Archived years are counted a group at a time into TEMP tables of the same name
+#          (unqualified names resolve to temp first); the live table is added and the result
+#          swapped in by one final transaction, so readers never see partial rollups.
+def rebuild_attendance_rollups(db_path = None):
+    try:
+        connect = sqlite3.connect(db_path or DB_PATH)
+        cursor = connect.cursor()
+
+        cursor.execute("""
+            CREATE TEMP TABLE attendance_daily (
+                day TEXT NOT NULL,
+                department TEXT NOT NULL,
+                status TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (day, department, status)
+            ) WITHOUT ROWID;
+        """)
+        cursor.execute("""
+            CREATE TEMP TABLE attendance_student_monthly (
+                student_id INTEGER NOT NULL,
+                month TEXT NOT NULL,
+                status TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (student_id, month, status)
+            ) WITHOUT ROWID;
+        """)
+        for source in _attendance_sources(cursor, live = False):
+            _apply_rollups(cursor, "1 = 1", (), source = source)
+            connect.commit()    # ATTACH/DETACH of the next group needs no open transaction
+
+        cursor.execute("BEGIN IMMEDIATE")
+        _apply_rollups(cursor, "1 = 1", (), source = "main.attendance")
+        for table in ("attendance_daily", "attendance_student_monthly"):
+            cursor.execute(f"DELETE FROM main.{table}")
+            cursor.execute(f"INSERT INTO main.{table} SELECT * FROM temp.{table}")
+
+        connect.commit()
+        connect.close()
+        return True, "Attendance rollups rebuilt."
+
+    except Exception as e:
+        return False, f"Error rebuilding rollups: {e}"
+
+#######################################
+
+# Function: _archive_path
+# Purpose: File holding the archived attendance of one year
+def _archive_path(year):
+    return os.path.join(os.path.dirname(DB_PATH), ARCHIVE_DIR, f"attendance_{year}.db")
+
+#######################################
+
+# Function: _ensure_archive_schema
+# Purpose: Attendance table and indexes inside an attached yearly archive. Same columns as the
+#          live table; ids are kept so a repeated copy is a no-op.
+def _ensure_archive_schema(cursor, schema):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.attendance (
+            id INTEGER PRIMARY KEY,
+            student_id INTEGER,
+            timestamp DATETIME,
+            status TEXT,
+            session_id INTEGER
+        );
+    """)
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_attendance_student_time ON attendance(student_id, timestamp)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_attendance_time ON attendance(timestamp)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_attendance_session ON attendance(session_id, student_id)")
+
+#######################################
+
+# Function: _attach_archives / _attendance_source
+# Purpose: Attach the yearly archives overlapping [start_date, end_date) to this connection and
+#          return the source to read attendance from (as alias a): plain "attendance" when the
+#          range stays in the live table, otherwise a UNION ALL over the tiers. SQLite pushes the
+#          outer WHERE into every arm, so each file is still read through its own indexes.
+#          Call outside a transaction; ATTACH is not allowed inside one.
+def _archive_years(cursor, start_date = None, end_date = None):
+    try:
+        cursor.execute(
+            "SELECT year FROM attendance_archives WHERE last_day >= ? AND first_day < ? AND rows > 0 ORDER BY year",
+            (start_date or "0000-00-00", end_date or "9999-99-99"),
+        )
+    except sqlite3.OperationalError:
+        return []  # Database from before archiving existed
+    return [row[0] for row in cursor.fetchall()]
+
+def _attach_archives(cursor, start_date = None, end_date = None, years = None):
+    if years is None:
+        years = _archive_years(cursor, start_date, end_date)
+    if len(years) > MAX_ATTACHED_ARCHIVES:
+        raise Exception(f"The range spans {len(years)} archived years; query at most {MAX_ATTACHED_ARCHIVES} at a time.")
+
+    cursor.execute("PRAGMA database_list")
+    attached = {row[1] for row in cursor.fetchall()}
+    for year in years:
+        if f"arch_{year}" not in attached:
+            cursor.execute(f"ATTACH DATABASE ? AS arch_{year}", (_archive_path(year),))
+    return years
+
+def _union_source(years, live = True):
+    if live and not years:
+        return "attendance"
+    columns = "id, student_id, timestamp, status, session_id"
+    arms = [f"SELECT {columns} FROM main.attendance"] if live else []
+    arms += [f"SELECT {columns} FROM arch_{year}.attendance" for year in years]
+    return "(" + " UNION ALL ".join(arms) + ")"
+
+def _attendance_source(cursor, start_date = None, end_date = None):
+    return _union_source(_attach_archives(cursor, start_date, end_date))
+
+#######################################
+
+# Function: _attendance_sources
+# Purpose: Like _attendance_source for ranges that may span more archived years than SQLite can
+#          attach at once: yields one source per group of at most MAX_ATTACHED_ARCHIVES years (the
+#          live table comes with the first), detaching each group before attaching the next.
+#          Fetch a group's rows (and commit) before asking for the next one; callers merge the
+#          results. With live = False only the archives are yielded.
+def _attendance_sources(cursor, start_date = None, end_date = None, live = True):
+    years = _archive_years(cursor, start_date, end_date)
+    groups = [years[i:i + MAX_ATTACHED_ARCHIVES] for i in range(0, len(years), MAX_ATTACHED_ARCHIVES)]
+    if live and not groups:
+        groups = [[]]
+    for index, group in enumerate(groups):
+        _attach_archives(cursor, years = group)
+        yield _union_source(group, live = live and index == 0)
+        for year in group:
+            cursor.execute(f"DETACH DATABASE arch_{year}")
+
+#######################################
+
+# Function: _session_source
+# Purpose: _attendance_source() covering the days a session ran on
+def _session_source(cursor, session_id):
+    cursor.execute("SELECT date(start_time), date(end_time, '+1 day') FROM sessions WHERE id = ?", (session_id,))
+    row = cursor.fetchone()
+    return _attendance_source(cursor, *row) if row else "attendance"
+
+#######################################
+
+# Function: _archived_through
+# Purpose: Last day that has rows in an archive, or None; days up to it are no longer in the live table
+def _archived_through(cursor):
+    try:
+        cursor.execute("SELECT MAX(last_day) FROM attendance_archives WHERE rows > 0")
+    except sqlite3.OperationalError:
+        return None
+    return cursor.fetchone()[0]
+
+#######################################
+
+# Function: archive_attendance
+# Purpose: Move attendance older than before_date (YYYY-MM-DD, before today) from the live table
+#          into one file per year under data/archive, chunk_days at a time so kiosks are never
+#          blocked for long. Rows keep their ids and are copied with INSERT OR IGNORE before being
+#          deleted, so an interrupted run can simply be repeated. The rollups are left alone:
+#          they already count every tier. With dry_run = True nothing is moved.
+#          vacuum = True shrinks facetrack.db afterwards (slow; blocks everyone while it runs).
+def archive_attendance(before_date, dry_run = False, chunk_days = 31, vacuum = False):
+    try:
+        cutoff = date.fromisoformat(before_date)
+        if before_date >= _utc_today():
+            return False, "Only days before today can be archived."
+
+        connect = sqlite3.connect(DB_PATH, timeout = 30)
+        cursor = connect.cursor()
+        report = {"dry_run": dry_run, "before": before_date, "moved": 0, "chunks": 0, "years": {}}
+
+        cursor.execute("SELECT date(MIN(timestamp)) FROM attendance WHERE timestamp < ?", (before_date,))
+        first = cursor.fetchone()[0]
+        day = date.fromisoformat(first) if first else cutoff
+
+        while day < cutoff:
+            year = day.year
+            year_end = min(date(year + 1, 1, 1), cutoff)
+            schema = f"arch_{year}"
+            if not dry_run:
+                os.makedirs(os.path.dirname(_archive_path(year)), exist_ok = True)
+                cursor.execute(f"ATTACH DATABASE ? AS {schema}", (_archive_path(year),))
+                _ensure_archive_schema(cursor, schema)
+                connect.commit()
+
+            while day < year_end:
+                chunk_end = min(day + timedelta(days = chunk_days), year_end)
+                chunk = (day.isoformat(), chunk_end.isoformat())
+                report["chunks"] += 1
+
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute("""
+                    SELECT COUNT(*), date(MIN(timestamp)), date(MAX(timestamp))
+                    FROM main.attendance WHERE timestamp >= ? AND timestamp < ?
+                """, chunk)
+                count, first_day, last_day = cursor.fetchone()
+                if count and not dry_run:
+                    cursor.execute(f"""
+                        INSERT OR IGNORE INTO {schema}.attendance (id, student_id, timestamp, status, session_id)
+                        SELECT id, student_id, timestamp, status, session_id
+                        FROM main.attendance WHERE timestamp >= ? AND timestamp < ?
+                    """, chunk)
+                    cursor.execute("DELETE FROM main.attendance WHERE timestamp >= ? AND timestamp < ?", chunk)
+                    cursor.execute("""
+                        INSERT INTO attendance_archives (year, first_day, last_day, rows) VALUES (?, ?, ?, ?)
+                        ON CONFLICT(year) DO UPDATE SET
+                            first_day = MIN(first_day, excluded.first_day),
+                            last_day = MAX(last_day, excluded.last_day),
+                            rows = rows + excluded.rows
+                    """, (year, first_day, last_day, count))
+                connect.commit()
+
+                if count:
+                    report["moved"] += count
+                    report["years"][year] = report["years"].get(year, 0) + count
+                day = chunk_end
+
+            if not dry_run:
+                cursor.execute(f"DETACH DATABASE {schema}")
+
+        if vacuum and report["moved"] and not dry_run:
+            cursor.execute("VACUUM")
+        connect.close()
+
+        if report["moved"] and not dry_run:
+            _bump_version("attendance")
+        return True, report
+
+    except Exception as e:
+        return False, f"Error archiving attendance: {e}"
+
+#######################################
+
+# Function: _ensure_student_search
+# Purpose: Create the FTS5 index over students (name, roll, department, email) and the triggers
+#          that keep it in sync. Does nothing if this SQLite build has no FTS5;
+#          search_students() then falls back to LIKE queries.
+def _ensure_student_search(cursor):
+    try:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'students_fts'")
+        if cursor.fetchone() is not None:
+            return
+
+        cursor.execute("""
+            CREATE VIRTUAL TABLE students_fts USING fts5(
+                name, roll, department, email,
+                content = 'students', content_rowid = 'id', prefix = '1 2 3'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        print(f"⚠️ Student search index unavailable ({e}); using slower LIKE search.")
+        return
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+            INSERT INTO students_fts (rowid, name, roll, department, email)
+            VALUES (new.id, new.name, new.roll, new.department, new.email);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+            INSERT INTO students_fts (students_fts, rowid, name, roll, department, email)
+            VALUES ('delete', old.id, old.name, old.roll, old.department, old.email);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE ON students BEGIN
+            INSERT INTO students_fts (students_fts, rowid, name, roll, department, email)
+            VALUES ('delete', old.id, old.name, old.roll, old.department, old.email);
+            INSERT INTO students_fts (rowid, name, roll, department, email)
+            VALUES (new.id, new.name, new.roll, new.department, new.email);
+        END
+    """)
+
+    # Index students that existed before the search table
+    cursor.execute("INSERT INTO students_fts (students_fts) VALUES ('rebuild')")
+
+#######################################
+
 # Function: add_student
 # Purpose: Insert a new student's data into the students table in the database
 def add_student(name, roll, department, email, phone, photo_path):
@@ -26,6 +608,7 @@ def add_student(name, roll, department, email, phone, photo_path):
         # Commit and close
         connect.commit()
         connect.close()
+        _bump_version("students")
 
         return True, "Student added successfully."
 
@@ -38,6 +621,101 @@ def add_student(name, roll, department, email, phone, photo_path):
 
 #######################################
 
+# Function: import_students_csv
+# Purpose: Bulk-insert students from a CSV file (header: name, roll, department, email, phone).
+#          Rows are validated and inserted with executemany, one transaction per batch.
+#          Invalid rows and duplicate rolls (in the file or already in the database) are
+#          reported instead of aborting the import. progress(rows_read, imported) is called
+#          after every batch.
+def import_students_csv(csv_path, batch_size = 1000, progress = None):
+    try:
+        imported = 0
+        rows_read = 0
+        duplicates = []
+        invalid = []
+        seen = set()
+
+        connect = sqlite3.connect(DB_PATH)
+        cursor = connect.cursor()
+
+        def flush(batch):
+            nonlocal imported
+            if not batch:
+                return
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                # Drop rolls that are already registered
+                existing = set()
+                rolls = [row[1] for _, row in batch]
+                for i in range(0, len(rolls), 500):
+                    chunk = rolls[i:i + 500]
+                    cursor.execute(
+                        "SELECT roll FROM students WHERE roll IN (" + ",".join("?" * len(chunk)) + ")", chunk
+                    )
+                    existing.update(r[0] for r in cursor.fetchall())
+
+                new_rows = []
+                for line, row in batch:
+                    if row[1] in existing:
+                        duplicates.append((line, row[1]))
+                    else:
+                        new_rows.append(row)
+
+                cursor.executemany(
+                    "INSERT INTO students (name, roll, department, email, phone, photo_path) VALUES (?, ?, ?, ?, ?, NULL)",
+                    new_rows,
+                )
+                connect.commit()
+                imported += len(new_rows)
+                _bump_version("students")
+            except Exception:
+                connect.rollback()
+                raise
+
+        with open(csv_path, "r", newline = "", encoding = "utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            header = [h.strip().lower() for h in (reader.fieldnames or [])]
+            if "name" not in header or "roll" not in header:
+                connect.close()
+                return False, "CSV must have at least 'name' and 'roll' columns."
+            reader.fieldnames = header
+
+            batch = []
+            for record in reader:
+                rows_read += 1
+                line = reader.line_num
+                values = {col: (record.get(col) or "").strip() for col in IMPORT_COLUMNS}
+
+                if not values["name"] or not values["roll"]:
+                    invalid.append((line, "name and roll are required"))
+                    continue
+                if values["email"] and "@" not in values["email"]:
+                    invalid.append((line, f"invalid email '{values['email']}'"))
+                    continue
+                if values["roll"] in seen:
+                    duplicates.append((line, values["roll"]))
+                    continue
+                seen.add(values["roll"])
+
+                batch.append((line, tuple(values[col] or None for col in IMPORT_COLUMNS)))
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+                    if progress:
+                        progress(rows_read, imported)
+
+            flush(batch)
+            if progress:
+                progress(rows_read, imported)
+
+        connect.close()
+        return True, {"rows": rows_read, "imported": imported, "duplicates": duplicates, "invalid": invalid}
+
+    except Exception as e:
+        return False, f"Error importing students: {e}"
+
+#######################################
+
 # Function: get_all_students
 # Purpose: Return a list of all students from the students table
 def get_all_students():
@@ -74,8 +752,17 @@ def get_all_students():
 
 # Function: get_student_by_roll
 # Purpose: Fetch a single student record by roll number
+@metrics.timed("db.get_student_by_roll")
 def get_student_by_roll(roll):
     try:
+        # Served from memory until a student changes here or anything is committed to
+        # this database elsewhere (other connections, other processes)
+        version = (get_data_version("students"), get_database_version())
+        key = (DB_PATH, roll)
+        cached = _student_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return True, dict(cached[1])
+
         connect = sqlite3.connect(DB_PATH)
         cursor = connect.cursor()
 
@@ -98,6 +785,9 @@ def get_student_by_roll(roll):
             "phone": row[5],
             "photo_path": row[6],
         }
+        if len(_student_cache) > 10000:
+            _student_cache.clear()
+        _student_cache[key] = (version, dict(student))
         return True, student
 
     except Exception as e:
@@ -105,6 +795,67 @@ def get_student_by_roll(roll):
 
 #######################################
 
+# Function: search_students
+# Purpose: Search-as-you-type over name, roll, department and email.
+#          Every word in the query is matched as a prefix; results are ranked best first.
+def search_students(query, limit = 20):
+    try:
+        terms = "".join(ch if ch.isalnum() else " " for ch in query).split()
+        if not terms:
+            return True, []
+
+        connect = sqlite3.connect(DB_PATH)
+        cursor = connect.cursor()
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'students_fts'")
+        if cursor.fetchone() is not None:
+            match = " AND ".join(f'"{t}"*' for t in terms)
+            cursor.execute(
+                """
+                SELECT s.id, s.name, s.roll, s.department, s.email, s.phone, s.photo_path
+                FROM students_fts f
+                JOIN students s ON s.id = f.rowid
+                WHERE students_fts MATCH ?
+                ORDER BY f.rank
+                LIMIT ?
+                """,
+                (match, limit),
+            )
+        else:
+            # No FTS5: every term must prefix-match one of the columns
+            conditions = []
+            params = []
+            for t in terms:
+                conditions.append("(name LIKE ? OR roll LIKE ? OR department LIKE ? OR email LIKE ?)")
+                params.extend([f"{t}%"] * 4)
+            cursor.execute(
+                "SELECT id, name, roll, department, email, phone, photo_path FROM students WHERE "
+                + " AND ".join(conditions) + " ORDER BY name LIMIT ?",
+                (*params, limit),
+            )
+
+        rows = cursor.fetchall()
+        connect.close()
+
+        students = [
+            {
+                "id": r[0],
+                "name": r[1],
+                "roll": r[2],
+                "department": r[3],
+                "email": r[4],
+                "phone": r[5],
+                "photo_path": r[6],
+            }
+            for r in rows
+        ]
+        return True, students
+
+    except Exception as e:
+        return False, f"Error: {e}"
+
+#######################################
+
 # Function: update_student
 # Purpose: Update a student's details identified by roll number.
 #          Only fields provided (not None) will be updated.
@@ -138,10 +889,31 @@ def update_student(roll, name = None, department = None, email = None, phone = N
 
         connect = sqlite3.connect(DB_PATH)
         cursor = connect.cursor()
+        student = "a.student_id = (SELECT id FROM students WHERE roll = ?)"
+
+        if department is not None:
+            # attendance_daily counts each mark under the student's department: move their
+            # counts along in the same transaction as the UPDATE. Archived rows are copied
+            # to a temp table first, a group of years at a time (ATTACH is not allowed
+            # inside a transaction).
+            cursor.execute("""
+                CREATE TEMP TABLE moved_attendance AS
+                SELECT id, student_id, timestamp, status, session_id FROM main.attendance WHERE 0
+            """)
+            for source in _attendance_sources(cursor, live = False):
+                cursor.execute(f"INSERT INTO temp.moved_attendance SELECT * FROM {source} a WHERE {student}", (roll,))
+                connect.commit()
+            source = ("(SELECT * FROM temp.moved_attendance UNION ALL "
+                      "SELECT id, student_id, timestamp, status, session_id FROM main.attendance)")
+            _apply_rollups(cursor, student, (roll,), sign = -1, source = source)
+
         cursor.execute(sql, tuple(params))
-        connect.commit()
         changed = cursor.rowcount
+        if department is not None:
+            _apply_rollups(cursor, student, (roll,), source = source)
+        connect.commit()
         connect.close()
+        _bump_version("students", *(("attendance",) if department is not None else ()))
 
         if changed == 0:
             return False, "No student found with that roll number."
@@ -156,7 +928,9 @@ def update_student(roll, name = None, department = None, email = None, phone = N
 
 # Function: delete_student
 # Purpose: Delete a student by roll. Optionally remove their attendance too.
-def delete_student(roll, delete_attendance = False):
+#          They are also dropped from the trained model at model_path (None to leave it);
+#          LBPH models cannot do that and need a retrain without the student's images.
+def delete_student(roll, delete_attendance = False, model_path = "trainer.yml"):
     try:
         connect = sqlite3.connect(DB_PATH)
         cursor = connect.cursor()
@@ -171,11 +945,33 @@ def delete_student(roll, delete_attendance = False):
         student_id = row[0]
 
         if delete_attendance:
+            # One archived year per transaction (there may be more than can be attached at once);
+            # a repeated call after an interruption finishes the job
+            for year in _archive_years(cursor):
+                _attach_archives(cursor, years = [year])
+                _apply_rollups(cursor, "a.student_id = ?", (student_id,), sign = -1,
+                               source = f"arch_{year}.attendance")
+                cursor.execute(f"DELETE FROM arch_{year}.attendance WHERE student_id = ?", (student_id,))
+                cursor.execute("UPDATE attendance_archives SET rows = rows - ? WHERE year = ?", (cursor.rowcount, year))
+                connect.commit()
+                cursor.execute(f"DETACH DATABASE arch_{year}")
+            _apply_rollups(cursor, "a.student_id = ?", (student_id,), sign = -1)
             cursor.execute("DELETE FROM attendance WHERE student_id = ?", (student_id,))
 
         cursor.execute("DELETE FROM students WHERE id = ?", (student_id,))
         connect.commit()
         connect.close()
+        _bump_version("students", "attendance")
+        _forget_marked_today()
+
+        # Model labels are the numeric roll (see Trainer.load_images)
+        if model_path and os.path.exists(model_path) and str(roll).isdigit():
+            try:
+                from logic.face_trainer import Trainer
+                if Trainer(model_path = model_path).remove_student(int(roll)) == 0:
+                    return True, "Student deleted successfully; retrain the model to stop recognizing them."
+            except Exception as e:
+                return True, f"Student deleted successfully, but the model was not updated: {e}"
         return True, "Student deleted successfully."
 
     except Exception as e:
@@ -183,13 +979,222 @@ def delete_student(roll, delete_attendance = False):
 
 #######################################
 
+# Function: add_session
+# Purpose: Schedule a class session. Times are 'YYYY-MM-DD HH:MM:SS' in UTC, like attendance timestamps.
+def add_session(course, start_time, end_time, room = None):
+    try:
+        start = datetime.strptime(start_time, "%Y-%m-%d %H:%M:%S")
+        end = datetime.strptime(end_time, "%Y-%m-%d %H:%M:%S")
+        if end <= start:
+            return False, "Session must end after it starts."
+        if end - start > timedelta(hours = MAX_SESSION_HOURS):
+            return False, f"Sessions can last at most {MAX_SESSION_HOURS} hours."
+
+        connect = sqlite3.connect(DB_PATH)
+        cursor = connect.cursor()
+        cursor.execute(
+            "INSERT INTO sessions (course, room, start_time, end_time) VALUES (?, ?, ?, ?)",
+            (course, room, start_time, end_time),
+        )
+        session_id = cursor.lastrowid
+        connect.commit()
+        connect.close()
+        _bump_version("sessions")
+        return True, session_id
+
+    except ValueError:
+        return False, "Times must look like 'YYYY-MM-DD HH:MM:SS'."
+    except Exception as e:
+        return False, f"Error: {e}"
+
+#######################################
+
+# Function: get_sessions
+# Purpose: Sessions starting on a given day (YYYY-MM-DD, defaults to today), in start order
+def get_sessions(target_date = None):
+    try:
+        target_date = target_date or _utc_today()
+        connect = sqlite3.connect(DB_PATH)
+        cursor = connect.cursor()
+        cursor.execute("""
+            SELECT id, course, room, start_time, end_time
+            FROM sessions
+            WHERE start_time >= ? AND start_time < date(?, '+1 day')
+            ORDER BY start_time
+        """, (target_date, target_date))
+        rows = cursor.fetchall()
+        connect.close()
+
+        sessions = []
+        for r in rows:
+            sessions.append({"id": r[0], "course": r[1], "room": r[2], "start_time": r[3], "end_time": r[4]})
+        return True, sessions
+
+    except Exception as e:
+        return False, f"Error: {e}"
+
+#######################################
+
+# Function: _resolve_session
+# Purpose: (session id or None, time until which that answer holds) at `now`.
+#          Both queries are index range scans: the running session must have started
+#          within MAX_SESSION_HOURS, and the next start is a MIN over the index.
+#          Without a room, parallel sessions make the answer ambiguous: the mark is then
+#          not linked to any session rather than guessing the wrong lecture.
+def _resolve_session(cursor, room, now):
+    room_sql = "room = ? AND " if room is not None else ""
+    room_params = (room,) if room is not None else ()
+    cursor.execute(f"""
+        SELECT id, end_time FROM sessions
+        WHERE {room_sql}start_time <= ? AND start_time > datetime(?, '-{MAX_SESSION_HOURS} hours')
+          AND end_time > ?
+        ORDER BY start_time DESC
+        LIMIT 2
+    """, (*room_params, now, now, now))
+    rows = cursor.fetchall()
+
+    cursor.execute(f"SELECT MIN(start_time) FROM sessions WHERE {room_sql}start_time > ?", (*room_params, now))
+    next_start = cursor.fetchone()[0] or "9999-12-31 00:00:00"
+    if len(rows) > 1 and room is None:
+        return None, min(rows[0][1], rows[1][1], next_start)
+    if rows:
+        # A session starting later takes over (or, without a room, makes it ambiguous)
+        return rows[0][0], min(rows[0][1], next_start)
+    return None, next_start
+
+#######################################
+
+# Function: _active_session
+# Purpose: Id of the session running now (in `room`, if given), or None. The answer is cached
+#          until that session ends or the next one starts (re-checked at least every minute,
+#          for sessions added by other processes), so repeat marks don't query again.
+def _active_session(room = None):
+    now = _utc_now()
+    version = get_data_version("sessions")
+    key = (DB_PATH, room)
+    with _session_lock:
+        cached = _session_cache.get(key)
+        if cached is not None and cached[0] == version and now < cached[2]:
+            return cached[1]
+
+    connect = sqlite3.connect(DB_PATH)
+    session_id, valid_until = _resolve_session(connect.cursor(), room, now)
+    connect.close()
+
+    recheck = (datetime.strptime(now, "%Y-%m-%d %H:%M:%S") + timedelta(minutes = 1)).strftime("%Y-%m-%d %H:%M:%S")
+    with _session_lock:
+        _session_cache[key] = (version, session_id, min(valid_until, recheck))
+    return session_id
+
+#######################################
+
+# Function: get_active_session
+# Purpose: The session running now (in `room`, if given) as a dict, or None
+def get_active_session(room = None):
+    try:
+        session_id = _active_session(room)
+        if session_id is None:
+            return True, None
+
+        connect = sqlite3.connect(DB_PATH)
+        row = connect.execute(
+            "SELECT id, course, room, start_time, end_time FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        connect.close()
+        if row is None:
+            return True, None
+        return True, {"id": row[0], "course": row[1], "room": row[2], "start_time": row[3], "end_time": row[4]}
+
+    except Exception as e:
+        return False, f"Error: {e}"
+
+#######################################
+
+# Function: get_session_attendance
+# Purpose: Attendance of one session (the running one when session_id is None),
+#          read through the (session_id, student_id) index
+def get_session_attendance(session_id = None, room = None):
+    try:
+        if session_id is None:
+            session_id = _active_session(room)
+            if session_id is None:
+                return False, "No session is running."
+
+        connect = sqlite3.connect(DB_PATH)
+        cursor = connect.cursor()
+        source = _session_source(cursor, session_id)
+        cursor.execute(f"""
+            SELECT a.id, s.name, s.roll, s.department, a.timestamp, a.status
+            FROM {source} a
+            JOIN students s ON a.student_id = s.id
+            WHERE a.session_id = ?
+            ORDER BY a.timestamp
+        """, (session_id,))
+        rows = cursor.fetchall()
+        connect.close()
+
+        records = []
+        for r in rows:
+            records.append(
+                {
+                    "attendance_id": r[0],
+                    "name": r[1],
+                    "roll": r[2],
+                    "department": r[3],
+                    "timestamp": r[4],
+                    "status": r[5],
+                }
+            )
+        return True, {"session_id": session_id, "records": records}
+
+    except Exception as e:
+        return False, f"Error: {e}"
+
+#######################################
+
+# Function: _attendance_exists
+# Purpose: True if the student already has a row with this status for the session, or for
+#          `day` (UTC, default today) when marked outside any session.
+def _attendance_exists(cursor, student_id, status, session_id = None, day = None):
+    if session_id is None:
+        day = day or _utc_today()
+        cursor.execute("""
+            SELECT COUNT(*) FROM attendance
+            WHERE student_id = ? AND timestamp >= ? AND timestamp < date(?, '+1 day') AND status = ?
+              AND session_id IS NULL
+        """, (student_id, day, day, status))
+    else:
+        cursor.execute("""
+            SELECT COUNT(*) FROM attendance
+            WHERE session_id = ? AND student_id = ? AND status = ?
+        """, (session_id, student_id, status))
+    return cursor.fetchone()[0] > 0
+
+#######################################
+
 # Function: mark_attendance
-# Purpose: Mark attendance for a student (by roll) with status 'Present' or 'Absent'
-def mark_attendance(roll, status = "Present"):
+# Purpose: Mark attendance for a student (by roll) with status 'Present' or 'Absent'.
+#          While a session is running (in `room`, if given) the mark belongs to that
+#          session and may be taken once per session; otherwise once per day.
+#          With the attendance journal running it returns once the mark is journaled (durable),
+#          before the row is in SQLite and before the attendance version changes; callers that
+#          read it back straight away call wait_for_attendance_writes() first.
+@metrics.timed("db.mark_attendance")
+def mark_attendance(roll, status = "Present", room = None):
     try:
         if status not in ("Present", "Absent"):
             return False, "Invalid status. Use 'Present' or 'Absent'."
 
+        session_id = _active_session(room)
+        if session_id is None:
+            already_marked = "Attendance already marked today for this student."
+        else:
+            already_marked = "Attendance already marked for this session."
+
+        # Repeat recognitions during a scan are answered from memory
+        if _is_marked_today(roll, status, session_id):
+            return False, already_marked
+
         connect = sqlite3.connect(DB_PATH)
         cursor = connect.cursor()
 
@@ -201,24 +1206,45 @@ def mark_attendance(roll, status = "Present"):
             return False, "Student not found."
 
         student_id = row[0]
+        journal = _journal
+        unique = _has_unique_marks(cursor)
+
+        if journal is not None:
+            # Same UTC clock as CURRENT_TIMESTAMP
+            timestamp = _utc_now()
+            # Durable once journaled; the writer thread inserts it with the next batch.
+            # The pending check, the database check and the append are one step, so two
+            # cameras marking the same student at once cannot both succeed.
+            seq = journal.append_if_absent(
+                (student_id, session_id or timestamp[:10], status), student_id, status, timestamp, session_id,
+                exists = partial(_attendance_exists, cursor, student_id, status, session_id, timestamp[:10]),
+            )
+            connect.close()
+            _remember_marked(roll, status, timestamp[:10], session_id)
+            if seq is None:
+                return False, already_marked
+            return True, "Attendance marked successfully."
 
-        # Check if attendance already marked today
-        cursor.execute("""
-            SELECT COUNT(*) FROM attendance 
-            WHERE student_id = ? AND date(timestamp) = date('now') AND status = ?
-        """, (student_id, status))
-        
-        existing_count = cursor.fetchone()[0]
-        if existing_count > 0:
+        if not unique and _attendance_exists(cursor, student_id, status, session_id):
             connect.close()
-            return False, f"Attendance already marked today for this student."
+            return False, already_marked
 
+        # With the unique indexes the insert itself is the duplicate check
         cursor.execute(
-            "INSERT INTO attendance (student_id, status) VALUES (?, ?)",
-            (student_id, status),
+            "INSERT INTO attendance (student_id, status, session_id) VALUES (?, ?, ?) ON CONFLICT DO NOTHING",
+            (student_id, status, session_id),
         )
+        if cursor.rowcount == 0:
+            connect.close()
+            _remember_marked(roll, status, _utc_today(), session_id)
+            return False, already_marked
+        _apply_rollups(cursor, "a.id = ?", (cursor.lastrowid,))
+        cursor.execute("SELECT date(timestamp) FROM attendance WHERE id = ?", (cursor.lastrowid,))
+        day = cursor.fetchone()[0]
         connect.commit()
         connect.close()
+        _bump_version("attendance")
+        _remember_marked(roll, status, day, session_id)
         return True, "Attendance marked successfully."
 
     except Exception as e:
@@ -226,54 +1252,431 @@ def mark_attendance(roll, status = "Present"):
 
 #######################################
 
-# Function: clean_duplicate_attendance
-# Purpose: Remove duplicate attendance records for the same student on the same day
-def clean_duplicate_attendance():
+# Function: _insert_absentees
+# Purpose: One INSERT ... SELECT ... WHERE NOT EXISTS adding an 'Absent' row for every student
+#          (of `department`, if given) without a row matching `marked` (a condition on alias a,
+#          answered from an attendance index). Updates the rollups; returns rows inserted.
+def _insert_absentees(cursor, timestamp, session_id, marked, params, department = None):
+    department_sql = "AND s.department = ?" if department else ""
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM attendance")
+    last_id = cursor.fetchone()[0]
+    cursor.execute(f"""
+        INSERT INTO attendance (student_id, timestamp, status, session_id)
+        SELECT s.id, ?, 'Absent', ?
+        FROM students s
+        WHERE NOT EXISTS (SELECT 1 FROM attendance a WHERE a.student_id = s.id AND {marked})
+        {department_sql}
+        ON CONFLICT DO NOTHING
+    """, (timestamp, session_id, *params, *((department,) if department else ())))
+    inserted = cursor.rowcount
+    if inserted:
+        _apply_rollups(cursor, "a.id > ?", (last_id,))
+    return inserted
+
+#######################################
+
+# Function: close_attendance_day
+# Purpose: Write 'Absent' rows for every student with no attendance on target_date (default
+#          yesterday, UTC). Only days that have ended can be closed: a student marked later the
+#          same day would otherwise end up both absent and present.
+#          Idempotent: running it again inserts nothing. Days on which nobody was marked
+#          present (weekends, holidays) are skipped unless force = True.
+def close_attendance_day(target_date = None, department = None, force = False):
+    try:
+        target_date = target_date or (datetime.now(timezone.utc).date() - timedelta(days = 1)).isoformat()
+        if target_date >= _utc_today():
+            return False, f"{target_date} has not ended yet (UTC); only past days can be closed."
+        if _journal is not None:
+            _journal.wait_flushed(timeout = 30)  # Marks still in the journal are not absences
+
+        connect = sqlite3.connect(DB_PATH, timeout = 30)
+        cursor = connect.cursor()
+        archived = _archived_through(cursor)
+        if archived is not None and target_date <= archived:
+            connect.close()
+            return True, {"day": target_date, "absent": 0, "skipped": "day is archived"}
+        if not force:
+            cursor.execute("SELECT 1 FROM attendance_daily WHERE day = ? AND status = 'Present' LIMIT 1", (target_date,))
+            if cursor.fetchone() is None:
+                connect.close()
+                return True, {"day": target_date, "absent": 0, "skipped": "no attendance taken that day"}
+
+        cursor.execute("BEGIN IMMEDIATE")
+        # idx_attendance_student_time answers "any row for this student on this day"
+        absent = _insert_absentees(
+            cursor, f"{target_date} 23:59:59", None,
+            "a.timestamp >= ? AND a.timestamp < date(?, '+1 day')", (target_date, target_date),
+            department,
+        )
+        connect.commit()
+        connect.close()
+
+        if absent:
+            _bump_version("attendance")
+            _forget_marked_today()
+        return True, {"day": target_date, "absent": absent}
+
+    except Exception as e:
+        return False, f"Error closing attendance day: {e}"
+
+#######################################
+
+# Function: close_session
+# Purpose: Write 'Absent' rows, linked to the session, for every student not marked in it.
+#          Idempotent; the session is flagged closed so the scheduler skips it afterwards.
+def close_session(session_id, department = None):
+    try:
+        if _journal is not None:
+            _journal.wait_flushed(timeout = 30)
+
+        connect = sqlite3.connect(DB_PATH, timeout = 30)
+        cursor = connect.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT end_time FROM sessions WHERE id = ?", (session_id,))
+        row = cursor.fetchone()
+        if row is None:
+            connect.rollback()
+            connect.close()
+            return False, "Session not found."
+
+        archived = _archived_through(cursor)
+        if archived is not None and row[0][:10] <= archived:
+            # Its attendance has moved to an archive; it can no longer be completed
+            absent = 0
+        else:
+            # idx_attendance_session_student answers "any row for this student in this session"
+            absent = _insert_absentees(cursor, row[0], session_id, "a.session_id = ?", (session_id,), department)
+        cursor.execute("UPDATE sessions SET closed_at = ? WHERE id = ?", (_utc_now(), session_id))
+        connect.commit()
+        connect.close()
+
+        _bump_version("sessions")
+        if absent:
+            _bump_version("attendance")
+            _forget_marked_today()
+        return True, {"session_id": session_id, "absent": absent}
+
+    except Exception as e:
+        return False, f"Error closing session: {e}"
+
+#######################################
+
+# Function: close_ended_sessions
+# Purpose: close_session() for every session that has ended and is not closed yet
+def close_ended_sessions():
+    try:
+        connect = sqlite3.connect(DB_PATH)
+        rows = connect.execute(
+            "SELECT id FROM sessions WHERE closed_at IS NULL AND end_time <= ? ORDER BY end_time", (_utc_now(),)
+        ).fetchall()
+        connect.close()
+
+        closed = []
+        for (session_id,) in rows:
+            success, result = close_session(session_id)
+            if not success:
+                return False, result
+            closed.append(result)
+        return True, closed
+
+    except Exception as e:
+        return False, f"Error closing sessions: {e}"
+
+#######################################
+
+# Function: get_absentees
+# Purpose: Students recorded absent on a day (default today) or in a session; an indexed read
+#          once the day or session has been closed
+def get_absentees(target_date = None, session_id = None):
     try:
         connect = sqlite3.connect(DB_PATH)
         cursor = connect.cursor()
-        
-        # Find and remove duplicate attendance records
+        if session_id is not None:
+            source = _session_source(cursor, session_id)
+            cursor.execute(f"""
+                SELECT s.name, s.roll, s.department, a.timestamp
+                FROM {source} a
+                JOIN students s ON a.student_id = s.id
+                WHERE a.session_id = ? AND a.status = 'Absent'
+                ORDER BY s.roll
+            """, (session_id,))
+        else:
+            target_date = target_date or _utc_today()
+            next_day = (date.fromisoformat(target_date) + timedelta(days = 1)).isoformat()
+            source = _attendance_source(cursor, target_date, next_day)
+            cursor.execute(f"""
+                SELECT s.name, s.roll, s.department, a.timestamp
+                FROM {source} a
+                JOIN students s ON a.student_id = s.id
+                WHERE a.timestamp >= ? AND a.timestamp < date(?, '+1 day')
+                  AND a.status = 'Absent' AND a.session_id IS NULL
+                ORDER BY s.roll
+            """, (target_date, target_date))
+        rows = cursor.fetchall()
+        connect.close()
+
+        return True, [{"name": r[0], "roll": r[1], "department": r[2], "timestamp": r[3]} for r in rows]
+
+    except Exception as e:
+        return False, f"Error: {e}"
+
+#######################################
+
+# Function: start_attendance_closer
+# Purpose: Daemon thread that closes ended sessions every `interval` seconds and closes
+#          yesterday (UTC) once the clock passes close_time ('HH:MM') after midnight, leaving
+#          late marks from other processes time to land. Closing is idempotent, so this also
+#          catches up on start if the app was not running at close time.
+def start_attendance_closer(close_time = "00:05", interval = 60):
+    def loop():
+        closed_day = None
+        while True:
+            try:
+                close_ended_sessions()
+                now = _utc_now()
+                yesterday = (date.fromisoformat(now[:10]) - timedelta(days = 1)).isoformat()
+                if closed_day != yesterday and now[11:16] >= close_time:
+                    success, result = close_attendance_day(yesterday)
+                    if success:
+                        closed_day = yesterday
+                        if result.get("absent"):
+                            print(f"✅ Day {yesterday} closed: {result['absent']} students marked absent")
+            except Exception as e:
+                print(f"⚠️ Attendance closer failed: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target = loop, daemon = True)
+    thread.start()
+    return thread
+
+#######################################
+
+# Function: _flush_attendance_events
+# Purpose: Journal writer callback: insert a batch of events in one transaction and
+#          record the batch's last sequence number with it
+def _flush_attendance_events(events, last_seq, name = "attendance"):
+    connect = sqlite3.connect(DB_PATH, timeout = 30)
+    try:
+        cursor = connect.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM attendance")
+        last_id = cursor.fetchone()[0]
+        # A mark another process already stored for that day is skipped, not an error
+        cursor.executemany(
+            "INSERT INTO attendance (student_id, timestamp, status, session_id) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT DO NOTHING",
+            [(e["student_id"], e["timestamp"], e["status"], e.get("session_id")) for e in events],
+        )
+        _apply_rollups(cursor, "a.id > ?", (last_id,))
         cursor.execute("""
-            DELETE FROM attendance 
-            WHERE id NOT IN (
-                SELECT MIN(id) 
-                FROM attendance 
-                WHERE date(timestamp) = date('now')
-                GROUP BY student_id, status
-            ) AND date(timestamp) = date('now')
-        """)
-        
-        deleted_count = cursor.rowcount
+            INSERT INTO journal_state (name, seq) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET seq = excluded.seq
+        """, (name, last_seq))
         connect.commit()
+    finally:
         connect.close()
-        
-        return True, f"Cleaned {deleted_count} duplicate attendance records."
-        
+    _bump_version("attendance")
+
+#######################################
+
+# Function: start_attendance_journal
+# Purpose: Route mark_attendance through an fsync'd journal flushed to SQLite in batches
+#          by one writer thread. Events left over from a crash are replayed first.
+#          Every process needs its own path; each journal has its own journal_state row.
+def start_attendance_journal(path = JOURNAL_PATH):
+    global _journal
+    try:
+        if _journal is not None:
+            return True, "Attendance journal already running."
+
+        name = journal_name(path)
+        journal = AttendanceJournal(partial(_flush_attendance_events, name = name), path)
+        journal.lock()
+        try:
+            connect = sqlite3.connect(DB_PATH)
+            row = connect.execute("SELECT seq FROM journal_state WHERE name = ?", (name,)).fetchone()
+            connect.close()
+
+            replayed = journal.replay(row[0] if row else 0)
+            journal.start()
+        except Exception:
+            journal.close()
+            raise
+        _journal = journal
+        return True, f"Attendance journal started ({replayed} events replayed)."
+
+    except Exception as e:
+        return False, f"Error starting attendance journal: {e}"
+
+#######################################
+
+# Function: wait_for_attendance_writes
+# Purpose: Block until marks journaled by this process are in SQLite (and the attendance
+#          version has moved on). Returns False on timeout; True straight away without a journal.
+def wait_for_attendance_writes(timeout = 5):
+    journal = _journal
+    if journal is None:
+        return True
+    return journal.wait_flushed(timeout = timeout)
+
+#######################################
+
+# Function: copy_attendance_journal
+# Purpose: Copy a journal file for a backup. This process's own journal is copied under its
+#          lock; another process's journal is copied as is (a torn last line is never replayed).
+def copy_attendance_journal(path, target_path):
+    journal = _journal
+    if journal is not None and os.path.abspath(journal.path) == os.path.abspath(path):
+        journal.copy_to(target_path)
+    else:
+        shutil.copyfile(path, target_path)
+
+#######################################
+
+# Function: stop_attendance_journal
+# Purpose: Flush outstanding journal events and go back to direct inserts
+def stop_attendance_journal():
+    global _journal
+    journal, _journal = _journal, None
+    if journal is not None:
+        journal.close()
+    return True, "Attendance journal stopped."
+
+#######################################
+
+# Function: clean_duplicate_attendance
+# Purpose: Remove duplicate attendance records for the same student on the same day (today only)
+def clean_duplicate_attendance():
+    today = _utc_today()
+    success, report = dedupe_attendance_history(start_date = today, end_date = today)
+    if not success:
+        return False, report
+    return True, f"Cleaned {report['duplicates']} duplicate attendance records."
+
+#######################################
+
+# Function: dedupe_attendance_history
+# Purpose: Remove duplicate attendance rows (same student, day and status; the earliest is kept)
+#          across the whole history, chunk_days at a time so writers are never blocked for long.
+#          ROW_NUMBER() over each chunk finds the duplicates through idx_attendance_time.
+#          With dry_run = True nothing is deleted and the report says what would be.
+#          Afterwards the unique index is created so duplicates cannot come back.
+def dedupe_attendance_history(dry_run = False, chunk_days = 31, start_date = None, end_date = None):
+    try:
+        connect = sqlite3.connect(DB_PATH, timeout = 30)
+        cursor = connect.cursor()
+
+        cursor.execute("SELECT date(MIN(timestamp)), date(MAX(timestamp)) FROM attendance")
+        first, last = cursor.fetchone()
+        report = {"dry_run": dry_run, "duplicates": 0, "days_affected": 0, "chunks": 0,
+                  "examples": [], "unique_index": False}
+        if first is None:
+            if not dry_run:
+                _ensure_unique_marks(cursor, DB_PATH)
+            report["unique_index"] = _has_unique_marks(cursor)
+            connect.close()
+            return True, report
+
+        day = date.fromisoformat(max(first, start_date or first))
+        last_day = date.fromisoformat(min(last, end_date or last))
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS dedupe_ids (id INTEGER PRIMARY KEY)")
+
+        while day <= last_day:
+            chunk_end = min(day + timedelta(days = chunk_days), last_day + timedelta(days = 1))
+            # Session rows are partitioned by session, not by day: move the boundary to the
+            # midnight after any session running across it, so no session is split in two
+            while True:
+                cursor.execute(
+                    "SELECT date(MAX(end_time), '+1 day') FROM sessions WHERE start_time < ? AND end_time >= ?",
+                    (chunk_end.isoformat(), chunk_end.isoformat()),
+                )
+                extended = cursor.fetchone()[0]
+                if extended is None:
+                    break
+                chunk_end = date.fromisoformat(extended)
+            report["chunks"] += 1
+
+            # Partitions never cross a chunk boundary, so each chunk can be deduplicated on its own
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("DELETE FROM dedupe_ids")
+            cursor.execute("""
+                INSERT INTO dedupe_ids (id)
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY student_id, status, session_id,
+                                     CASE WHEN session_id IS NULL THEN date(timestamp) END
+                        ORDER BY timestamp, id
+                    ) AS rn
+                    FROM attendance
+                    WHERE timestamp >= ? AND timestamp < ?
+                )
+                WHERE rn > 1
+            """, (day.isoformat(), chunk_end.isoformat()))
+            found = cursor.rowcount
+
+            if found:
+                report["duplicates"] += found
+                cursor.execute("""
+                    SELECT s.roll, date(a.timestamp), a.status, COUNT(*)
+                    FROM attendance a
+                    JOIN dedupe_ids d ON d.id = a.id
+                    LEFT JOIN students s ON s.id = a.student_id
+                    GROUP BY a.student_id, date(a.timestamp), a.status
+                """)
+                groups = cursor.fetchall()
+                report["days_affected"] += len({g[1] for g in groups})
+                for roll, group_day, status, extra in groups[:max(0, 20 - len(report["examples"]))]:
+                    report["examples"].append({"roll": roll, "day": group_day, "status": status, "extra_rows": extra})
+
+                if not dry_run:
+                    _apply_rollups(cursor, "a.id IN (SELECT id FROM dedupe_ids)", (), sign = -1)
+                    cursor.execute("DELETE FROM attendance WHERE id IN (SELECT id FROM dedupe_ids)")
+
+            if dry_run:
+                connect.rollback()
+            else:
+                connect.commit()
+            day = chunk_end
+
+        if not dry_run:
+            report["unique_index"] = _ensure_unique_marks(cursor, DB_PATH)
+            connect.commit()
+        else:
+            report["unique_index"] = _has_unique_marks(cursor)
+        connect.close()
+
+        if report["duplicates"] and not dry_run:
+            _bump_version("attendance")
+        return True, report
+
     except Exception as e:
         return False, f"Error cleaning duplicates: {e}"
 
 #######################################
 
 # Function: get_attendance_by_date
-# Purpose: Return attendance records for a specific date (YYYY-MM-DD). Defaults to today.
+# Purpose: Return attendance records for a specific date (YYYY-MM-DD, UTC like the timestamps).
+#          Defaults to today. A half-open timestamp range keeps it on idx_attendance_time.
+@metrics.timed("db.get_attendance_by_date")
 def get_attendance_by_date(target_date=None):
     try:
         if target_date is None:
-            target_date = date.today().isoformat()  # 'YYYY-MM-DD'
+            target_date = _utc_today()  # 'YYYY-MM-DD'
 
         connect = sqlite3.connect(DB_PATH)
         cursor = connect.cursor()
+        next_day = (date.fromisoformat(target_date) + timedelta(days = 1)).isoformat()
+        source = _attendance_source(cursor, target_date, next_day)
 
         cursor.execute(
-            """
+            f"""
             SELECT a.id, s.name, s.roll, s.department, a.timestamp, a.status
-            FROM attendance a
+            FROM {source} a
             JOIN students s ON a.student_id = s.id
-            WHERE date(a.timestamp) = ?
+            WHERE a.timestamp >= ? AND a.timestamp < ?
             ORDER BY a.timestamp DESC
             """,
-            (target_date,),
+            (target_date, next_day),
         )
         rows = cursor.fetchall()
         connect.close()
@@ -305,25 +1708,292 @@ def get_attendance_by_student(roll):
         connect = sqlite3.connect(DB_PATH)
         cursor = connect.cursor()
 
+        rows = []
+        for source in _attendance_sources(cursor):
+            cursor.execute(
+                f"""
+                SELECT a.id, a.timestamp, a.status
+                FROM {source} a
+                JOIN students s ON a.student_id = s.id
+                WHERE s.roll = ?
+                """,
+                (roll,),
+            )
+            rows.extend(cursor.fetchall())
+        connect.close()
+        rows.sort(key = lambda r: (r[1], r[0]), reverse = True)
+
+        history = []
+        for r in rows:
+            history.append({"attendance_id": r[0], "timestamp": r[1], "status": r[2]})
+
+        return True, history
+
+    except Exception as e:
+        return False, f"Error: {e}"
+
+#######################################
+
+# Function: _page_token / _parse_page_token
+# Purpose: Encode/decode the continuation token (last row's timestamp and id) used by keyset pagination
+def _page_token(timestamp, attendance_id):
+    return f"{timestamp}|{attendance_id}"
+
+def _parse_page_token(token):
+    timestamp, attendance_id = token.rsplit("|", 1)
+    return timestamp, int(attendance_id)
+
+#######################################
+
+# Function: get_attendance_page_by_date
+# Purpose: One page of get_attendance_by_date, newest first, keyset-paginated on (timestamp, id).
+#          Pass the returned "next" token back as `after` to get the following page; it is None
+#          on the last page.
+def get_attendance_page_by_date(target_date = None, page_size = 50, after = None):
+    try:
+        if target_date is None:
+            target_date = _utc_today()
+        next_day = (date.fromisoformat(target_date) + timedelta(days = 1)).isoformat()
+
+        connect = sqlite3.connect(DB_PATH)
+        cursor = connect.cursor()
+        source = _attendance_source(cursor, target_date, next_day)
+
+        sql = f"""
+            SELECT a.id, s.name, s.roll, s.department, a.timestamp, a.status
+            FROM {source} a
+            JOIN students s ON a.student_id = s.id
+            WHERE a.timestamp >= ? AND a.timestamp < ?
+        """
+        params = [target_date, next_day]
+        if after:
+            sql += " AND (a.timestamp, a.id) < (?, ?)"
+            params.extend(_parse_page_token(after))
+        sql += " ORDER BY a.timestamp DESC, a.id DESC LIMIT ?"
+        params.append(page_size + 1)
+
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        connect.close()
+
+        more = len(rows) > page_size
+        rows = rows[:page_size]
+        records = [
+            {
+                "attendance_id": r[0],
+                "name": r[1],
+                "roll": r[2],
+                "department": r[3],
+                "timestamp": r[4],
+                "status": r[5],
+            }
+            for r in rows
+        ]
+        next_token = _page_token(rows[-1][4], rows[-1][0]) if more else None
+
+        return True, {"records": records, "next": next_token}
+
+    except Exception as e:
+        return False, f"Error: {e}"
+
+#######################################
+
+# Function: get_attendance_page_by_student
+# Purpose: One page of get_attendance_by_student, newest first, keyset-paginated on (timestamp, id)
+def get_attendance_page_by_student(roll, page_size = 50, after = None):
+    try:
+        connect = sqlite3.connect(DB_PATH)
+        cursor = connect.cursor()
+
+        sql = """
+            SELECT a.id, a.timestamp, a.status
+            FROM {source} a
+            WHERE a.student_id = (SELECT id FROM students WHERE roll = ?)
+        """
+        params = [roll]
+        if after:
+            sql += " AND (a.timestamp, a.id) < (?, ?)"
+            params.extend(_parse_page_token(after))
+        sql += " ORDER BY a.timestamp DESC, a.id DESC LIMIT ?"
+        params.append(page_size + 1)
+
+        # Each group of archives gives its own newest rows; the page is the newest of those
+        rows = []
+        for source in _attendance_sources(cursor):
+            cursor.execute(sql.format(source = source), params)
+            rows.extend(cursor.fetchall())
+        connect.close()
+        rows.sort(key = lambda r: (r[1], r[0]), reverse = True)
+
+        more = len(rows) > page_size
+        rows = rows[:page_size]
+        history = [{"attendance_id": r[0], "timestamp": r[1], "status": r[2]} for r in rows]
+        next_token = _page_token(rows[-1][1], rows[-1][0]) if more else None
+
+        return True, {"records": history, "next": next_token}
+
+    except Exception as e:
+        return False, f"Error: {e}"
+
+#######################################
+
+# Function: get_daily_attendance_trend
+# Purpose: Return per-day Present/Absent counts from the rollup table, oldest first.
+#          Defaults to the last 30 days; optionally limited to one department.
+def get_daily_attendance_trend(start_date = None, end_date = None, department = None):
+    try:
+        if end_date is None:
+            end_date = _utc_today()
+        if start_date is None:
+            start_date = (date.fromisoformat(end_date) - timedelta(days = 29)).isoformat()
+
+        sql = """
+            SELECT day,
+                   SUM(CASE WHEN status = 'Present' THEN count ELSE 0 END),
+                   SUM(CASE WHEN status = 'Absent' THEN count ELSE 0 END)
+            FROM attendance_daily
+            WHERE day BETWEEN ? AND ?
+        """
+        params = [start_date, end_date]
+        if department is not None:
+            sql += " AND department = ?"
+            params.append(department)
+        sql += " GROUP BY day ORDER BY day"
+
+        connect = sqlite3.connect(DB_PATH)
+        cursor = connect.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        connect.close()
+
+        return True, [{"day": r[0], "present": r[1], "absent": r[2]} for r in rows]
+
+    except Exception as e:
+        return False, f"Error: {e}"
+
+#######################################
+
+# Function: get_department_attendance
+# Purpose: Return Present/Absent totals per department over a date range (from the rollups)
+def get_department_attendance(start_date, end_date):
+    try:
+        connect = sqlite3.connect(DB_PATH)
+        cursor = connect.cursor()
         cursor.execute(
             """
-            SELECT a.id, a.timestamp, a.status
-            FROM attendance a
-            JOIN students s ON a.student_id = s.id
+            SELECT department,
+                   SUM(CASE WHEN status = 'Present' THEN count ELSE 0 END),
+                   SUM(CASE WHEN status = 'Absent' THEN count ELSE 0 END)
+            FROM attendance_daily
+            WHERE day BETWEEN ? AND ?
+            GROUP BY department
+            ORDER BY department
+            """,
+            (start_date, end_date),
+        )
+        rows = cursor.fetchall()
+        connect.close()
+
+        return True, [{"department": r[0], "present": r[1], "absent": r[2]} for r in rows]
+
+    except Exception as e:
+        return False, f"Error: {e}"
+
+#######################################
+
+# Function: get_student_monthly_attendance
+# Purpose: Return a student's Present/Absent counts per month (YYYY-MM), oldest first
+def get_student_monthly_attendance(roll):
+    try:
+        connect = sqlite3.connect(DB_PATH)
+        cursor = connect.cursor()
+        cursor.execute(
+            """
+            SELECT m.month,
+                   SUM(CASE WHEN m.status = 'Present' THEN m.count ELSE 0 END),
+                   SUM(CASE WHEN m.status = 'Absent' THEN m.count ELSE 0 END)
+            FROM attendance_student_monthly m
+            JOIN students s ON s.id = m.student_id
             WHERE s.roll = ?
-            ORDER BY a.timestamp DESC
+            GROUP BY m.month
+            ORDER BY m.month
             """,
             (roll,),
         )
         rows = cursor.fetchall()
         connect.close()
 
-        history = []
-        for r in rows:
-            history.append({"attendance_id": r[0], "timestamp": r[1], "status": r[2]})
+        return True, [{"month": r[0], "present": r[1], "absent": r[2]} for r in rows]
 
-        return True, history
+    except Exception as e:
+        return False, f"Error: {e}"
+
+#######################################
+
+# Function: stream_attendance_report
+# Purpose: Yield {roll, name, department, attended, eligible, percentage} for every student
+#          (optionally of one department) over a date range, computed in one grouped query.
+#          Eligible days are the days on which the student's department took attendance.
+def stream_attendance_report(start_date, end_date, department = None, batch_size = 500):
+    end_exclusive = (date.fromisoformat(end_date) + timedelta(days = 1)).isoformat()
 
+    connect = sqlite3.connect(DB_PATH)
+    try:
+        cursor = connect.cursor()
+        source = _attendance_source(cursor, start_date, end_exclusive)
+
+        # Days attended are counted per student inside the range first, so the date filter
+        # reaches every archive tier rather than sitting in a join condition
+        sql = f"""
+            WITH eligible AS (
+                SELECT department, COUNT(DISTINCT day) AS days
+                FROM attendance_daily
+                WHERE day BETWEEN ? AND ?
+                GROUP BY department
+            ),
+            present AS (
+                SELECT a.student_id, COUNT(DISTINCT date(a.timestamp)) AS days
+                FROM {source} a
+                WHERE a.status = 'Present' AND a.timestamp >= ? AND a.timestamp < ?
+                GROUP BY a.student_id
+            )
+            SELECT s.roll, s.name, s.department,
+                   COALESCE(p.days, 0) AS attended,
+                   COALESCE(e.days, 0) AS eligible
+            FROM students s
+            LEFT JOIN eligible e ON e.department = COALESCE(s.department, '')
+            LEFT JOIN present p ON p.student_id = s.id
+        """
+        params = [start_date, end_date, start_date, end_exclusive]
+        if department is not None:
+            sql += " WHERE s.department = ?"
+            params.append(department)
+        sql += " ORDER BY s.roll"
+
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for r in rows:
+                yield {
+                    "roll": r[0],
+                    "name": r[1],
+                    "department": r[2],
+                    "attended": r[3],
+                    "eligible": r[4],
+                    "percentage": round(100.0 * r[3] / r[4], 2) if r[4] else 0.0,
+                }
+    finally:
+        connect.close()
+
+#######################################
+
+# Function: get_attendance_report
+# Purpose: List version of stream_attendance_report with the usual (success, result) return
+def get_attendance_report(start_date, end_date, department = None):
+    try:
+        return True, list(stream_attendance_report(start_date, end_date, department))
     except Exception as e:
         return False, f"Error: {e}"
 
@@ -340,6 +2010,17 @@ def clear_all_data():
         cursor.execute("DELETE FROM attendance")
         attendance_deleted = cursor.rowcount
         
+        # Clear rollups along with the rows they summarize
+        cursor.execute("DELETE FROM attendance_daily")
+        cursor.execute("DELETE FROM attendance_student_monthly")
+
+        # Archived attendance too; ids restart below, so old archive files must not survive
+        cursor.execute("SELECT year FROM attendance_archives")
+        for (year,) in cursor.fetchall():
+            if os.path.exists(_archive_path(year)):
+                os.remove(_archive_path(year))
+        cursor.execute("DELETE FROM attendance_archives")
+
         # Clear all student records
         cursor.execute("DELETE FROM students")
         students_deleted = cursor.rowcount
@@ -350,6 +2031,8 @@ def clear_all_data():
         
         connect.commit()
         connect.close()
+        _bump_version("students", "attendance")
+        _forget_marked_today()
         
         return True, f"Cleared {students_deleted} students and {attendance_deleted} attendance records."
         
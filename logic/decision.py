@@ -0,0 +1,136 @@
+############### IMPORTS ###############
+import json
+import os
+from collections import deque, Counter
+
+############## CONSTANTS ##############
+
+DEFAULT_THRESHOLD = 70      # LBPH distance: smaller = better match
+MIN_THRESHOLD = 45          # Calibrated thresholds are clamped to this range
+MAX_THRESHOLD = 90
+
+############## FUNCTIONS ##############
+
+# Function: thresholds_path_for
+# Purpose: Return the calibration file stored next to a model file (trainer.yml -> trainer_thresholds.json)
+def thresholds_path_for(model_path):
+    return os.path.splitext(model_path)[0] + "_thresholds.json"
+
+############### DECISION ENGINE CLASS ###############
+class DecisionEngine:
+    def __init__(self, thresholds_path = None, window = 5, min_votes = 3, strong_ratio = 0.6, max_missed = 5):
+        """
+        Decide who a face belongs to from several frames instead of one predict call.
+        Predictions are collected per track over a sliding window; a student is
+        accepted once enough frames agree and their mean distance is under that
+        student's calibrated threshold. A single very strong match
+        (distance < threshold * strong_ratio) is accepted immediately.
+        Tracks that match no face for max_missed frames (see next_frame) are forgotten.
+        """
+        self.window = window
+        self.min_votes = min_votes
+        self.strong_ratio = strong_ratio
+        self.max_missed = max_missed
+        self.thresholds = {}
+        self.default_threshold = DEFAULT_THRESHOLD
+        self.tracks = {}
+        self._boxes = {}
+        self._seen = {}             # track ID -> last frame a face matched it
+        self._frame = 0
+        self._next_track = 0
+
+        if thresholds_path:
+            self.load_thresholds(thresholds_path)
+
+    def load_thresholds(self, path):
+        """Load per-student thresholds written by Trainer.calibrate_thresholds"""
+        self.thresholds = {}
+        self.default_threshold = DEFAULT_THRESHOLD
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            self.default_threshold = float(data.get("default", DEFAULT_THRESHOLD))
+            self.thresholds = {int(k): float(v) for k, v in data.get("students", {}).items()}
+            return True
+        except Exception as e:
+            print(f"⚠️ Could not load recognition thresholds: {e}")
+            return False
+
+    def threshold_for(self, student_id):
+        return self.thresholds.get(int(student_id), self.default_threshold)
+
+    def is_match(self, student_id, confidence):
+        """Single-frame check against the student's threshold"""
+        return confidence < self.threshold_for(student_id)
+
+    def track(self, box, max_shift = 0.5):
+        """
+        Return a track ID for a face box (x, y, w, h), reusing the track of the
+        previous box whose center is within max_shift * width of this one.
+        """
+        x, y, w, h = box
+        cx, cy = x + w / 2, y + h / 2
+        for track_id, (px, py, pw) in self._boxes.items():
+            if abs(cx - px) < pw * max_shift and abs(cy - py) < pw * max_shift:
+                self._boxes[track_id] = (cx, cy, w)
+                self._seen[track_id] = self._frame
+                return track_id
+
+        track_id = self._next_track
+        self._next_track += 1
+        self._boxes[track_id] = (cx, cy, w)
+        self._seen[track_id] = self._frame
+        return track_id
+
+    def next_frame(self):
+        """
+        Call once per frame before track(). Forgets tracks that matched no face in
+        the last max_missed frames, so a new person standing where the previous one
+        stood starts a fresh track instead of inheriting its decision.
+        Returns the expired track IDs.
+        """
+        self._frame += 1
+        expired = [track_id for track_id, seen in self._seen.items() if self._frame - seen > self.max_missed]
+        for track_id in expired:
+            self.reset(track_id)
+        return expired
+
+    def add(self, track_id, student_id, confidence):
+        """
+        Add one prediction to a track.
+        Returns (student_id, confidence) once accepted, (None, confidence) once the
+        window is full without agreement, or None while still undecided.
+        """
+        history = self.tracks.setdefault(track_id, deque(maxlen = self.window))
+        history.append((int(student_id), float(confidence)))
+
+        threshold = self.threshold_for(student_id)
+        if confidence < threshold * self.strong_ratio:
+            return int(student_id), float(confidence)
+
+        # Votes only count for frames that pass their own student's threshold
+        votes = Counter(sid for sid, conf in history if self.is_match(sid, conf))
+        if votes:
+            best_id, count = votes.most_common(1)[0]
+            if count >= self.min_votes:
+                distances = [conf for sid, conf in history if sid == best_id]
+                mean = sum(distances) / len(distances)
+                if mean < self.threshold_for(best_id):
+                    return best_id, mean
+
+        if len(history) == self.window:
+            return None, min(conf for _, conf in history)
+        return None
+
+    def reset(self, track_id = None):
+        """Forget one track, or every track if no ID is given"""
+        if track_id is None:
+            self.tracks.clear()
+            self._boxes.clear()
+            self._seen.clear()
+        else:
+            self.tracks.pop(track_id, None)
+            self._boxes.pop(track_id, None)
+            self._seen.pop(track_id, None)
@@ -1,14 +1,19 @@
 ############### IMPORTS ###############
 import cv2
+import json
 import os
 import numpy as np
 
+from logic.decision import thresholds_path_for, DEFAULT_THRESHOLD, MIN_THRESHOLD, MAX_THRESHOLD
+from logic.recognizers import create_backend, load_backend
+
 ############### TRAINING CLASS ###############
 class Trainer:
-    def __init__(self, dataset_path = "dataset", model_path = "trainer.yml"):
+    def __init__(self, dataset_path = "dataset", model_path = "trainer.yml", backend = None):
         self.dataset_path = dataset_path
         self.model_path = model_path
-        self.recognizer = cv2.face.LBPHFaceRecognizer_create()
+        # "lbph" (default) or "sface"; see logic/recognizers.py
+        self.recognizer = create_backend(backend)
 
     def train_model(self, images_path = None):
         if images_path:
@@ -18,16 +23,106 @@ class Trainer:
             raise Exception("❌ No face images found in dataset.")
     
         print("⏳ Training model, please wait...")
-        self.recognizer.train(faces, np.array(ids))
+        self.recognizer.train(faces, ids)
         self.recognizer.save(self.model_path)
         print(f"✅ Training complete. Model saved as {self.model_path}")
 
-    def load_images(self):
+        self.calibrate_thresholds(faces, ids)
+
+    def add_samples(self, faces, ids):
+        """Add new samples to the saved model without retraining everything"""
+        model = load_backend(self.model_path)
+        model.add(faces, ids)
+        model.save(self.model_path)
+        print(f"✅ Added {len(faces)} samples to {self.model_path}")
+
+    def add_images(self, paths):
+        """
+        Add the sample files at paths (<roll>_<n>.jpg) to the saved model, so a newly
+        enrolled student is recognized without retraining everyone. Without a saved
+        model yet, the whole dataset is trained instead.
+        """
+        if not os.path.exists(self.model_path):
+            self.train_model()
+            return
+        faces, ids = self.load_images(paths)
+        if len(faces) == 0:
+            raise Exception("❌ No face images found to add.")
+        self.add_samples(faces, ids)
+
+    def remove_student(self, student_id):
+        """Drop a student from the saved model; returns 0 when the backend needs a retrain instead (LBPH)"""
+        model = load_backend(self.model_path)
+        removed = model.remove(int(student_id))
+        if removed:
+            model.save(self.model_path)
+            print(f"✅ Removed {removed} samples of student {student_id} from {self.model_path}")
+        return removed
+
+    def calibrate_thresholds(self, faces, ids, holdout_every = 5):
+        """
+        Work out a recognition threshold per student from the enrollment images.
+        Every Nth sample is held out, a temporary model is trained on the rest, and
+        the held-out distances set each student's threshold: high enough to accept
+        their own faces, lower than the distance at which others were confused with them.
+        """
+        train_faces, train_ids, held_out = [], [], []
+        seen = {}
+        for face, student_id in zip(faces, ids):
+            seen[student_id] = seen.get(student_id, 0) + 1
+            if seen[student_id] % holdout_every == 0:
+                held_out.append((face, student_id))
+            else:
+                train_faces.append(face)
+                train_ids.append(student_id)
+
+        path = thresholds_path_for(self.model_path)
+        if not held_out or not train_faces:
+            # Not enough samples to calibrate, fall back to the default threshold
+            if os.path.exists(path):
+                os.remove(path)
+            return {}
+
+        temp = create_backend(self.recognizer.name)
+        temp.train(train_faces, train_ids)
+
+        genuine = {}
+        impostor = {}
+        for face, student_id in held_out:
+            predicted, distance = temp.predict(face)
+            if predicted == student_id:
+                genuine.setdefault(student_id, []).append(distance)
+            else:
+                impostor[predicted] = min(impostor.get(predicted, distance), distance)
+
+        thresholds = {}
+        for student_id in set(ids):
+            distances = genuine.get(student_id)
+            if distances:
+                threshold = float(np.percentile(distances, 90)) * 1.15
+            else:
+                threshold = DEFAULT_THRESHOLD
+            if student_id in impostor:
+                threshold = min(threshold, impostor[student_id] * 0.95)
+            thresholds[str(student_id)] = round(min(max(threshold, MIN_THRESHOLD), MAX_THRESHOLD), 2)
+
+        # Replaced in one rename, like the model, so readers and backups never see half a file
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"default": DEFAULT_THRESHOLD, "students": thresholds}, f, indent = 2)
+        os.replace(tmp, path)
+        print(f"✅ Calibrated thresholds for {len(thresholds)} students saved as {path}")
+        return thresholds
+
+    def load_images(self, paths = None):
+        """Read <roll>_<n>.jpg samples from the dataset folder, or just the given files"""
         faces = []
         ids = []
-        for filename in os.listdir(self.dataset_path):
+        if paths is None:
+            paths = [os.path.join(self.dataset_path, f) for f in os.listdir(self.dataset_path)]
+        for path in paths:
+            filename = os.path.basename(path)
             if filename.endswith(".jpg"):
-                path = os.path.join(self.dataset_path, filename)
                 img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
                 
                 if img is not None:
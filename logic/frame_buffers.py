@@ -0,0 +1,69 @@
+############### IMPORTS ###############
+import cv2
+import numpy as np
+
+############### FRAME BUFFERS CLASS ###############
+class FrameBuffers:
+    def __init__(self, preview_size = (400, 300)):
+        """
+        Arrays reused by every frame of a capture loop instead of allocating new ones.
+        OpenCV writes into them through its dst arguments; they are (re)allocated only
+        when the camera resolution changes. Anything returned by these methods is
+        overwritten by the next frame, so copy it if it must outlive the frame.
+        """
+        self.preview_size = preview_size
+        self.frame = None
+        self.gray = None
+        self.small = None
+        self.rgb = np.empty((preview_size[1], preview_size[0], 3), np.uint8)
+
+    def read(self, cap):
+        """Read the next frame from a cv2.VideoCapture into the reused frame buffer"""
+        if self.frame is None:
+            ret, frame = cap.read()
+        else:
+            ret, frame = cap.read(self.frame)
+        if ret:
+            self.frame = frame
+        return ret, frame
+
+    def to_gray(self, frame):
+        """Grayscale copy of frame in the reused gray buffer"""
+        if self.gray is None or self.gray.shape != frame.shape[:2]:
+            self.gray = np.empty(frame.shape[:2], np.uint8)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst = self.gray)
+        return self.gray
+
+    def to_preview_rgb(self, frame):
+        """Frame resized to preview_size and converted to RGB (resize first: fewer pixels to convert)"""
+        width, height = self.preview_size
+        if self.small is None:
+            self.small = np.empty((height, width, 3), np.uint8)
+        cv2.resize(frame, (width, height), dst = self.small, interpolation = cv2.INTER_AREA)
+        cv2.cvtColor(self.small, cv2.COLOR_BGR2RGB, dst = self.rgb)
+        return self.rgb
+
+############### PREVIEW IMAGE CLASS ###############
+class PreviewImage:
+    def __init__(self, size = (400, 300)):
+        """
+        One persistent Tk PhotoImage for a live preview.
+        update() pastes new pixels into it in place, so the widget showing it is
+        configured once instead of getting a new PhotoImage every frame.
+        Must be created and updated on the Tk main thread.
+        """
+        from PIL import ImageTk
+
+        self.size = size
+        self.buffers = FrameBuffers(preview_size = size)
+        self.photo = ImageTk.PhotoImage("RGB", size)
+
+    def update(self, frame):
+        """Show a BGR frame; returns the PhotoImage for the widget"""
+        from PIL import Image
+
+        rgb = self.buffers.to_preview_rgb(frame)
+        # frombuffer wraps the NumPy buffer without copying it
+        image = Image.frombuffer("RGB", self.size, rgb, "raw", "RGB", 0, 1)
+        self.photo.paste(image)
+        return self.photo
@@ -0,0 +1,92 @@
+############### IMPORTS ###############
+import cv2
+import os
+import queue
+import threading
+import time
+
+############### ASYNC IMAGE WRITER CLASS ###############
+class AsyncImageWriter:
+    def __init__(self, max_queue = 32, fsync = True):
+        """
+        Encode and save images on a background thread.
+        The queue is bounded so a slow disk slows the producer down
+        instead of growing memory without limit.
+        """
+        self.queue = queue.Queue(maxsize = max_queue)
+        self.fsync = fsync
+        self.written = 0
+        self.errors = []
+        self.blocked_puts = 0       # submit() calls that found the queue full
+        self.blocked_seconds = 0.0  # total time the producer waited on a full queue
+        self._thread = threading.Thread(target = self._run, daemon = True)
+        self._thread.start()
+
+    def submit(self, path, image):
+        """
+        Queue an image to be written to path.
+        The writer takes ownership of the array, so do not modify it afterwards.
+        Returns True if the call had to wait for space in the queue (back-pressure).
+        """
+        try:
+            self.queue.put_nowait((path, image))
+            return False
+        except queue.Full:
+            start = time.perf_counter()
+            self.queue.put((path, image))
+            self.blocked_puts += 1
+            self.blocked_seconds += time.perf_counter() - start
+            return True
+
+    def pending(self):
+        """Number of images waiting to be written"""
+        return self.queue.qsize()
+
+    def flush(self):
+        """Block until every submitted image has been written"""
+        self.queue.join()
+
+    def close(self):
+        """Flush the queue, stop the worker thread and return write statistics"""
+        self.flush()
+        self.queue.put(None)
+        self._thread.join()
+        return self.stats()
+
+    def stats(self):
+        return {
+            "written": self.written,
+            "errors": len(self.errors),
+            "blocked_puts": self.blocked_puts,
+            "blocked_seconds": self.blocked_seconds,
+        }
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                path, image = item
+                self._write(path, image)
+                self.written += 1
+            except Exception as e:
+                self.errors.append((item[0], str(e)))
+                print(f"❌ Failed to write {item[0]}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _write(self, path, image):
+        """Encode to the file's format and write it atomically (temp file + rename)"""
+        ext = os.path.splitext(path)[1] or ".jpg"
+        ok, encoded = cv2.imencode(ext, image)
+        if not ok:
+            raise Exception(f"Could not encode image as {ext}")
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encoded.tobytes())
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
@@ -0,0 +1,204 @@
+# logic/metrics.py
+############### IMPORTS ###############
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+############## CONSTANTS ##############
+
+WINDOW_SIZE = 1024      # Samples kept per stage for percentiles
+ENABLED = True          # Set to False to turn instrumentation into a no-op
+
+_lock = threading.Lock()
+_stages = {}
+_gauges = {}
+
+############## CLASSES ##############
+
+# CLASS: RollingHistogram
+# Purpose: Keep the last WINDOW_SIZE durations of one stage plus lifetime count/total
+class RollingHistogram:
+    def __init__(self, size = WINDOW_SIZE):
+        self.samples = deque(maxlen = size)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        n = len(ordered)
+
+        def pct(p):
+            if n == 0:
+                return 0.0
+            return ordered[min(n - 1, int(p * n))]
+
+        return {
+            "count": self.count,
+            "mean_ms": (self.total / self.count * 1000) if self.count else 0.0,
+            "p50_ms": pct(0.50) * 1000,
+            "p95_ms": pct(0.95) * 1000,
+            "p99_ms": pct(0.99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+############## FUNCTIONS ##############
+
+# Function: record
+# Purpose: Add one duration (in seconds) to a stage's histogram
+def record(stage, seconds):
+    if not ENABLED:
+        return
+    with _lock:
+        hist = _stages.get(stage)
+        if hist is None:
+            hist = _stages[stage] = RollingHistogram()
+        hist.add(seconds)
+
+#######################################
+
+# Function: timer
+# Purpose: Context manager that times the enclosed block under a stage name
+@contextmanager
+def timer(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+#######################################
+
+# Function: timed
+# Purpose: Decorator version of timer() for whole functions
+def timed(stage):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+#######################################
+
+# Function: set_gauge
+# Purpose: Record the current value of something that is not a duration (queue depth, batch size)
+def set_gauge(name, value):
+    if not ENABLED:
+        return
+    with _lock:
+        _gauges[name] = value
+
+#######################################
+
+# Function: get_gauges
+# Purpose: Return {name: latest value}
+def get_gauges():
+    with _lock:
+        return dict(sorted(_gauges.items()))
+
+#######################################
+
+# Function: get_stats
+# Purpose: Return {stage: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}
+def get_stats():
+    with _lock:
+        return {stage: hist.summary() for stage, hist in sorted(_stages.items())}
+
+#######################################
+
+# Function: reset
+# Purpose: Drop all collected samples
+def reset():
+    with _lock:
+        _stages.clear()
+        _gauges.clear()
+
+#######################################
+
+# Function: to_prometheus
+# Purpose: Render the stats in the Prometheus text exposition format
+def to_prometheus():
+    lines = [
+        "# HELP facetrack_stage_seconds Duration of instrumented stages.",
+        "# TYPE facetrack_stage_seconds summary",
+    ]
+    for stage, s in get_stats().items():
+        for q, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+            lines.append(f'facetrack_stage_seconds{{stage="{stage}",quantile="{q}"}} {s[key] / 1000:.6f}')
+        lines.append(f'facetrack_stage_seconds_sum{{stage="{stage}"}} {s["mean_ms"] * s["count"] / 1000:.6f}')
+        lines.append(f'facetrack_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+    gauges = get_gauges()
+    if gauges:
+        lines.append("# HELP facetrack_gauge Latest value of instrumented quantities.")
+        lines.append("# TYPE facetrack_gauge gauge")
+        for name, value in gauges.items():
+            lines.append(f'facetrack_gauge{{name="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+#######################################
+
+# Function: write_prometheus
+# Purpose: Write the Prometheus text to a file (e.g. for node_exporter's textfile collector)
+def write_prometheus(path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(to_prometheus())
+    os.replace(tmp_path, path)
+
+#######################################
+
+# Function: start_file_exporter
+# Purpose: Rewrite the Prometheus file every `interval` seconds on a daemon thread
+def start_file_exporter(path, interval = 15):
+    def loop():
+        while True:
+            try:
+                write_prometheus(path)
+            except Exception as e:
+                print(f"⚠️ Could not write metrics file: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target = loop, daemon = True)
+    thread.start()
+    return thread
+
+#######################################
+
+# Function: start_http_server
+# Purpose: Serve /metrics (Prometheus text) on localhost from a daemon thread
+def start_http_server(port = 9108, host = "127.0.0.1"):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            body = to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep the console quiet
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    print(f"📈 Metrics available at http://{host}:{port}/metrics")
+    return server
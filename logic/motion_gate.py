@@ -0,0 +1,120 @@
+############### IMPORTS ###############
+import cv2
+import json
+import os
+import numpy as np
+
+############## CONSTANTS ##############
+
+ROI_CONFIG = os.path.join("data", "kiosk_rois.json")
+GATE_WIDTH = 160            # Motion is measured on a frame scaled down to this width
+IDLE_WAIT_MS = 100          # Camera polling interval while nothing moves (~10 FPS instead of 30+)
+
+############## FUNCTIONS ##############
+
+# Function: load_rois
+# Purpose: Read regions of interest from a JSON file: {"rois": [[x, y, w, h], ...]} as fractions of the frame
+def load_rois(path = ROI_CONFIG):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            rois = json.load(f).get("rois") or None
+        if rois:
+            for roi in rois:
+                if len(roi) != 4 or not all(0 <= v <= 1 for v in roi):
+                    raise ValueError(f"invalid region {roi}")
+        return rois
+    except Exception as e:
+        print(f"⚠️ Ignoring {path}: {e}")
+        return None
+
+############### MOTION GATE CLASS ###############
+class MotionGate:
+    def __init__(self, rois = None, diff_threshold = 25, min_changed = 0.01, hold_frames = 15):
+        """
+        Cheap motion check that decides whether face detection should run on a frame.
+        Each frame is scaled down to GATE_WIDTH, blurred and compared with the
+        previous one; detection wakes up when more than min_changed of the pixels
+        inside the regions of interest changed, and stays awake for hold_frames
+        afterwards so a person standing still is still recognized.
+
+        rois are (x, y, w, h) fractions of the frame, e.g. (0.3, 0.0, 0.4, 1.0) for
+        a doorway in the middle third. None means the whole frame.
+        """
+        self.rois = [tuple(r) for r in rois] if rois else [(0.0, 0.0, 1.0, 1.0)]
+        self.diff_threshold = diff_threshold
+        self.min_changed = min_changed
+        self.hold_frames = hold_frames
+
+        self.size = None
+        self._frame_shape = None
+        self.small = None
+        self.gray = None
+        self.previous = None
+        self.diff = None
+        self.mask = None
+        self.mask_pixels = 0
+        self.awake_for = 0
+        self.stats = {"frames": 0, "active": 0}
+
+    def _allocate(self, shape):
+        """Buffers and ROI mask at gate resolution, rebuilt only when the camera resolution changes"""
+        height, width = shape[:2]
+        self.size = (GATE_WIDTH, max(1, round(height * GATE_WIDTH / width)))
+        gw, gh = self.size
+        self.small = np.empty((gh, gw, 3), np.uint8)
+        self.gray = np.empty((gh, gw), np.uint8)
+        self.previous = None
+        self.diff = np.empty((gh, gw), np.uint8)
+        self.mask = np.zeros((gh, gw), np.uint8)
+        for x, y, w, h in self.regions((gh, gw)):
+            self.mask[y:y+h, x:x+w] = 255
+        self.mask_pixels = max(1, cv2.countNonZero(self.mask))
+        self._frame_shape = shape[:2]
+
+    def regions(self, shape):
+        """ROIs in pixels for a frame of the given shape (height, width)"""
+        height, width = shape[:2]
+        boxes = []
+        for x, y, w, h in self.rois:
+            px, py = int(x * width), int(y * height)
+            boxes.append((px, py, max(1, int(w * width)), max(1, int(h * height))))
+        return boxes
+
+    def check(self, frame):
+        """Return True if detection should run on this BGR frame"""
+        if self.mask is None or frame.shape[:2] != self._frame_shape:
+            self._allocate(frame.shape)
+
+        self.stats["frames"] += 1
+        cv2.resize(frame, self.size, dst = self.small, interpolation = cv2.INTER_NEAREST)
+        cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst = self.gray)
+        cv2.GaussianBlur(self.gray, (5, 5), 0, dst = self.gray)
+
+        if self.previous is None:
+            # First frame: nothing to compare with, so look once
+            self.previous = self.gray.copy()
+            moved = True
+        else:
+            cv2.absdiff(self.gray, self.previous, dst = self.diff)
+            cv2.threshold(self.diff, self.diff_threshold, 255, cv2.THRESH_BINARY, dst = self.diff)
+            cv2.bitwise_and(self.diff, self.mask, dst = self.diff)
+            moved = cv2.countNonZero(self.diff) / self.mask_pixels >= self.min_changed
+            # Swap buffers instead of copying: the current frame becomes the reference
+            self.previous, self.gray = self.gray, self.previous
+
+        if moved:
+            self.awake_for = self.hold_frames
+        elif self.awake_for > 0:
+            self.awake_for -= 1
+
+        active = moved or self.awake_for > 0
+        if active:
+            self.stats["active"] += 1
+        return active
+
+    def reset(self):
+        """Forget the reference frame, e.g. after the camera was reopened"""
+        self.previous = None
+        self.awake_for = 0
@@ -0,0 +1,297 @@
+# logic/recognition_server.py
+# Usage (from the project root):
+#   python -m logic.recognition_server --port 8765 --mark
+############### IMPORTS ###############
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+from urllib.request import Request, urlopen
+
+import cv2
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from logic import db_handler
+from logic import metrics
+from logic.shared_model import ParallelRecognizer, SharedModelPublisher
+from logic.attendance_journal import SERVER_JOURNAL_PATH
+from logic.user_auth import Authenticator
+
+############## CONSTANTS ##############
+
+DEFAULT_PORT = 8765
+MAX_BATCH = 16          # Most requests handled by one model call
+MAX_WAIT_MS = 5         # Longest the first request of a batch waits for company
+
+############## CLASSES ##############
+
+# CLASS: _Job
+# Purpose: One request waiting in the batch queue
+class _Job:
+    def __init__(self, image, mode, mark, room = None):
+        self.image = image
+        self.mode = mode            # "face": image is already a crop; "frame": detect faces first
+        self.mark = mark
+        self.room = room            # Kiosk's room, for linking marks to the session running there
+        self.queued = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+############### RECOGNITION SERVER CLASS ###############
+class RecognitionServer:
+    def __init__(self, model_path = "trainer.yml", host = "127.0.0.1", port = DEFAULT_PORT,
+                 max_batch = MAX_BATCH, max_wait_ms = MAX_WAIT_MS, mark = False, workers = 0, room = None):
+        """
+        One process that owns the model and answers recognition requests from any
+        number of kiosks on this machine. Concurrent requests are grouped into
+        micro-batches: the first request waits at most max_wait_ms for others, then
+        detection runs per image and matching runs once for every face in the batch.
+        With workers > 0 matching is spread over a ParallelRecognizer pool that reads
+        one copy of the model from shared memory, republished whenever it is retrained.
+        room is used for marks from requests that do not name their own (?room=).
+        """
+        self.auth = Authenticator(model_path)
+        if not self.auth.is_ready():
+            raise Exception("Authenticator not ready. Please train the model first.")
+        self.model_path = model_path
+        self.model_mtime = os.path.getmtime(model_path)
+        self.host = host
+        self.port = port
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.mark = mark
+        self.room = room
+
+        self.publisher = None
+        self.parallel = None
+        if workers > 0:
+            self.publisher = SharedModelPublisher()
+            self.publisher.publish(model_path)
+            self.parallel = ParallelRecognizer(workers, model_path = model_path)
+
+        self.jobs = queue.Queue()
+        self.batch_sizes = {}
+        self._stop = threading.Event()
+        self._httpd = None
+
+    ########## Batching ##########
+
+    def submit(self, image, mode = "frame", mark = None, room = None):
+        """Queue one image and block until its batch has been processed"""
+        job = _Job(image, mode, self.mark if mark is None else mark, room or self.room)
+        self.jobs.put(job)
+        metrics.set_gauge("server.queue_depth", self.jobs.qsize())
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _collect(self):
+        """Block for the first job, then gather more until the batch is full or max_wait passes"""
+        try:
+            batch = [self.jobs.get(timeout = 0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.jobs.get(timeout = remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+            metrics.set_gauge("server.queue_depth", self.jobs.qsize())
+            metrics.set_gauge("server.batch_size", len(batch))
+            self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+            try:
+                self._reload_if_changed()
+                with metrics.timer("server.batch"):
+                    self._process(batch)
+            except Exception as e:
+                for job in batch:
+                    job.error = e
+            finally:
+                for job in batch:
+                    job.done.set()
+
+    def _reload_if_changed(self):
+        """Pick up a retrained model between batches"""
+        mtime = os.path.getmtime(self.model_path)
+        if mtime != self.model_mtime:
+            self.model_mtime = mtime
+            self.auth.reload_model()
+            if self.publisher is not None:
+                # Workers switch to the new segment on their next refresh
+                self.publisher.publish(self.model_path)
+
+    def _process(self, batch):
+        crops = []
+        owners = []         # (job, box) for every crop, in order
+        for job in batch:
+            metrics.record("server.queue_wait", time.perf_counter() - job.queued)
+            job.result = []
+            gray = job.image if job.image.ndim == 2 else cv2.cvtColor(job.image, cv2.COLOR_BGR2GRAY)
+            if job.mode == "face":
+                crops.append(gray)
+                owners.append((job, None))
+                continue
+            for (x, y, w, h) in self.auth.detect_faces(gray):
+                crops.append(gray[y:y+h, x:x+w])
+                owners.append((job, [int(x), int(y), int(w), int(h)]))
+
+        with metrics.timer("server.predict"):
+            matcher = self.parallel if self.parallel is not None else self.auth.recognizer
+            predictions = matcher.predict_many(crops)
+
+        for (job, box), (student_id, confidence) in zip(owners, predictions):
+            student_id = int(student_id)
+            accepted = self.auth.decision.is_match(student_id, confidence)
+            face = {
+                "box": box,
+                "roll": str(student_id) if accepted else None,
+                "confidence": round(float(confidence), 2),
+                "accepted": accepted,
+            }
+            if accepted and job.mark:
+                face["marked"], face["message"] = db_handler.mark_attendance(str(student_id), "Present", job.room)
+            job.result.append(face)
+
+    ########## HTTP ##########
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, code, payload, content_type = "application/json"):
+                body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = urlparse(self.path).path.rstrip("/")
+                if path == "/metrics":
+                    self._reply(200, metrics.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+                elif path == "/stats":
+                    self._reply(200, server.stats())
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                if url.path.rstrip("/") != "/recognize":
+                    self.send_error(404)
+                    return
+                params = parse_qs(url.query)
+                mode = params.get("mode", ["frame"])[0]
+                mark = params["mark"][0] == "1" if "mark" in params else None
+                room = params.get("room", [None])[0]
+                data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                flags = cv2.IMREAD_GRAYSCALE if mode == "face" else cv2.IMREAD_COLOR
+                image = cv2.imdecode(np.frombuffer(data, np.uint8), flags) if data else None
+                if image is None or mode not in ("face", "frame"):
+                    self._reply(400, {"error": "expected a JPEG/PNG body and mode=face|frame"})
+                    return
+                try:
+                    self._reply(200, {"faces": server.submit(image, mode, mark, room)})
+                except Exception as e:
+                    self._reply(500, {"error": str(e)})
+
+            def log_message(self, format, *args):
+                pass  # Keep the console quiet
+
+        return Handler
+
+    def stats(self):
+        return {
+            "queue_depth": self.jobs.qsize(),
+            "batch_sizes": {str(k): v for k, v in sorted(self.batch_sizes.items())},
+            "stages": {k: v for k, v in metrics.get_stats().items() if k.startswith("server.")},
+        }
+
+    def start(self):
+        """Start the batcher and HTTP threads; returns immediately"""
+        threading.Thread(target = self._run, daemon = True).start()
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._handler())
+        threading.Thread(target = self._httpd.serve_forever, daemon = True).start()
+        print(f"🛰️ Recognition server listening on http://{self.host}:{self.port}/recognize")
+
+    def stop(self):
+        self._stop.set()
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+        if self.parallel is not None:
+            self.parallel.close()
+        if self.publisher is not None:
+            self.publisher.close()
+
+############## CLIENT FUNCTIONS ##############
+
+# Function: recognize_remote
+# Purpose: Send a BGR frame (or a face crop with mode="face") to a running server; returns the faces list.
+#          mark=None leaves marking to the server's --mark setting
+def recognize_remote(image, mode = "frame", mark = None, room = None,
+                     url = f"http://127.0.0.1:{DEFAULT_PORT}", timeout = 5):
+    ok, encoded = cv2.imencode(".png" if mode == "face" else ".jpg", image)
+    if not ok:
+        raise ValueError("Could not encode image")
+    params = {"mode": mode}
+    if mark is not None:
+        params["mark"] = int(mark)
+    if room is not None:
+        params["room"] = room
+    query = urlencode(params)
+    request = Request(f"{url}/recognize?{query}", data = encoded.tobytes(),
+                      headers = {"Content-Type": "application/octet-stream"})
+    with urlopen(request, timeout = timeout) as response:
+        return json.loads(response.read())["faces"]
+
+############### MAIN ###############
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "FaceTrack local recognition server")
+    parser.add_argument("--model", default = "trainer.yml")
+    parser.add_argument("--port", type = int, default = DEFAULT_PORT)
+    parser.add_argument("--max-batch", type = int, default = MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type = float, default = MAX_WAIT_MS)
+    parser.add_argument("--mark", action = "store_true", help = "mark attendance for accepted faces by default")
+    parser.add_argument("--room", default = os.environ.get("FACETRACK_ROOM"),
+                        help = "room for marks whose request has no ?room= (default: FACETRACK_ROOM)")
+    parser.add_argument("--workers", type = int, default = 0,
+                        help = "match faces in this many processes sharing one copy of the model")
+    args = parser.parse_args()
+
+    db_handler.ensure_schema()
+    # Its own journal: the GUI process journals to data/attendance.journal
+    ok, msg = db_handler.start_attendance_journal(SERVER_JOURNAL_PATH)
+    print(("✅ " if ok else "⚠️ ") + msg)
+    server = RecognitionServer(args.model, port = args.port, max_batch = args.max_batch,
+                               max_wait_ms = args.max_wait_ms, mark = args.mark, workers = args.workers,
+                               room = args.room)
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+        db_handler.stop_attendance_journal()
@@ -0,0 +1,297 @@
+############### IMPORTS ###############
+import cv2
+import os
+import numpy as np
+
+############## CONSTANTS ##############
+
+# FACETRACK_RECOGNIZER=sface switches newly trained models to face embeddings
+DEFAULT_BACKEND = os.environ.get("FACETRACK_RECOGNIZER", "lbph")
+
+# OpenCV Zoo model: https://github.com/opencv/opencv_zoo/tree/main/models/face_recognition_sface
+SFACE_MODEL = os.path.join("model", "face_recognition_sface_2021dec.onnx")
+SFACE_INPUT = (112, 112)
+
+############## FUNCTIONS ##############
+
+# Function: create_backend
+# Purpose: Build a recognizer backend by name ("lbph" or "sface")
+def create_backend(name = None, **kwargs):
+    name = (name or DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown recognizer backend '{name}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name](**kwargs)
+
+#######################################
+
+# Function: detect_backend
+# Purpose: Tell which backend wrote a model file (LBPH writes YAML, the embedding index is a zip/npz)
+def detect_backend(model_path):
+    with open(model_path, "rb") as f:
+        return "sface" if f.read(2) == b"PK" else "lbph"
+
+#######################################
+
+# Function: load_backend
+# Purpose: Create the right backend for an existing model file and load it
+def load_backend(model_path, **kwargs):
+    backend = create_backend(detect_backend(model_path), **kwargs)
+    backend.load(model_path)
+    return backend
+
+############### BACKEND INTERFACE ###############
+class RecognizerBackend:
+    """
+    What Trainer and Authenticator need from a recognizer.
+    predict() returns (student_id, distance): lower is a better match, on roughly
+    the same 0-100+ scale as LBPH so DecisionEngine thresholds apply to both.
+    """
+    name = None
+
+    def train(self, faces, ids):
+        raise NotImplementedError
+
+    def add(self, faces, ids):
+        """Enroll more samples without retraining from scratch"""
+        raise NotImplementedError
+
+    def remove(self, student_id):
+        """Forget every sample of a student; returns how many were removed"""
+        raise NotImplementedError
+
+    def predict(self, face):
+        raise NotImplementedError
+
+    def predict_many(self, faces):
+        """predict() for a batch of faces; backends override this when they can do better"""
+        return [self.predict(face) for face in faces]
+
+    def save(self, path):
+        raise NotImplementedError
+
+    def load(self, path):
+        raise NotImplementedError
+
+    def export(self):
+        """(labels, float32 matrix with one row per sample, matching parameters) for sharing"""
+        raise NotImplementedError
+
+############### LBPH BACKEND ###############
+class LBPHBackend(RecognizerBackend):
+    name = "lbph"
+
+    def __init__(self):
+        """The original recognizer: LBP histograms compared by a linear scan"""
+        self.model = cv2.face.LBPHFaceRecognizer_create()
+
+    def train(self, faces, ids):
+        self.model.train(faces, np.array(ids))
+
+    def add(self, faces, ids):
+        self.model.update(faces, np.array(ids))
+
+    def remove(self, student_id):
+        # LBPH has no call to drop histograms; the student stays until the next full training
+        print(f"⚠️ LBPH models cannot forget student {student_id}: retrain needed (without their images)")
+        return 0
+
+    def predict(self, face):
+        return self.model.predict(face)
+
+    def save(self, path):
+        # Same temp-file-and-rename as SFaceBackend; OpenCV picks the format from the extension
+        root, ext = os.path.splitext(path)
+        tmp = f"{root}.tmp{ext}"
+        self.model.save(tmp)
+        os.replace(tmp, path)
+
+    def load(self, path):
+        self.model.read(path)
+
+    def export(self):
+        histograms = self.model.getHistograms()
+        labels = self.model.getLabels().reshape(-1).astype(np.int64)
+        vectors = np.vstack([h.reshape(1, -1) for h in histograms]).astype(np.float32) if histograms \
+            else np.empty((0, 0), np.float32)
+        params = {"radius": self.model.getRadius(), "neighbors": self.model.getNeighbors(),
+                  "grid_x": self.model.getGridX(), "grid_y": self.model.getGridY()}
+        return labels, vectors, params
+
+############### LBPH HISTOGRAM BACKEND ###############
+class LBPHHistogramBackend(RecognizerBackend):
+    name = "lbph"
+    CHUNK = 1024            # Stored histograms compared per numpy step (bounds temporary memory)
+
+    def __init__(self, index = None, radius = 1, neighbors = 8, grid_x = 8, grid_y = 8):
+        """
+        Read-only LBPH matcher over exported histograms (LBPHBackend.export), e.g. held
+        in shared memory. Gives the same answer as LBPHBackend.predict: nearest
+        histogram by the chi-square distance OpenCV's LBPH uses.
+        """
+        self.index = index if index is not None else EmbeddingIndex()
+        self._scratch = cv2.face.LBPHFaceRecognizer_create(radius, neighbors, grid_x, grid_y)
+
+    def histogram(self, face):
+        # OpenCV has no call for one face's histogram; training a one-image model
+        # computes it exactly as predict() would
+        self._scratch.train([face], np.array([0]))
+        return self._scratch.getHistograms()[0].reshape(-1)
+
+    def predict(self, face):
+        count = self.index.count
+        if count == 0:
+            return -1, float("inf")
+        query = self.histogram(face)
+        best_label, best_distance = -1, float("inf")
+        for start in range(0, count, self.CHUNK):
+            block = self.index.vectors[start:min(start + self.CHUNK, count)]
+            diff = block - query
+            total = block + query
+            # HISTCMP_CHISQR_ALT; histograms are non-negative, so total == 0 only where diff == 0
+            distances = 2 * np.sum(diff * diff / np.where(total > 0, total, 1), axis = 1)
+            best = int(np.argmin(distances))
+            if distances[best] < best_distance:
+                best_label, best_distance = int(self.index.labels[start + best]), float(distances[best])
+        return best_label, best_distance
+
+############### EMBEDDING INDEX ###############
+class EmbeddingIndex:
+    def __init__(self, dim = 128):
+        """
+        Exact nearest-neighbour index over L2-normalised embeddings.
+        Rows live in one preallocated float32 matrix so a lookup is a single
+        matrix-vector product; capacity doubles as students are added and
+        removal compacts the matrix in place.
+        """
+        self.dim = dim
+        self.vectors = np.empty((0, dim), np.float32)
+        self.labels = np.empty(0, np.int64)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _reserve(self, extra):
+        needed = self.count + extra
+        if needed <= len(self.vectors):
+            return
+        capacity = max(needed, 2 * len(self.vectors), 64)
+        vectors = np.empty((capacity, self.dim), np.float32)
+        labels = np.empty(capacity, np.int64)
+        vectors[:self.count] = self.vectors[:self.count]
+        labels[:self.count] = self.labels[:self.count]
+        self.vectors, self.labels = vectors, labels
+
+    def add(self, vectors, labels):
+        vectors = np.asarray(vectors, np.float32).reshape(-1, self.dim)
+        self._reserve(len(vectors))
+        end = self.count + len(vectors)
+        self.vectors[self.count:end] = vectors
+        self.labels[self.count:end] = labels
+        self.count = end
+
+    def remove(self, label):
+        keep = self.labels[:self.count] != label
+        kept = int(keep.sum())
+        removed = self.count - kept
+        if removed:
+            self.vectors[:kept] = self.vectors[:self.count][keep]
+            self.labels[:kept] = self.labels[:self.count][keep]
+            self.count = kept
+        return removed
+
+    def search(self, query):
+        """Return (label, cosine similarity) of the closest row, or (None, None) if empty"""
+        if self.count == 0:
+            return None, None
+        scores = self.vectors[:self.count] @ np.asarray(query, np.float32).reshape(self.dim)
+        best = int(np.argmax(scores))
+        return int(self.labels[best]), float(scores[best])
+
+    def search_many(self, queries):
+        """search() for a batch: one matrix-matrix product instead of one product per query"""
+        queries = np.asarray(queries, np.float32).reshape(-1, self.dim)
+        if self.count == 0:
+            return [(None, None)] * len(queries)
+        scores = queries @ self.vectors[:self.count].T
+        best = np.argmax(scores, axis = 1)
+        return [(int(self.labels[b]), float(scores[i, b])) for i, b in enumerate(best)]
+
+    def save(self, f):
+        np.savez(f, vectors = self.vectors[:self.count], labels = self.labels[:self.count])
+
+    def load(self, f):
+        with np.load(f) as data:
+            vectors, labels = data["vectors"], data["labels"]
+        self.dim = vectors.shape[1]
+        self.vectors = np.ascontiguousarray(vectors, np.float32)
+        self.labels = labels.astype(np.int64)
+        self.count = len(labels)
+
+############### SFACE BACKEND ###############
+class SFaceBackend(RecognizerBackend):
+    name = "sface"
+
+    def __init__(self, model_file = SFACE_MODEL):
+        """
+        128-d face embeddings from OpenCV's SFace ONNX model, matched through an
+        EmbeddingIndex. Haar crops are used as they are (no landmark alignment),
+        resized to the model's 112x112 input.
+        """
+        if not os.path.exists(model_file):
+            raise FileNotFoundError(f"SFace model not found at {model_file}")
+        self.model = cv2.FaceRecognizerSF.create(model_file, "")
+        self.index = EmbeddingIndex()
+        self._input = np.empty((SFACE_INPUT[1], SFACE_INPUT[0], 3), np.uint8)
+
+    def embed(self, face):
+        """L2-normalised embedding of one face crop (grayscale or BGR)"""
+        if face.ndim == 2:
+            resized = cv2.resize(face, SFACE_INPUT, interpolation = cv2.INTER_AREA)
+            cv2.cvtColor(resized, cv2.COLOR_GRAY2BGR, dst = self._input)
+        else:
+            cv2.resize(face, SFACE_INPUT, dst = self._input, interpolation = cv2.INTER_AREA)
+        feature = self.model.feature(self._input).reshape(-1)
+        return feature / max(float(np.linalg.norm(feature)), 1e-12)
+
+    def train(self, faces, ids):
+        self.index = EmbeddingIndex()
+        self.add(faces, ids)
+
+    def add(self, faces, ids):
+        self.index.add(np.stack([self.embed(face) for face in faces]), ids)
+
+    def remove(self, student_id):
+        return self.index.remove(student_id)
+
+    def predict(self, face):
+        label, similarity = self.index.search(self.embed(face))
+        if label is None:
+            return -1, float("inf")
+        # Cosine similarity 1.0 -> 0, SFace's usual match cut-off (~0.36) -> ~64
+        return label, (1.0 - similarity) * 100
+
+    def predict_many(self, faces):
+        if not faces:
+            return []
+        matches = self.index.search_many(np.stack([self.embed(face) for face in faces]))
+        return [(-1, float("inf")) if label is None else (label, (1.0 - similarity) * 100)
+                for label, similarity in matches]
+
+    def save(self, path):
+        # Write to a temp file first so a running Authenticator never reads half a model
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            self.index.save(f)
+        os.replace(tmp, path)
+
+    def load(self, path):
+        with open(path, "rb") as f:
+            self.index.load(f)
+
+    def export(self):
+        return self.index.labels[:self.index.count], self.index.vectors[:self.index.count], {}
+
+#######################################
+
+BACKENDS = {"lbph": LBPHBackend, "sface": SFaceBackend}
@@ -0,0 +1,191 @@
+############### IMPORTS ###############
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from logic.recognizers import EmbeddingIndex, LBPHHistogramBackend, SFaceBackend, load_backend
+
+############## CONSTANTS ##############
+
+# Small JSON file naming the current segment; replaced atomically on every publish
+SHARED_POINTER = os.path.join("model", "shared_model.json")
+REFRESH_SECONDS = 1.0       # How often workers look for a newly published model
+
+############## FUNCTIONS ##############
+
+# Function: _attach_segment
+# Purpose: Open an existing shared memory segment without letting this process unlink it on exit
+def _attach_segment(name):
+    segment = shared_memory.SharedMemory(name = name)
+    # Python < 3.13 registers attached segments with the resource tracker, which
+    # would destroy the publisher's segment when a worker exits
+    try:
+        resource_tracker.unregister(segment._name, "shared_memory")
+    except Exception:
+        pass
+    return segment
+
+#######################################
+
+# Function: _read_pointer
+# Purpose: Load the pointer file, or None if nothing has been published
+def _read_pointer(pointer_path):
+    try:
+        with open(pointer_path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+############### SHARED INDEX CLASS ###############
+class SharedIndex(EmbeddingIndex):
+    def __init__(self, segment, count, dim):
+        """Read-only EmbeddingIndex whose arrays are views into a shared memory segment"""
+        self.segment = segment
+        self.dim = dim
+        self.count = count
+        self.labels = np.ndarray((count,), np.int64, buffer = segment.buf)
+        self.vectors = np.ndarray((count, dim), np.float32, buffer = segment.buf, offset = count * 8)
+        self.labels.flags.writeable = False
+        self.vectors.flags.writeable = False
+
+    def add(self, vectors, labels):
+        raise TypeError("Shared indexes are read-only; publish a new model instead")
+
+    def remove(self, label):
+        raise TypeError("Shared indexes are read-only; publish a new model instead")
+
+    def close(self):
+        # Drop the views before unmapping, otherwise SharedMemory.close() fails
+        self.labels = self.vectors = None
+        self.segment.close()
+
+############### PUBLISHER CLASS ###############
+class SharedModelPublisher:
+    def __init__(self, pointer_path = SHARED_POINTER):
+        """
+        Loads a trained model once into shared memory for recognition workers:
+        SFace embeddings, or the LBPH histograms (matched by LBPHHistogramBackend).
+        Each publish() creates a new segment and then swaps the pointer file with
+        os.replace, so workers see either the old model or the new one, never a mix.
+        The previous segment is unlinked straight away: workers still attached keep
+        their mapping until they move on, new attaches go to the new segment.
+        """
+        self.pointer_path = pointer_path
+        self.segment = None
+        self.version = 0
+
+    def publish(self, model_path = "trainer.yml"):
+        backend = load_backend(model_path)
+        labels, vectors, params = backend.export()
+        count, dim = len(labels), vectors.shape[1] if len(labels) else 0
+        self.version += 1
+        name = f"facetrack_{os.getpid()}_{self.version}"
+        segment = shared_memory.SharedMemory(name = name, create = True, size = max(1, count * (8 + 4 * dim)))
+        np.ndarray((count,), np.int64, buffer = segment.buf)[:] = labels
+        np.ndarray((count, dim), np.float32, buffer = segment.buf, offset = count * 8)[:] = vectors
+
+        pointer = {"segment": name, "count": count, "dim": dim, "kind": backend.name, "params": params,
+                   "model_path": model_path, "version": self.version, "published": time.time()}
+        os.makedirs(os.path.dirname(os.path.abspath(self.pointer_path)), exist_ok = True)
+        tmp = f"{self.pointer_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(pointer, f)
+        os.replace(tmp, self.pointer_path)
+
+        old, self.segment = self.segment, segment
+        if old is not None:
+            old.close()
+            old.unlink()
+        print(f"✅ Published {count} {backend.name} samples as shared segment {name}")
+        return pointer
+
+    def close(self):
+        """Remove the published segment and pointer (call when the service stops)"""
+        if self.segment is not None:
+            self.segment.close()
+            self.segment.unlink()
+            self.segment = None
+        if os.path.exists(self.pointer_path):
+            os.remove(self.pointer_path)
+
+############### CLIENT CLASS ###############
+class SharedModelClient:
+    def __init__(self, pointer_path = SHARED_POINTER, fallback_model = "trainer.yml"):
+        """
+        Worker-side view of the published model. predict() checks for a newer
+        model at most every REFRESH_SECONDS and switches to it between calls.
+        With nothing published the worker loads fallback_model into its own
+        memory instead.
+        """
+        self.pointer_path = pointer_path
+        self.fallback_model = fallback_model
+        self.backend = None
+        self.segment_name = None
+        self.checked = 0.0
+
+    def _refresh(self):
+        self.checked = time.monotonic()
+        pointer = _read_pointer(self.pointer_path)
+        if pointer is None:
+            if self.backend is None:
+                self.backend = load_backend(self.fallback_model)
+            return
+        if pointer["segment"] == self.segment_name:
+            return
+        try:
+            segment = _attach_segment(pointer["segment"])
+        except FileNotFoundError:
+            # Replaced between reading the pointer and attaching; pick it up next time
+            if self.backend is None:
+                raise
+            return
+
+        if pointer.get("kind", "sface") == "lbph":
+            backend = LBPHHistogramBackend(**pointer["params"])
+        else:
+            # Reuse the loaded SFace network; only the index changes
+            backend = self.backend if isinstance(self.backend, SFaceBackend) else SFaceBackend()
+        old = self.backend.index if isinstance(getattr(self.backend, "index", None), SharedIndex) else None
+        backend.index = SharedIndex(segment, pointer["count"], pointer["dim"])
+        self.backend = backend
+        self.segment_name = pointer["segment"]
+        if old is not None:
+            old.close()
+
+    def predict(self, face):
+        if self.backend is None or time.monotonic() - self.checked >= REFRESH_SECONDS:
+            self._refresh()
+        return self.backend.predict(face)
+
+############## WORKER FUNCTIONS ##############
+# These run inside the process pool, so they must be top-level functions.
+
+_client = None
+
+def _init_worker(pointer_path, fallback_model):
+    global _client
+    import cv2
+    cv2.setNumThreads(1)  # One face per process; avoid oversubscribing cores
+    _client = SharedModelClient(pointer_path, fallback_model)
+
+def _predict(face):
+    student_id, confidence = _client.predict(face)
+    return int(student_id), float(confidence)
+
+############### PARALLEL RECOGNIZER CLASS ###############
+class ParallelRecognizer:
+    def __init__(self, workers = None, pointer_path = SHARED_POINTER, model_path = "trainer.yml"):
+        """Process pool whose workers all match against the one shared model"""
+        self.pool = ProcessPoolExecutor(max_workers = workers, initializer = _init_worker,
+                                        initargs = (pointer_path, model_path))
+
+    def predict_many(self, faces):
+        """Return [(student_id, confidence)] for a list of grayscale face crops"""
+        return list(self.pool.map(_predict, faces, chunksize = max(1, len(faces) // 16)))
+
+    def close(self):
+        self.pool.shutdown()
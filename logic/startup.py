@@ -0,0 +1,62 @@
+# logic/startup.py
+############### IMPORTS ###############
+import time
+from contextlib import contextmanager
+
+from logic import metrics
+
+############## CONSTANTS ##############
+
+# Taken when this module is first imported, i.e. at the very start of main.py
+PROCESS_START = time.perf_counter()
+
+_phases = []
+
+############## FUNCTIONS ##############
+
+# Function: phase
+# Purpose: Time one startup phase; it is listed in report() and recorded as metric "startup.<name>"
+@contextmanager
+def phase(name):
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except Exception as e:
+        status = f"failed: {e}"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        _phases.append((name, elapsed, start - PROCESS_START, status))
+        metrics.record(f"startup.{name}", elapsed)
+
+#######################################
+
+# Function: mark
+# Purpose: Record a milestone (e.g. "window shown") as time since process start
+def mark(name):
+    _phases.append((name, 0.0, time.perf_counter() - PROCESS_START, "mark"))
+
+#######################################
+
+# Function: get_phases
+# Purpose: Return [{name, seconds, started_at, status}] in the order they were recorded
+def get_phases():
+    return [
+        {"name": n, "seconds": round(d, 4), "started_at": round(at, 4), "status": s}
+        for n, d, at, s in _phases
+    ]
+
+#######################################
+
+# Function: report
+# Purpose: Human-readable startup timeline
+def report():
+    lines = ["⏱️ Startup report (seconds since launch):"]
+    for n, d, at, s in _phases:
+        if s == "mark":
+            lines.append(f"   {at:7.3f}s  ── {n}")
+        else:
+            suffix = "" if s == "ok" else f"  ({s})"
+            lines.append(f"   {at:7.3f}s  {n}: {d * 1000:.0f} ms{suffix}")
+    return "\n".join(lines)
@@ -2,13 +2,23 @@
 import cv2
 import os
 
+from logic import metrics
+from logic.decision import DecisionEngine, thresholds_path_for
+from logic.frame_buffers import FrameBuffers
+from logic.motion_gate import IDLE_WAIT_MS, MotionGate, load_rois
+from logic.recognizers import load_backend
+
 ############### AUTHENTICATION CLASS ###############
 class Authenticator:
-    def __init__(self, model_path = "trainer.yml"):
+    def __init__(self, model_path = "trainer.yml", rois = None):
         self.model_path = model_path
         self.recognizer = None
         self.face_cascade = None
         self.cap = None
+        self.decision = DecisionEngine()
+        self.buffers = FrameBuffers()  # Reused by every frame of recognize()/identify()
+        # Detection is confined to these regions (fractions of the frame); see motion_gate.load_rois
+        self.gate = MotionGate(rois if rois is not None else load_rois())
         
         # Only initialize if model exists
         if os.path.exists(model_path):
@@ -19,9 +29,12 @@ class Authenticator:
     def _initialize_recognizer(self):
         """Initialize the face recognizer and cascade classifier"""
         try:
-            # Load trained recognizer
-            self.recognizer = cv2.face.LBPHFaceRecognizer_create()
-            self.recognizer.read(self.model_path)
+            # Load trained recognizer (LBPH or embedding index, whichever wrote the model)
+            self.recognizer = load_backend(self.model_path)
+
+            # Load per-student thresholds calibrated at training time
+            self.decision.load_thresholds(thresholds_path_for(self.model_path))
+            self.decision.reset()
 
             # Load Haar Cascade for face detection
             self.face_cascade = cv2.CascadeClassifier(
@@ -50,10 +63,22 @@ class Authenticator:
             print("⚠️ Model file not found. Please train the model first.")
             return False
 
+    def detect_faces(self, gray):
+        """Run the Haar cascade on each region of interest; boxes are in full-frame coordinates"""
+        faces = []
+        for rx, ry, rw, rh in self.gate.regions(gray.shape):
+            with metrics.timer("detect.detect_multiscale"):
+                found = self.face_cascade.detectMultiScale(
+                    gray[ry:ry+rh, rx:rx+rw], scaleFactor = 1.3, minNeighbors = 5, minSize = (50, 50)
+                )
+            faces.extend((x + rx, y + ry, w, h) for (x, y, w, h) in found)
+        return faces
+
     def recognize(self):
         """
         Recognize face in real-time using trained model.
-        Press 'q' to quit.
+        Detection only runs while the motion gate sees movement; an idle scene
+        is polled slowly. Press 'q' to quit.
         """
         if not self.is_ready():
             print("❌ Authenticator not ready. Please train the model first.")
@@ -66,26 +91,54 @@ class Authenticator:
             return
             
         print("🎥 Starting face recognition. Press 'q' to quit.")
+
+        # Latest decision per face track, kept across frames
+        decisions = {}
+        self.gate.reset()
         
         while True:
-            ret, frame = self.cap.read()
+            with metrics.timer("camera.read"):
+                ret, frame = self.buffers.read(self.cap)
             if not ret:
                 print("Failed to grab frame")
                 break
 
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(
-                gray, scaleFactor = 1.3, minNeighbors = 5, minSize = (50, 50)
-            )
+            with metrics.timer("gate.check"):
+                active = self.gate.check(frame)
+            if not active:
+                # Empty scene: skip conversion and detection, forget old tracks, poll slowly
+                if decisions:
+                    decisions.clear()
+                    self.decision.reset()
+                cv2.imshow("FaceTrack - Authentication", frame)
+                if cv2.waitKey(IDLE_WAIT_MS) & 0xFF == ord('q'):
+                    break
+                continue
+
+            with metrics.timer("frame.cvt_gray"):
+                gray = self.buffers.to_gray(frame)
+            faces = self.detect_faces(gray)
+
+            # A busy kiosk never goes idle: drop tracks nobody has matched for a few frames
+            for track_id in self.decision.next_frame():
+                decisions.pop(track_id, None)
 
             for (x, y, w, h) in faces:
                 face_img = gray[y:y+h, x:x+w]
 
-                # Predict ID and confidence
-                student_id, confidence = self.recognizer.predict(face_img)
+                # Predict ID and confidence, then vote across recent frames of this face
+                with metrics.timer("recognize.predict"):
+                    student_id, confidence = self.recognizer.predict(face_img)
+                track_id = self.decision.track((x, y, w, h))
+                decision = self.decision.add(track_id, student_id, confidence)
+                if decision is not None:
+                    decisions[track_id] = decision
 
-                if confidence < 70:  # smaller = better match
-                    text = f"ID: {student_id} ✅"
+                if track_id not in decisions:
+                    text = "Checking..."
+                    color = (0, 255, 255)
+                elif decisions[track_id][0] is not None:
+                    text = f"ID: {decisions[track_id][0]} ✅"
                     color = (0, 255, 0)
                 else:
                     text = "Unknown ❌"
@@ -103,6 +156,47 @@ class Authenticator:
         self.cap.release()
         cv2.destroyAllWindows()
 
+    def identify(self, cap, max_frames = None):
+        """
+        Identify the largest face from a few frames of an open camera.
+        Returns (student_id, confidence, frame); student_id is None when the face
+        is unknown and confidence is None when no face was seen at all.
+        """
+        if not self.is_ready():
+            raise Exception("Authenticator not ready. Please train the model first.")
+
+        max_frames = max_frames or self.decision.window
+        self.decision.reset()
+        last_frame = None
+        best_confidence = None
+
+        for _ in range(max_frames):
+            with metrics.timer("camera.read"):
+                ret, frame = self.buffers.read(cap)
+            if not ret:
+                break
+            last_frame = frame
+
+            with metrics.timer("frame.cvt_gray"):
+                gray = self.buffers.to_gray(frame)
+            faces = self.detect_faces(gray)
+            if len(faces) == 0:
+                continue
+
+            # Only the largest face is followed
+            x, y, w, h = max(faces, key = lambda f: f[2] * f[3])
+            with metrics.timer("recognize.predict"):
+                student_id, confidence = self.recognizer.predict(gray[y:y+h, x:x+w])
+            if best_confidence is None or confidence < best_confidence:
+                best_confidence = confidence
+
+            decision = self.decision.add(0, student_id, confidence)
+            if decision is not None:
+                decided_id, decided_confidence = decision
+                return decided_id, decided_confidence, frame
+
+        return None, best_confidence, last_frame
+
 ############### MAIN TEST ###############
 if __name__ == "__main__":
     auth = Authenticator()
@@ -2,16 +2,23 @@
 import os
 import sys
 
+# Keep this import first: it records the process start time for the startup report
+from logic import startup
+
 # Add logic folder to path
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 sys.path.append(os.path.join(BASE_DIR, "logic"))
 
-from gui import AttendanceApp
-from logic.camera import Camera
-from logic.face_trainer import Trainer
-from logic.user_auth import Authenticator
+with startup.phase("import gui"):
+    from gui import AttendanceApp
+from logic import backup
+from logic import db_handler
+from logic import metrics
+
+# Camera, Trainer and Authenticator pull in OpenCV; the app loads them in the
+# background after the window is shown (see AttendanceApp.warm_up_backend)
 
 
 ############### PROJECT SETUP ###############
@@ -24,9 +31,31 @@ def create_project_structure():
 
 ############### MAIN APP ###############
 if __name__ == "__main__":
-    create_project_structure()
+    with startup.phase("project setup + schema"):
+        create_project_structure()
+        db_handler.ensure_schema()
+        # Attendance marks go through data/attendance.journal; leftovers from a crash are replayed here
+        ok, msg = db_handler.start_attendance_journal()
+        print(("✅ " if ok else "⚠️ ") + msg)
+        # Records absentees when sessions end and for the previous day shortly after
+        # UTC midnight (FACETRACK_DAY_CLOSE, UTC HH:MM)
+        db_handler.start_attendance_closer(os.environ.get("FACETRACK_DAY_CLOSE", "00:05"))
+        # Online backups of the database and model into backups/ (FACETRACK_BACKUP_HOURS, 0 = off)
+        backup_hours = float(os.environ.get("FACETRACK_BACKUP_HOURS", "24"))
+        if backup_hours > 0:
+            backup.start_backup_scheduler(backup_hours)
+
+    # Optional metrics export: FACETRACK_METRICS_PORT serves /metrics on localhost,
+    # FACETRACK_METRICS_FILE rewrites a Prometheus text file periodically
+    if os.environ.get("FACETRACK_METRICS_PORT"):
+        metrics.start_http_server(int(os.environ["FACETRACK_METRICS_PORT"]))
+    if os.environ.get("FACETRACK_METRICS_FILE"):
+        metrics.start_file_exporter(os.environ["FACETRACK_METRICS_FILE"])
 
     # Example: Run backend (you can later link with buttons in UI)
+    #from logic.camera import Camera
+    #from logic.face_trainer import Trainer
+    #from logic.user_auth import Authenticator
     #cam = Camera()
     #cam.capture_faces(student_id=1)
 
@@ -36,6 +65,12 @@ if __name__ == "__main__":
     #auth = Authenticator()
     #auth.recognize()
 
-    # Launch UI
-    app = AttendanceApp()
+    # Launch UI (--no-warmup: load camera/recognizer on the first scan instead)
+    warmup = "--no-warmup" not in sys.argv
+    with startup.phase("build window"):
+        app = AttendanceApp(warmup = warmup)
+    app.after_idle(lambda: startup.mark("window shown"))
+    if not warmup:
+        app.after(200, lambda: print(startup.report()))
     app.mainloop()
+    db_handler.stop_attendance_journal()